@@ -4,6 +4,10 @@ const DEFAULT_SOLVER_TIME_LIMIT_SEC = Number(process.env.SOLVER_TIME_LIMIT_SEC |
 const DEFAULT_TIMEOUT_MS = Number(
   process.env.SOLVER_TIMEOUT_MS || (DEFAULT_SOLVER_TIME_LIMIT_SEC * 1000 + 30000)
 );
+// The solver answers with its best timetable at the deadline we send; leave
+// it this long to stop the search and reply before our fetch is aborted.
+const DEADLINE_GRACE_MS = Number(process.env.SOLVER_DEADLINE_GRACE_MS || 10000);
+const SOLVER_DEADLINE_SEC = Math.max(1, (DEFAULT_TIMEOUT_MS - DEADLINE_GRACE_MS) / 1000);
 
 function analyzeClassInternalGaps(classTimetables) {
   let gapCount = 0;
@@ -88,6 +92,8 @@ async function callCpSatSolver({
 
   emitProgress(progressStart, "start");
   heartbeat = setInterval(() => {
+    // Closing the request makes the solver stop its search.
+    if (stopFlag?.is_set) controller.abort();
     const elapsed = Date.now() - startedAt;
     const ratio = Math.min(1, elapsed / expectedMs);
     const eased = 1 - Math.pow(1 - ratio, 2);
@@ -97,7 +103,12 @@ async function callCpSatSolver({
   try {
     const res = await fetch(`${DEFAULT_SOLVER_URL}/solve`, {
       method: "POST",
-      headers: { "Content-Type": "application/json" },
+      headers: {
+        "Content-Type": "application/json",
+        // The solver gives up (and frees its cores) shortly before we stop
+        // waiting, returning the best timetable it has by then.
+        "X-Solver-Deadline-Sec": String(SOLVER_DEADLINE_SEC),
+      },
       body: JSON.stringify({
         faculties,
         subjects,
@@ -156,7 +167,9 @@ async function callCpSatSolver({
     };
   } catch (err) {
     const msg =
-      err?.name === "AbortError" ? "Solver timeout" : (err?.message || "Solver request failed");
+      err?.name === "AbortError"
+        ? (stopFlag?.is_set ? "Stopped by user" : "Solver timeout")
+        : (err?.message || "Solver request failed");
     return {
       ok: false,
       error: msg,
@@ -8,12 +8,38 @@
 
 # FastAPI CP-SAT timetable solver service
 import asyncio
+import json
+import multiprocessing
 import os
+import queue
 import sys
-from typing import Dict, List, Any, Tuple
-from fastapi import FastAPI, Request
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Any, Optional, Tuple
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+import numpy as np
 from ortools.sat.python import cp_model
 
+from cache import ResultCache, payload_cache_key
+from compact import compact_result, encode_response, msgpack, response_layout, wants_msgpack
+from decompose import merge_results, split_payload
+from ingest import decode_payload, is_msgpack
+from jobs import JOB_CANCELLED, JOB_COMPLETED, JOB_FAILED, JOB_QUEUED, Job, JobManager, QueueFull, job_workers
+from lns import lns_config, neighborhood_index, run_lns
+from metrics import SolverMetrics
+from objective import ObjectiveTerms, objective_breakdown
+from placement import generate_placements
+from pool import pool_config, run_pool
+from portfolio import apply_params, best_index, portfolio_config, portfolio_members, reaches_target
+from precheck import capacity_precheck, describe
+from replay import check_replay_request, dump_root, export_model, load_dump, replay_report, replay_solver
+from slotmask import SlotMasks
+from stats import SolveStats, merge_stats, solver_stats
+from symmetry import equivalent_combo_groups, redundant_combo_ids
+
 # Avoid noisy Proactor transport shutdown tracebacks on Windows when clients disconnect.
 if sys.platform == "win32":
     asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
@@ -22,6 +48,39 @@ app = FastAPI()
 
 EMPTY = -1
 BREAK = "BREAK"
+STOP_POLL_INTERVAL_SEC = 0.2
+STREAM_POLL_INTERVAL_SEC = 0.5
+QUEUE_FULL_RETRY_AFTER_SEC = 5
+DISCONNECT_POLL_INTERVAL_SEC = 0.5
+# Seconds (from receipt) the client will wait for a /solve or /repair answer.
+DEADLINE_HEADER = "x-solver-deadline-sec"
+
+# Model build and CP-SAT search run in worker processes so the event loop
+# (and /health) stays responsive during long solves. Jobs beyond the
+# concurrency limit wait in a bounded queue (429 once it is full); each
+# running job gets its share of the usable cores as CP-SAT workers.
+job_manager = JobManager(
+    max_workers=max(1, int(os.getenv("SOLVER_MAX_CONCURRENT_JOBS", "2"))),
+    max_queued=max(0, int(os.getenv("SOLVER_MAX_QUEUED_JOBS", "32"))),
+    cpus=int(os.getenv("SOLVER_CPUS", "0")) or None,
+    max_job_workers=max(1, int(os.getenv("SOLVER_WORKERS", "8"))),
+)
+
+# Identical requests (same inputs + seed) reuse a finished result or share the
+# solve already running for them.
+result_cache = ResultCache(
+    max_entries=max(0, int(os.getenv("SOLVER_CACHE_MAX_ENTRIES", "64"))),
+    max_bytes=max(0, int(os.getenv("SOLVER_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))),
+    ttl_sec=float(os.getenv("SOLVER_CACHE_TTL_SEC", "3600")),
+    disk_dir=os.getenv("SOLVER_CACHE_DIR") or None,
+    disk_max_entries=max(0, int(os.getenv("SOLVER_CACHE_DISK_MAX_ENTRIES", "512"))),
+)
+CACHEABLE_STATUSES = ("OPTIMAL", "FEASIBLE", "INFEASIBLE")
+_in_flight: Dict[str, Job] = {}
+_in_flight_lock = threading.Lock()
+
+# Recorded here from each finished result's `stats`; served on /metrics.
+solver_metrics = SolverMetrics()
 
 def _solver_loop_exception_handler(loop, context):
     exc = context.get("exception")
@@ -49,6 +108,10 @@ def _required_hours(class_obj: Dict[str, Any], subject_obj: Dict[str, Any]) -> i
     return int(subject_obj.get("no_of_hours_per_week") or 0)
 
 
+def _resolve_random_seed(payload: Dict[str, Any]) -> int:
+    return int(payload.get("random_seed") or os.getenv("SOLVER_RANDOM_SEED", "1"))
+
+
 def _cfg_get(cfg: Dict[str, Any], path: List[str], default: Any) -> Any:
     node: Any = cfg
     for key in path:
@@ -74,6 +137,20 @@ def _to_bool(value: Any, default: bool) -> bool:
     return default
 
 
+def _time_limit_sec(payload: Dict[str, Any]) -> float:
+    constraint_config = payload.get("constraintConfig") or {}
+    if _to_bool(payload.get("repair"), False) and payload.get("previousTimetable"):
+        # Repairs are small; they should not inherit the full solve's budget.
+        return float(_cfg_get(constraint_config, ["repair", "timeLimitSec"], 1.0))
+    return float(
+        _cfg_get(
+            constraint_config,
+            ["solver", "timeLimitSec"],
+            payload.get("solver_time_limit_sec") or os.getenv("SOLVER_TIME_LIMIT_SEC", "180"),
+        )
+    )
+
+
 def _normalize_slot_list(raw: Any) -> List[Tuple[int, int]]:
     if not isinstance(raw, list):
         return []
@@ -140,22 +217,196 @@ def _normalize_teacher_preferences_map(raw: Any) -> Dict[str, Dict[str, Any]]:
     return out
 
 
+def _cover_sum(vars_here: List[Any]) -> Any:
+    return vars_here[0] if len(vars_here) == 1 else cp_model.LinearExpr.Sum(vars_here)
+
+
+def _occ_terms(occ: Dict[Tuple[str, int, int], Any], keys: Any) -> List[Any]:
+    """Occupancy of `keys`, leaving out the constant-0 slots of a lean model."""
+    return [occ[key] for key in keys if key in occ]
+
+
+def _add_no_gaps_chain(
+    model: cp_model.CpModel,
+    day_occ: List[Any],
+    hours: List[int],
+    tag: str,
+    hard: bool,
+    weight: int,
+    objective_terms: ObjectiveTerms,
+    enforce: Optional[List[Any]] = None,
+    class_id: Optional[str] = None,
+) -> None:
+    """No-gaps for one class-day with prefix/suffix OR chains (linear size).
+
+    prefix[i] = OR(occ[0..i]) and suffix[i] = OR(occ[i..n-1]); slot i is a gap
+    iff prefix[i-1] and suffix[i+1] hold while occ[i] is empty. `enforce`
+    guards the hard form with enforcement literals.
+    """
+    n = len(day_occ)
+    if n < 3:
+        return
+    prefix: List[Any] = [day_occ[0]]
+    for i in range(1, n - 1):
+        p = model.NewBoolVar(f"class_prefix_occ_{tag}_{hours[i]}")
+        model.Add(p >= prefix[-1])
+        model.Add(p >= day_occ[i])
+        model.Add(p <= prefix[-1] + day_occ[i])
+        prefix.append(p)
+    suffix: List[Any] = [day_occ[n - 1]]
+    for i in range(n - 2, 0, -1):
+        s = model.NewBoolVar(f"class_suffix_occ_{tag}_{hours[i]}")
+        model.Add(s >= suffix[-1])
+        model.Add(s >= day_occ[i])
+        model.Add(s <= suffix[-1] + day_occ[i])
+        suffix.append(s)
+    suffix.reverse()  # suffix[j] now covers occ[j + 1 .. n - 1]
+    for i in range(1, n - 1):
+        before, after, occ = prefix[i - 1], suffix[i], day_occ[i]
+        if hard:
+            model.Add(before + after - occ <= 1).OnlyEnforceIf(enforce or [])
+            continue
+        if weight <= 0:
+            continue
+        gap = model.NewBoolVar(f"class_gap_{tag}_{hours[i]}")
+        model.Add(gap <= before)
+        model.Add(gap <= after)
+        model.Add(gap <= 1 - occ)
+        model.Add(gap >= before + after - occ - 1)
+        objective_terms.append(gap * weight, class_id=class_id)
+
+
+def _previous_lesson_starts(
+    previous_timetable: Any, block_of: Callable[[str], int]
+) -> Tuple[set, int]:
+    """Recover (combo_id, day, hour) starts from a class_timetables-shaped grid.
+
+    A run of identical combo cells of length L yields a start every `block`
+    hours. Returns the starts and the number of cells whose combo is unknown.
+    """
+    if isinstance(previous_timetable, dict) and isinstance(
+        previous_timetable.get("class_timetables"), dict
+    ):
+        previous_timetable = previous_timetable["class_timetables"]
+    if not isinstance(previous_timetable, dict):
+        return set(), 0
+    starts = set()
+    unknown_cells = 0
+    for grid in previous_timetable.values():
+        if not isinstance(grid, list):
+            continue
+        for day, row in enumerate(grid):
+            if not isinstance(row, list):
+                continue
+            hour = 0
+            while hour < len(row):
+                cell = row[hour]
+                if cell == EMPTY or cell == BREAK or cell is None:
+                    hour += 1
+                    continue
+                combo_id = str(cell)
+                block = block_of(combo_id)
+                run_end = hour
+                while run_end < len(row) and str(row[run_end]) == combo_id:
+                    run_end += 1
+                if block <= 0:
+                    unknown_cells += run_end - hour
+                else:
+                    for start in range(hour, run_end - block + 1, block):
+                        starts.add((combo_id, day, start))
+                hour = run_end
+    return starts, unknown_cells
+
+
 @app.on_event("startup")
 async def _install_loop_handler():
     loop = asyncio.get_running_loop()
     loop.set_exception_handler(_solver_loop_exception_handler)
 
 
+@app.on_event("shutdown")
+def _shutdown_job_manager():
+    job_manager.shutdown()
+
+
+@app.exception_handler(QueueFull)
+async def _queue_full(_request: Request, exc: QueueFull) -> JSONResponse:
+    solver_metrics.record_request("rejected")
+    return JSONResponse(
+        status_code=429,
+        content={"ok": False, "error": str(exc), "queued": exc.queued, "maxQueued": exc.max_queued},
+        headers={"Retry-After": str(QUEUE_FULL_RETRY_AFTER_SEC)},
+    )
+
+
 @app.get("/health")
 def health() -> Dict[str, str]:
     return {"ok": "true"}
 
 
-@app.post("/solve")
-async def solve(request: Request) -> Dict[str, Any]:
-    payload = await request.json()
-    constraint_config = payload.get("constraintConfig") or {}
-
+@app.get("/metrics")
+def metrics() -> PlainTextResponse:
+    solver_metrics.record_scheduler(job_manager.scheduler_stats())
+    return PlainTextResponse(solver_metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@dataclass
+class BuiltModel:
+    """CP-SAT model plus the lookups needed to solve and decode it."""
+
+    model: cp_model.CpModel
+    x: Dict[Tuple[str, int, int], cp_model.IntVar]
+    classes: List[Dict[str, Any]]
+    faculties: List[Dict[str, Any]]
+    subjects: List[Dict[str, Any]]
+    combos: List[Dict[str, Any]]
+    combo_by_id: Dict[str, Dict[str, Any]]
+    subject_by_id: Dict[str, Dict[str, Any]]
+    required_hours_by_class_subject: Dict[str, Dict[str, int]]
+    days_per_week: int
+    hours_per_day: int
+    break_hours_set: set
+    lab_block_size: int
+    theory_block_size: int
+    random_seed: int
+    time_limit_sec: float
+    applied_config: Dict[str, Any]
+    warnings: List[str]
+    unmet_requirements: List[Dict[str, Any]]
+    has_objective: bool
+    stats: SolveStats
+    # Set when the request asks for a hard-constraints-only first phase.
+    feasibility_time_limit_sec: Optional[float] = None
+    # Non-empty when the capacity pre-check proved the request infeasible;
+    # the model is then left empty.
+    precheck_failures: List[Dict[str, Any]] = field(default_factory=list)
+    # solver.explainInfeasibility: assumption literal index -> the hard
+    # family/entity it switches on, and the objective-free model to solve
+    # under those assumptions.
+    assumptions: Dict[int, Dict[str, Any]] = field(default_factory=dict)
+    explain_model: Optional[cp_model.CpModel] = None
+    # /repair: the freed classes and how many starts stayed free/frozen.
+    repair: Optional[Dict[str, Any]] = None
+    # The minimized terms, tagged by family/entity (objective.py).
+    objective_terms: Optional[ObjectiveTerms] = None
+
+    def block_for(self, combo_id: str) -> int:
+        subj = self.subject_by_id[self.combo_by_id[combo_id]["subject_id"]]
+        return self.lab_block_size if subj.get("type") == "lab" else self.theory_block_size
+
+
+def _normalize_entities(
+    payload: Dict[str, Any]
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Faculties, subjects, classes and combos with string ids. Payloads
+    flagged normalizedIds (see ingest.py) are used without copying."""
+    if _to_bool(payload.get("normalizedIds"), False):
+        return (
+            payload.get("faculties") or [],
+            payload.get("subjects") or [],
+            payload.get("classes") or [],
+            payload.get("combos") or [],
+        )
     faculties = [_normalize_id(f) for f in payload.get("faculties", [])]
     subjects = [_normalize_id({**s, "type": s.get("type") or "theory"}) for s in payload.get("subjects", [])]
     classes = [_normalize_id(c) for c in payload.get("classes", [])]
@@ -171,7 +422,17 @@ async def solve(request: Request) -> Dict[str, Any]:
             "class_ids": [str(x) for x in (c.get("class_ids") or [])],
         }
         combos.append(combo)
+    return faculties, subjects, classes, combos
 
+
+def _build_model(payload: Dict[str, Any]) -> BuiltModel:
+    stats = SolveStats()
+    stats.begin("normalize")
+    constraint_config = payload.get("constraintConfig") or {}
+
+    faculties, subjects, classes, combos = _normalize_entities(payload)
+
+    stats.begin("config")
     DAYS_PER_WEEK = int(
         _cfg_get(constraint_config, ["schedule", "daysPerWeek"], payload.get("DAYS_PER_WEEK") or 6)
     )
@@ -186,14 +447,8 @@ async def solve(request: Request) -> Dict[str, Any]:
     break_hours_set = set(BREAK_HOURS)
 
     fixed_slots = payload.get("fixed_slots") or payload.get("fixedSlots") or []
-    random_seed = int(payload.get("random_seed") or os.getenv("SOLVER_RANDOM_SEED", "1"))
-    solver_time_limit_sec = float(
-        _cfg_get(
-            constraint_config,
-            ["solver", "timeLimitSec"],
-            payload.get("solver_time_limit_sec") or os.getenv("SOLVER_TIME_LIMIT_SEC", "180"),
-        )
-    )
+    random_seed = _resolve_random_seed(payload)
+    solver_time_limit_sec = _time_limit_sec(payload)
 
     lab_block_size = max(1, int(_cfg_get(constraint_config, ["structural", "labBlockSize"], 2)))
     theory_block_size = max(1, int(_cfg_get(constraint_config, ["structural", "theoryBlockSize"], 1)))
@@ -224,6 +479,11 @@ async def solve(request: Request) -> Dict[str, Any]:
 
     no_gaps_hard = _to_bool(_cfg_get(constraint_config, ["noGaps", "hard"], True), True)
     no_gaps_weight = max(0, int(_cfg_get(constraint_config, ["noGaps", "weight"], 500)))
+    # "chain" (linear-size prefix/suffix ORs) is opt-in; "pairwise" is the
+    # default and solves faster to optimality on typical instances.
+    no_gaps_encoding = str(_cfg_get(constraint_config, ["noGaps", "encoding"], "pairwise")).strip().lower()
+    if no_gaps_encoding not in ("chain", "pairwise"):
+        no_gaps_encoding = "pairwise"
 
     teacher_daily_enabled = _to_bool(
         _cfg_get(constraint_config, ["teacherDailyOverload", "enabled"], True), True
@@ -394,6 +654,31 @@ async def solve(request: Request) -> Dict[str, Any]:
     no_teacher_early_slot_weight = max(
         0, int(_cfg_get(constraint_config, ["noTeacherSessions", "earlySlotWeight"], 40))
     )
+    previous_timetable = payload.get("previousTimetable")
+    warm_start_stability_weight = max(
+        0, int(_cfg_get(constraint_config, ["warmStart", "stabilityWeight"], 0))
+    )
+    repair_enabled = _to_bool(payload.get("repair"), False) and bool(previous_timetable)
+    repair_neighborhood = max(0, int(_cfg_get(constraint_config, ["repair", "neighborhood"], 0)))
+    precheck_enabled = _to_bool(_cfg_get(constraint_config, ["solver", "precheck"], True), True)
+    symmetry_breaking_enabled = _to_bool(
+        _cfg_get(constraint_config, ["symmetryBreaking", "enabled"], False), False
+    )
+    two_phase_enabled = _to_bool(_cfg_get(constraint_config, ["solver", "twoPhase", "enabled"], False), False)
+    explain_infeasibility = _to_bool(
+        _cfg_get(constraint_config, ["solver", "explainInfeasibility"], False), False
+    )
+    lean_model = _to_bool(_cfg_get(constraint_config, ["solver", "leanModel"], False), False)
+    feasibility_time_limit_sec = max(
+        0.0,
+        float(
+            _cfg_get(
+                constraint_config,
+                ["solver", "twoPhase", "feasibilityTimeLimitSec"],
+                min(30.0, solver_time_limit_sec * 0.25),
+            )
+        ),
+    )
 
     applied_config = {
         "schedule": {"daysPerWeek": DAYS_PER_WEEK, "hoursPerDay": HOURS_PER_DAY, "breakHours": BREAK_HOURS},
@@ -401,7 +686,7 @@ async def solve(request: Request) -> Dict[str, Any]:
         "weeklySubjectHours": {"hard": weekly_hours_hard, "shortageWeight": weekly_hours_shortage_weight},
         "teacherContinuity": {"enabled": teacher_cont_enabled, "maxConsecutive": teacher_cont_max, "weight": teacher_cont_weight},
         "classContinuity": {"enabled": class_cont_enabled, "maxConsecutive": class_cont_max, "weight": class_cont_weight},
-        "noGaps": {"hard": no_gaps_hard, "weight": no_gaps_weight},
+        "noGaps": {"hard": no_gaps_hard, "weight": no_gaps_weight, "encoding": no_gaps_encoding},
         "teacherDailyOverload": {"enabled": teacher_daily_enabled, "max": teacher_daily_max, "weight": teacher_daily_weight},
         "teacherRecoveryBreak": {
             "enabled": teacher_recovery_enabled,
@@ -465,7 +750,41 @@ async def solve(request: Request) -> Dict[str, Any]:
         },
         "teacherPreferences": teacher_preferences,
         "noTeacherSessions": {"earlySlotWeight": no_teacher_early_slot_weight},
-        "solver": {"timeLimitSec": solver_time_limit_sec},
+        "warmStart": {
+            "enabled": bool(previous_timetable),
+            "stabilityWeight": warm_start_stability_weight,
+        },
+        "repair": {
+            "enabled": repair_enabled,
+            "neighborhood": repair_neighborhood,
+            **({"timeLimitSec": solver_time_limit_sec} if repair_enabled else {}),
+        },
+        "symmetryBreaking": {"enabled": symmetry_breaking_enabled},
+        "solver": {
+            "timeLimitSec": solver_time_limit_sec,
+            "decompose": _to_bool(_cfg_get(constraint_config, ["solver", "decompose"], True), True),
+            "portfolio": {
+                k: v for k, v in portfolio_config(constraint_config).items() if k != "members"
+            },
+            "precheck": precheck_enabled,
+            "twoPhase": {
+                "enabled": two_phase_enabled,
+                "feasibilityTimeLimitSec": feasibility_time_limit_sec,
+            },
+            "explainInfeasibility": explain_infeasibility,
+            "leanModel": lean_model,
+            "dumpModel": _to_bool(_cfg_get(constraint_config, ["solver", "dumpModel"], False), False),
+            "lns": {
+                "enabled": _to_bool(_cfg_get(constraint_config, ["solver", "lns", "enabled"], False), False),
+                **lns_config(constraint_config, solver_time_limit_sec),
+            },
+            "solutionPool": {
+                "enabled": _to_bool(
+                    _cfg_get(constraint_config, ["solver", "solutionPool", "enabled"], False), False
+                ),
+                **pool_config(constraint_config, solver_time_limit_sec),
+            },
+        },
     }
 
     subject_by_id = {s["_id"]: s for s in subjects}
@@ -473,12 +792,15 @@ async def solve(request: Request) -> Dict[str, Any]:
     combo_by_id = {c["_id"]: c for c in combos}
     faculty_ids = [f["_id"] for f in faculties]
 
-    def _is_teacher_unavailable(fid: str, day: int, hour: int) -> bool:
-        key = (day, hour)
-        if key in teacher_avail_global:
-            return True
-        teacher_slots = teacher_avail_by_teacher.get(fid)
-        return bool(teacher_slots and key in teacher_slots)
+    # Breaks and teacher availability as int bitsets: block-fit, break-window
+    # and availability checks below are single AND operations.
+    slot_masks = SlotMasks(
+        max([DAYS_PER_WEEK] + [int(c.get("days_per_week") or DAYS_PER_WEEK) for c in classes]),
+        HOURS_PER_DAY,
+        break_hours_set,
+        teacher_avail_global,
+        teacher_avail_by_teacher,
+    )
 
     required_hours_by_class_subject: Dict[str, Dict[str, int]] = {}
     for cls in classes:
@@ -490,6 +812,7 @@ async def solve(request: Request) -> Dict[str, Any]:
             )
 
     # Validate fixed slots early (non-fatal): keep only valid ones and continue.
+    stats.begin("fixed_slot_validation")
     valid_fixed_slots: List[Dict[str, Any]] = []
     fixed_slot_warnings: List[str] = []
     for fs in fixed_slots:
@@ -516,7 +839,7 @@ async def solve(request: Request) -> Dict[str, Any]:
         if hour < 0 or hour >= HOURS_PER_DAY:
             fixed_slot_warnings.append(f"Fixed slot hour out of range: {hour}")
             continue
-        if hour in break_hours_set:
+        if slot_masks.is_break(hour):
             fixed_slot_warnings.append(
                 f"Fixed slot falls in break hour for class {class_id} at {day},{hour}"
             )
@@ -541,12 +864,7 @@ async def solve(request: Request) -> Dict[str, Any]:
             if combo:
                 subj = subject_by_id.get(combo.get("subject_id"))
                 block = lab_block_size if subj and subj.get("type") == "lab" else theory_block_size
-                availability_conflict = False
-                for fid in combo.get("faculty_ids", []):
-                    if any(_is_teacher_unavailable(fid, day, h) for h in range(hour, min(HOURS_PER_DAY, hour + block))):
-                        availability_conflict = True
-                        break
-                if availability_conflict:
+                if slot_masks.any_teacher_busy(combo.get("faculty_ids", []), day, hour, block):
                     fixed_slot_warnings.append(
                         f"Fixed slot violates teacher availability for class {class_id} at {day},{hour}"
                     )
@@ -555,79 +873,246 @@ async def solve(request: Request) -> Dict[str, Any]:
             {"class": class_id, "day": day, "hour": hour, "combo": combo_id}
         )
 
-    model = cp_model.CpModel()
-
-    # Decision variables: start placement per combo/day/hour.
-    x: Dict[Tuple[str, int, int], cp_model.IntVar] = {}
-    covers: Dict[Tuple[str, int, int], List[cp_model.IntVar]] = {}
-    teacher_covers: Dict[Tuple[str, int, int], List[cp_model.IntVar]] = {}
-    subject_covers: Dict[Tuple[str, int, int, str], List[cp_model.IntVar]] = {}
-    unmet_requirements: List[Dict[str, Any]] = []
-    objective_terms: List[cp_model.LinearExpr] = []
+    # Candidate starts per combo/day/hour (one x var each, below).
+    stats.begin("placements")
     valid_hours = [h for h in range(HOURS_PER_DAY) if h not in break_hours_set]
     hour_rank = {h: i for i, h in enumerate(valid_hours)}
     valid_hour_count = len(valid_hours)
 
-    for combo in combos:
-        combo_id = combo["_id"]
-        class_ids = [cid for cid in (combo.get("class_ids") or []) if cid in class_by_id]
-        if not class_ids:
-            continue
-        subj = subject_by_id.get(combo["subject_id"])
-        if not subj:
-            continue
-        if any(required_hours_by_class_subject[cid].get(combo["subject_id"], 0) <= 0 for cid in class_ids):
-            continue
-        block = lab_block_size if subj.get("type") == "lab" else theory_block_size
-        max_days_for_combo = min(
-            [int(class_by_id[cid].get("days_per_week") or DAYS_PER_WEEK) for cid in class_ids] or [DAYS_PER_WEEK]
+    placements = generate_placements(
+        combos,
+        class_by_id,
+        subject_by_id,
+        required_hours_by_class_subject,
+        DAYS_PER_WEEK,
+        HOURS_PER_DAY,
+        break_hours_set,
+        lab_block_size,
+        theory_block_size,
+        teacher_avail_enabled=teacher_avail_enabled,
+        # Explain mode keeps unavailable starts and forbids them under an
+        # assumption instead, so availability can show up in the core.
+        teacher_avail_hard=teacher_avail_hard and not explain_infeasibility,
+        teacher_avail_global=teacher_avail_global,
+        teacher_avail_by_teacher=teacher_avail_by_teacher,
+        slot_masks=slot_masks,
+    )
+    x_keys = placements.keys()
+
+    def _block_for(combo_id: str) -> int:
+        subj = subject_by_id[combo_by_id[combo_id]["subject_id"]]
+        return lab_block_size if subj.get("type") == "lab" else theory_block_size
+
+    def _combo_block(combo_id: str) -> int:
+        # 0 for combos the payload no longer knows (previous timetables).
+        combo = combo_by_id.get(combo_id)
+        if not combo or combo["subject_id"] not in subject_by_id:
+            return 0
+        return _block_for(combo_id)
+
+    # Repair: only starts of the classes a change touches stay free; every
+    # other start keeps its previousTimetable value, and frozen empty starts
+    # are not created at all.
+    stats.begin("repair")
+    frozen_starts: set = set()
+    model_classes = classes
+    model_faculty_ids = faculty_ids
+    repair_report: Optional[Dict[str, Any]] = None
+    if repair_enabled:
+        changes = payload.get("changes") if isinstance(payload.get("changes"), dict) else {}
+        changed_classes = {str(cid) for cid in changes.get("classes") or []}
+        changed_teachers = {str(fid) for fid in changes.get("teachers") or []}
+        changed_days = {int(d) for d in changes.get("days") or []}
+        previous_starts, _ = _previous_lesson_starts(previous_timetable, _combo_block)
+        # Days pick which current lessons a change hits; their classes are
+        # then freed on every day, since displaced lessons must go elsewhere.
+        # A current lesson that is no longer placeable frees its class too.
+        placeable = set(x_keys)
+        affected = set(changed_classes)
+        for key in previous_starts:
+            combo = combo_by_id.get(key[0])
+            if combo is None:
+                continue
+            hit = changed_classes & set(combo.get("class_ids", [])) or changed_teachers & set(
+                combo.get("faculty_ids", [])
+            )
+            if (hit and (not changed_days or key[1] in changed_days)) or key not in placeable:
+                affected.update(combo.get("class_ids", []))
+        # Neighborhood: each hop adds the classes sharing a teacher with a
+        # freed class.
+        for _ in range(repair_neighborhood):
+            teachers = {
+                fid
+                for combo in combos
+                if affected & set(combo.get("class_ids", []))
+                for fid in combo.get("faculty_ids", [])
+            }
+            affected |= {
+                cid
+                for combo in combos
+                if teachers & set(combo.get("faculty_ids", []))
+                for cid in combo.get("class_ids", [])
+            }
+        free = placements.touches_classes(affected)
+        keep = free | np.array([key in previous_starts for key in x_keys], dtype=bool)
+        placements = placements.subset(keep)
+        x_keys = placements.keys()
+        frozen_starts = {key for key, is_free in zip(x_keys, free[keep].tolist()) if not is_free}
+        free_combos = {placements.combo_ids[c] for c in np.unique(placements.combo_idx[free[keep]]).tolist()}
+        # Class/teacher families are only built where some start is free;
+        # elsewhere every term is constant once the frozen starts are fixed.
+        modelled_classes = {c for cid in free_combos for c in combo_by_id[cid].get("class_ids", [])}
+        modelled_teachers = {f for cid in free_combos for f in combo_by_id[cid].get("faculty_ids", [])}
+        model_classes = [c for c in classes if c["_id"] in modelled_classes]
+        model_faculty_ids = [fid for fid in faculty_ids if fid in modelled_teachers]
+        repair_report = {
+            "classes": sorted(cid for cid in affected if cid in class_by_id),
+            "freeStarts": int(free.sum()),
+            "frozenLessons": len(frozen_starts),
+            "modelledClasses": len(model_classes),
+            "modelledTeachers": len(model_faculty_ids),
+        }
+
+    # Counting/matching checks; an infeasible request never builds the model.
+    stats.begin("precheck")
+    precheck_failures: List[Dict[str, Any]] = []
+    if precheck_enabled:
+        candidate_starts = set(x_keys)
+        # Repairs only check the modelled classes: the others keep their
+        # frozen lessons, which need not cover every requirement.
+        precheck_failures = capacity_precheck(
+            model_classes,
+            combos,
+            {c["_id"]: required_hours_by_class_subject[c["_id"]] for c in model_classes},
+            {
+                c["_id"]: {
+                    (d, h)
+                    for d in range(int(c.get("days_per_week") or DAYS_PER_WEEK))
+                    for h in valid_hours
+                }
+                for c in model_classes
+            },
+            placements.subject_slots(),
+            placements.teacher_slots(),
+            [
+                (fs["combo"], fs["day"], fs["hour"])
+                for fs in valid_fixed_slots
+                if (fs["combo"], fs["day"], fs["hour"]) in candidate_starts
+            ],
+            _block_for,
+            weekly_hours_hard,
+        )
+    model = cp_model.CpModel()
+    stats.attach(model)
+    if precheck_failures:
+        return BuiltModel(
+            model=model,
+            x={},
+            classes=classes,
+            faculties=faculties,
+            subjects=subjects,
+            combos=combos,
+            combo_by_id=combo_by_id,
+            subject_by_id=subject_by_id,
+            required_hours_by_class_subject=required_hours_by_class_subject,
+            days_per_week=DAYS_PER_WEEK,
+            hours_per_day=HOURS_PER_DAY,
+            break_hours_set=break_hours_set,
+            lab_block_size=lab_block_size,
+            theory_block_size=theory_block_size,
+            random_seed=random_seed,
+            time_limit_sec=solver_time_limit_sec,
+            applied_config=applied_config,
+            warnings=fixed_slot_warnings,
+            unmet_requirements=[],
+            has_objective=False,
+            stats=stats,
+            precheck_failures=precheck_failures,
+            repair=repair_report,
         )
-        for day in range(max_days_for_combo):
-            for hour in range(HOURS_PER_DAY):
-                if hour in break_hours_set:
-                    continue
-                if hour + block > HOURS_PER_DAY:
-                    continue
-                if any(h in break_hours_set for h in range(hour, hour + block)):
-                    continue
 
-                violates_availability = False
-                if teacher_avail_enabled:
-                    for fid in combo.get("faculty_ids", []):
-                        if any(_is_teacher_unavailable(fid, day, h) for h in range(hour, hour + block)):
-                            violates_availability = True
-                            break
-                    if teacher_avail_hard and violates_availability:
-                        continue
+    # Explain mode: every hard family/entity is switched on by an assumption
+    # literal, so an INFEASIBLE solve can name a sufficient conflicting subset.
+    assumptions: Dict[int, Dict[str, Any]] = {}
+    assumption_literals: Dict[Tuple[Any, ...], cp_model.IntVar] = {}
+
+    def _assume(family: str, **entity: Any) -> List[cp_model.IntVar]:
+        if not explain_infeasibility:
+            return []
+        key = (family, *sorted(entity.items()))
+        lit = assumption_literals.get(key)
+        if lit is None:
+            lit = model.NewBoolVar(f"assume_{family}_{len(assumption_literals)}")
+            assumption_literals[key] = lit
+            assumptions[lit.Index()] = {"family": family, **entity}
+        return [lit]
+
+    # Decision variables: start placement per combo/day/hour.
+    stats.begin("variables")
+    unmet_requirements: List[Dict[str, Any]] = []
+    objective_terms = ObjectiveTerms(stats)
+    x_vars = [model.NewBoolVar(f"x_{combo_id}_{day}_{hour}") for (combo_id, day, hour) in x_keys]
+    x: Dict[Tuple[str, int, int], cp_model.IntVar] = dict(zip(x_keys, x_vars))
+    covers: Dict[Tuple[str, int, int], List[cp_model.IntVar]] = placements.class_covers(x_vars)
+    subject_covers: Dict[Tuple[str, int, int, str], List[cp_model.IntVar]] = placements.subject_covers(x_vars)
+    teacher_covers: Dict[Tuple[str, int, int], List[cp_model.IntVar]] = placements.teacher_covers(x_vars)
+    for key in frozen_starts:
+        model.Add(x[key] == 1)
+
+    stats.begin("slot_penalties")
+    if teacher_avail_enabled and not teacher_avail_hard and teacher_avail_weight > 0:
+        for i in np.nonzero(placements.violates)[0].tolist():
+            objective_terms.append(
+                x_vars[i] * teacher_avail_weight, "teacher_availability", combo_id=x_keys[i][0]
+            )
+    if teacher_avail_enabled and teacher_avail_hard and explain_infeasibility:
+        block_of_combo = {cid: _block_for(cid) for cid in placements.combo_ids}
+        for i in np.nonzero(placements.violates)[0].tolist():
+            combo_id, day, hour = x_keys[i]
+            for fid in combo_by_id[combo_id].get("faculty_ids", []):
+                if slot_masks.teacher_busy(fid, day, hour, block_of_combo[combo_id]):
+                    model.Add(x_vars[i] == 0).OnlyEnforceIf(
+                        _assume("teacher_availability", teacher_id=fid)
+                    )
+    if no_teacher_early_slot_weight > 0 and valid_hour_count > 0:
+        no_teacher_combo = np.array(
+            [
+                str(subject_by_id[combo_by_id[cid]["subject_id"]].get("type") or "").lower() == "no_teacher"
+                for cid in placements.combo_ids
+            ],
+            dtype=bool,
+        )
+        # Later usable slot => smaller penalty; pushes no-teacher sessions late.
+        rank_of_hour = np.zeros(HOURS_PER_DAY, dtype=np.int64)
+        for h, rank in hour_rank.items():
+            rank_of_hour[h] = rank
+        early_penalty = np.maximum(0, valid_hour_count - rank_of_hour[placements.hour] - 1)
+        selected = np.nonzero(no_teacher_combo[placements.combo_idx] & (early_penalty > 0))[0]
+        for i, penalty in zip(selected.tolist(), early_penalty[selected].tolist()):
+            objective_terms.append(
+                x_vars[i] * no_teacher_early_slot_weight * penalty,
+                "no_teacher_early_slot",
+                combo_id=x_keys[i][0],
+            )
 
-                var = model.NewBoolVar(f"x_{combo_id}_{day}_{hour}")
-                x[(combo_id, day, hour)] = var
-                if (
-                    teacher_avail_enabled
-                    and not teacher_avail_hard
-                    and teacher_avail_weight > 0
-                    and violates_availability
-                ):
-                    objective_terms.append(var * teacher_avail_weight)
-                if (
-                    no_teacher_early_slot_weight > 0
-                    and str(subj.get("type") or "").lower() == "no_teacher"
-                    and valid_hour_count > 0
-                ):
-                    slot_rank = hour_rank.get(hour, 0)
-                    early_penalty = max(0, valid_hour_count - slot_rank - 1)
-                    if early_penalty > 0:
-                        objective_terms.append(var * no_teacher_early_slot_weight * early_penalty)
-
-                for h in range(hour, hour + block):
-                    for class_id in class_ids:
-                        covers.setdefault((class_id, day, h), []).append(var)
-                        subject_covers.setdefault((class_id, day, h, combo["subject_id"]), []).append(var)
-                    for fid in combo.get("faculty_ids", []):
-                        teacher_covers.setdefault((fid, day, h), []).append(var)
+    # Symmetry breaking: interchangeable combos keep only one labelling.
+    stats.begin("symmetry_breaking")
+    if symmetry_breaking_enabled:
+        referenced = {fs["combo"] for fs in valid_fixed_slots}
+        if previous_timetable:
+            referenced |= {key[0] for key in _previous_lesson_starts(previous_timetable, lambda _cid: 1)[0]}
+        redundant = set(
+            redundant_combo_ids(
+                equivalent_combo_groups(combos, class_by_id, subject_by_id), referenced
+            )
+        )
+        for (combo_id, _day, _hour), var in x.items():
+            if combo_id in redundant:
+                model.Add(var == 0)
 
     # Constraint: at most one lesson per class per hour
-    for cls in classes:
+    stats.begin("class_clash")
+    for cls in model_classes:
         class_id = cls["_id"]
         days = int(cls.get("days_per_week") or DAYS_PER_WEEK)
         for day in range(days):
@@ -639,7 +1124,8 @@ async def solve(request: Request) -> Dict[str, Any]:
                     model.AddAtMostOne(vars_here)
 
     # Constraint: teacher clash
-    for fid in faculty_ids:
+    stats.begin("teacher_clash")
+    for fid in model_faculty_ids:
         for day in range(DAYS_PER_WEEK):
             for hour in range(HOURS_PER_DAY):
                 if hour in break_hours_set:
@@ -648,38 +1134,58 @@ async def solve(request: Request) -> Dict[str, Any]:
                 if vars_here:
                     model.AddAtMostOne(vars_here)
 
-    # Occupancy variables per class and faculty per slot (0/1)
-    class_occ: Dict[Tuple[str, int, int], cp_model.IntVar] = {}
-    for cls in classes:
-        class_id = cls["_id"]
-        days = int(cls.get("days_per_week") or DAYS_PER_WEEK)
-        for day in range(days):
-            for hour in range(HOURS_PER_DAY):
-                if hour in break_hours_set:
-                    continue
-                occ = model.NewBoolVar(f"class_occ_{class_id}_{day}_{hour}")
-                vars_here = covers.get((class_id, day, hour), [])
-                if vars_here:
-                    model.Add(occ == sum(vars_here))
-                else:
-                    model.Add(occ == 0)
-                class_occ[(class_id, day, hour)] = occ
-
-    teacher_occ: Dict[Tuple[str, int, int], cp_model.IntVar] = {}
-    for fid in faculty_ids:
-        for day in range(DAYS_PER_WEEK):
-            for hour in range(HOURS_PER_DAY):
-                if hour in break_hours_set:
-                    continue
-                occ = model.NewBoolVar(f"teacher_occ_{fid}_{day}_{hour}")
-                vars_here = teacher_covers.get((fid, day, hour), [])
-                if vars_here:
-                    model.Add(occ == sum(vars_here))
-                else:
-                    model.Add(occ == 0)
-                teacher_occ[(fid, day, hour)] = occ
+    # Occupancy per class and faculty per slot (0/1).
+    # Lean model: the clash constraints already bound each cover sum by 1, so
+    # a slot's occupancy is that sum itself (the single start when only one
+    # covers it) instead of a BoolVar tied to it. Slots nothing covers are
+    # left out and read as the constant 0, and teachers without any combo are
+    # skipped by the per-slot families.
+    stats.begin("occupancy")
+    class_occ: Dict[Tuple[str, int, int], Any] = {}
+    teacher_occ: Dict[Tuple[str, int, int], Any] = {}
+    occ_faculty_ids = model_faculty_ids
+    if lean_model:
+        model_class_ids = {cls["_id"] for cls in model_classes}
+        busy_faculty_ids = {fid for fid, _day, _hour in teacher_covers}
+        occ_faculty_ids = [fid for fid in model_faculty_ids if fid in busy_faculty_ids]
+        occ_faculty_id_set = set(occ_faculty_ids)
+        for key, vars_here in covers.items():
+            if vars_here and key[0] in model_class_ids and key[2] not in break_hours_set:
+                class_occ[key] = _cover_sum(vars_here)
+        for key, vars_here in teacher_covers.items():
+            if vars_here and key[0] in occ_faculty_id_set and key[2] not in break_hours_set:
+                teacher_occ[key] = _cover_sum(vars_here)
+    else:
+        for cls in model_classes:
+            class_id = cls["_id"]
+            days = int(cls.get("days_per_week") or DAYS_PER_WEEK)
+            for day in range(days):
+                for hour in range(HOURS_PER_DAY):
+                    if hour in break_hours_set:
+                        continue
+                    occ = model.NewBoolVar(f"class_occ_{class_id}_{day}_{hour}")
+                    vars_here = covers.get((class_id, day, hour), [])
+                    if vars_here:
+                        model.Add(occ == sum(vars_here))
+                    else:
+                        model.Add(occ == 0)
+                    class_occ[(class_id, day, hour)] = occ
+
+        for fid in model_faculty_ids:
+            for day in range(DAYS_PER_WEEK):
+                for hour in range(HOURS_PER_DAY):
+                    if hour in break_hours_set:
+                        continue
+                    occ = model.NewBoolVar(f"teacher_occ_{fid}_{day}_{hour}")
+                    vars_here = teacher_covers.get((fid, day, hour), [])
+                    if vars_here:
+                        model.Add(occ == sum(vars_here))
+                    else:
+                        model.Add(occ == 0)
+                    teacher_occ[(fid, day, hour)] = occ
 
     # Weekly subject hours: configurable hard/soft behavior.
+    stats.begin("weekly_hours")
     x_by_class_subject: Dict[Tuple[str, str], List[Tuple[cp_model.IntVar, int]]] = {}
     for (combo_id, _day, _hour), var in x.items():
         combo = combo_by_id.get(combo_id)
@@ -694,7 +1200,7 @@ async def solve(request: Request) -> Dict[str, Any]:
                 (var, block)
             )
 
-    for cls in classes:
+    for cls in model_classes:
         class_id = cls["_id"]
         for subj in subjects:
             subj_id = subj["_id"]
@@ -708,17 +1214,22 @@ async def solve(request: Request) -> Dict[str, Any]:
                 continue
             scheduled_terms = sum(terms) if terms else 0
             if weekly_hours_hard:
-                model.Add(scheduled_terms == req)
+                model.Add(scheduled_terms == req).OnlyEnforceIf(
+                    _assume("weekly_hours", class_id=class_id, subject_id=subj_id)
+                )
             else:
                 scheduled = model.NewIntVar(0, req, f"scheduled_{class_id}_{subj_id}")
                 model.Add(scheduled == scheduled_terms)
                 shortage = model.NewIntVar(0, req, f"shortage_{class_id}_{subj_id}")
                 model.Add(scheduled + shortage == req)
-                objective_terms.append(shortage * weekly_hours_shortage_weight)
+                objective_terms.append(
+                    shortage * weekly_hours_shortage_weight, class_id=class_id, subject_id=subj_id
+                )
 
     # Soft constraint: teacher continuity.
+    stats.begin("teacher_continuity")
     teacher_continuity_teachers = [
-        fid for fid in faculty_ids
+        fid for fid in occ_faculty_ids
         if (teacher_cont_enabled and teacher_cont_weight > 0)
         or teacher_preferences.get(fid, {}).get("maxConsecutive")
     ]
@@ -739,79 +1250,99 @@ async def solve(request: Request) -> Dict[str, Any]:
                 continue
             win_len = max_consecutive + 1
             for day in range(DAYS_PER_WEEK):
-                for start in range(HOURS_PER_DAY - win_len + 1):
-                    if any(h in break_hours_set for h in range(start, start + win_len)):
-                        continue
-                    win = sum(
-                        teacher_occ[(fid, day, h)] for h in range(start, start + win_len)
+                for start in slot_masks.start_hours(win_len):
+                    win_terms = _occ_terms(
+                        teacher_occ, ((fid, day, h) for h in range(start, start + win_len))
                     )
+                    if len(win_terms) <= max_consecutive:
+                        continue
+                    win = sum(win_terms)
                     excess = model.NewIntVar(
                         0, win_len, f"teacher_cont_excess_{fid}_{day}_{start}"
                     )
                     model.Add(excess >= win - max_consecutive)
-                    objective_terms.append(excess * weight)
+                    objective_terms.append(excess * weight, teacher_id=fid)
 
     # Soft constraint: class continuity.
+    stats.begin("class_continuity")
     if class_cont_enabled and class_cont_weight > 0:
         win_len = class_cont_max + 1
-        for cls in classes:
+        for cls in model_classes:
             class_id = cls["_id"]
             days = int(cls.get("days_per_week") or DAYS_PER_WEEK)
             for day in range(days):
-                for start in range(HOURS_PER_DAY - win_len + 1):
-                    if any(h in break_hours_set for h in range(start, start + win_len)):
-                        continue
-                    win = sum(
-                        class_occ[(class_id, day, h)] for h in range(start, start + win_len)
+                for start in slot_masks.start_hours(win_len):
+                    win_terms = _occ_terms(
+                        class_occ, ((class_id, day, h) for h in range(start, start + win_len))
                     )
+                    if len(win_terms) <= class_cont_max:
+                        continue
+                    win = sum(win_terms)
                     excess = model.NewIntVar(
                         0, win_len, f"class_cont_excess_{class_id}_{day}_{start}"
                     )
                     model.Add(excess >= win - class_cont_max)
-                    objective_terms.append(excess * class_cont_weight)
+                    objective_terms.append(excess * class_cont_weight, class_id=class_id)
 
     # Hard constraint: no in-between class gaps within a day.
     # A gap is an empty non-break slot that has at least one class before it
     # and at least one class after it on the same day.
-    for cls in classes:
+    stats.begin("no_gaps")
+    valid_hours = [h for h in range(HOURS_PER_DAY) if h not in break_hours_set]
+    for cls in model_classes:
         class_id = cls["_id"]
         days = int(cls.get("days_per_week") or DAYS_PER_WEEK)
-        valid_hours = [h for h in range(HOURS_PER_DAY) if h not in break_hours_set]
         for day in range(days):
-            for hour in valid_hours:
-                prev_hours = [h for h in valid_hours if h < hour]
-                next_hours = [h for h in valid_hours if h > hour]
-                if not prev_hours or not next_hours:
+            day_hours = valid_hours
+            if lean_model:
+                # Constant-empty slots before the first / after the last
+                # occupiable one can never be (or bound) a gap.
+                open_hours = [h for h in valid_hours if (class_id, day, h) in class_occ]
+                day_hours = [h for h in valid_hours if open_hours and open_hours[0] <= h <= open_hours[-1]]
+            day_occ = [class_occ.get((class_id, day, h), 0) for h in day_hours]
+            if no_gaps_encoding == "chain":
+                _add_no_gaps_chain(
+                    model, day_occ, day_hours, f"{class_id}_{day}",
+                    no_gaps_hard, no_gaps_weight, objective_terms,
+                    _assume("no_gaps", class_id=class_id) if no_gaps_hard else None,
+                    class_id,
+                )
+                continue
+            for i, hour in enumerate(day_hours):
+                if i == 0 or i == len(day_hours) - 1:
                     continue
 
                 has_before = model.NewBoolVar(
                     f"class_has_before_{class_id}_{day}_{hour}"
                 )
-                before_terms = [class_occ[(class_id, day, h)] for h in prev_hours]
+                before_terms = day_occ[:i]
                 model.Add(has_before <= sum(before_terms))
                 for term in before_terms:
-                    model.Add(has_before >= term)
+                    if not isinstance(term, int):
+                        model.Add(has_before >= term)
 
                 has_after = model.NewBoolVar(
                     f"class_has_after_{class_id}_{day}_{hour}"
                 )
-                after_terms = [class_occ[(class_id, day, h)] for h in next_hours]
+                after_terms = day_occ[i + 1 :]
                 model.Add(has_after <= sum(after_terms))
                 for term in after_terms:
-                    model.Add(has_after >= term)
+                    if not isinstance(term, int):
+                        model.Add(has_after >= term)
 
                 gap = model.NewBoolVar(f"class_gap_{class_id}_{day}_{hour}")
-                occ = class_occ[(class_id, day, hour)]
+                occ = day_occ[i]
                 model.Add(gap <= has_before)
                 model.Add(gap <= has_after)
                 model.Add(gap <= 1 - occ)
                 model.Add(gap >= has_before + has_after - occ - 1)
                 if no_gaps_hard:
-                    model.Add(gap == 0)
+                    model.Add(gap == 0).OnlyEnforceIf(_assume("no_gaps", class_id=class_id))
                 elif no_gaps_weight > 0:
-                    objective_terms.append(gap * no_gaps_weight)
+                    objective_terms.append(gap * no_gaps_weight, class_id=class_id)
 
     # Fixed slots
+    stats.begin("fixed_slots")
     for fs in valid_fixed_slots:
         class_id = str(fs.get("class"))
         day = int(fs.get("day"))
@@ -823,19 +1354,21 @@ async def solve(request: Request) -> Dict[str, Any]:
                 f"Fixed slot invalid for class {class_id} combo {combo_id} at {day},{hour}"
             )
             continue
-        model.Add(var == 1)
+        model.Add(var == 1).OnlyEnforceIf(
+            _assume("fixed_slot", class_id=class_id, combo_id=combo_id, day=day, hour=hour)
+        )
 
     # Soft cap: teacher daily load.
+    stats.begin("teacher_daily_load")
     if teacher_daily_enabled and teacher_daily_weight > 0:
         teacher_day_load: Dict[Tuple[str, int], cp_model.IntVar] = {}
-        for fid in faculty_ids:
+        for fid in occ_faculty_ids:
             for day in range(DAYS_PER_WEEK):
-                day_terms = [
-                    teacher_occ[(fid, day, h)]
-                    for h in range(HOURS_PER_DAY)
-                    if h not in break_hours_set
-                ]
-                if not day_terms:
+                day_terms = _occ_terms(
+                    teacher_occ,
+                    ((fid, day, h) for h in range(HOURS_PER_DAY) if h not in break_hours_set),
+                )
+                if not day_terms or (lean_model and len(day_terms) <= teacher_daily_max):
                     continue
                 load = model.NewIntVar(0, len(day_terms), f"teacher_load_{fid}_{day}")
                 model.Add(load == sum(day_terms))
@@ -844,23 +1377,28 @@ async def solve(request: Request) -> Dict[str, Any]:
                     0, HOURS_PER_DAY, f"teacher_overload_{fid}_{day}"
                 )
                 model.Add(overload >= load - teacher_daily_max)
-                objective_terms.append(overload * teacher_daily_weight)
+                objective_terms.append(overload * teacher_daily_weight, teacher_id=fid)
 
     # Teacher recovery break between classes in a day.
     # Example: minHours=1 disallows immediate back-to-back slots for a teacher.
+    stats.begin("teacher_recovery")
     if teacher_recovery_enabled and teacher_recovery_min_hours > 0:
         valid_hours = [h for h in range(HOURS_PER_DAY) if h not in break_hours_set]
-        for fid in faculty_ids:
+        for fid in occ_faculty_ids:
             for day in range(DAYS_PER_WEEK):
                 for i, h1 in enumerate(valid_hours):
                     for h2 in valid_hours[i + 1 :]:
                         gap_slots = h2 - h1 - 1
                         if gap_slots >= teacher_recovery_min_hours:
                             break
-                        left = teacher_occ[(fid, day, h1)]
-                        right = teacher_occ[(fid, day, h2)]
+                        left = teacher_occ.get((fid, day, h1))
+                        right = teacher_occ.get((fid, day, h2))
+                        if left is None or right is None:
+                            continue
                         if teacher_recovery_hard:
-                            model.Add(left + right <= 1)
+                            model.Add(left + right <= 1).OnlyEnforceIf(
+                                _assume("teacher_recovery", teacher_id=fid)
+                            )
                         elif teacher_recovery_weight > 0:
                             violation = model.NewBoolVar(
                                 f"teacher_recovery_violation_{fid}_{day}_{h1}_{h2}"
@@ -868,16 +1406,17 @@ async def solve(request: Request) -> Dict[str, Any]:
                             model.Add(violation >= left + right - 1)
                             model.Add(violation <= left)
                             model.Add(violation <= right)
-                            objective_terms.append(violation * teacher_recovery_weight)
+                            objective_terms.append(violation * teacher_recovery_weight, teacher_id=fid)
 
     # Class daily minimum load.
+    stats.begin("class_daily_min")
     if class_daily_min_enabled and class_daily_min_value > 0:
-        for cls in classes:
+        for cls in model_classes:
             class_id = cls["_id"]
             days = int(cls.get("days_per_week") or DAYS_PER_WEEK)
             for day in range(days):
                 day_terms = [
-                    class_occ[(class_id, day, h)]
+                    class_occ.get((class_id, day, h), 0)
                     for h in range(HOURS_PER_DAY)
                     if h not in break_hours_set
                 ]
@@ -888,21 +1427,26 @@ async def solve(request: Request) -> Dict[str, Any]:
                 )
                 model.Add(day_load == sum(day_terms))
                 if class_daily_min_hard:
-                    model.Add(day_load >= class_daily_min_value)
+                    model.Add(day_load >= class_daily_min_value).OnlyEnforceIf(
+                        _assume("class_daily_min", class_id=class_id)
+                    )
                 elif class_daily_min_weight > 0:
                     shortage = model.NewIntVar(
                         0, class_daily_min_value, f"class_day_shortage_{class_id}_{day}"
                     )
                     model.Add(shortage >= class_daily_min_value - day_load)
-                    objective_terms.append(shortage * class_daily_min_weight)
+                    objective_terms.append(shortage * class_daily_min_weight, class_id=class_id)
 
     # Teacher weekly load balancing: configurable min/target/max controls.
+    stats.begin("teacher_weekly_load")
     if teacher_weekly_enabled:
         weekly_hours = [h for h in range(HOURS_PER_DAY) if h not in break_hours_set]
         weekly_capacity = DAYS_PER_WEEK * len(weekly_hours)
-        for fid in faculty_ids:
+        for fid in model_faculty_ids:
+            # Idle teachers stay in: their (constant 0) load still counts
+            # against a weekly minimum.
             weekly_terms = [
-                teacher_occ[(fid, day, hour)]
+                teacher_occ.get((fid, day, hour), 0)
                 for day in range(DAYS_PER_WEEK)
                 for hour in weekly_hours
             ]
@@ -913,18 +1457,22 @@ async def solve(request: Request) -> Dict[str, Any]:
             model.Add(weekly_load == sum(weekly_terms))
 
             if teacher_weekly_hard_min:
-                model.Add(weekly_load >= teacher_weekly_min)
+                model.Add(weekly_load >= teacher_weekly_min).OnlyEnforceIf(
+                    _assume("teacher_weekly_min", teacher_id=fid)
+                )
             elif teacher_weekly_under_weight > 0 and teacher_weekly_min > 0:
                 under_min = model.NewIntVar(0, teacher_weekly_min, f"teacher_under_min_{fid}")
                 model.Add(under_min >= teacher_weekly_min - weekly_load)
-                objective_terms.append(under_min * teacher_weekly_under_weight)
+                objective_terms.append(under_min * teacher_weekly_under_weight, teacher_id=fid)
 
             if teacher_weekly_hard_max:
-                model.Add(weekly_load <= teacher_weekly_max)
+                model.Add(weekly_load <= teacher_weekly_max).OnlyEnforceIf(
+                    _assume("teacher_weekly_max", teacher_id=fid)
+                )
             elif teacher_weekly_over_weight > 0:
                 over_max = model.NewIntVar(0, weekly_capacity, f"teacher_over_max_{fid}")
                 model.Add(over_max >= weekly_load - teacher_weekly_max)
-                objective_terms.append(over_max * teacher_weekly_over_weight)
+                objective_terms.append(over_max * teacher_weekly_over_weight, teacher_id=fid)
 
             if teacher_weekly_target > 0:
                 if teacher_weekly_under_weight > 0:
@@ -932,21 +1480,22 @@ async def solve(request: Request) -> Dict[str, Any]:
                         0, teacher_weekly_target, f"teacher_under_target_{fid}"
                     )
                     model.Add(under_target >= teacher_weekly_target - weekly_load)
-                    objective_terms.append(under_target * teacher_weekly_under_weight)
+                    objective_terms.append(under_target * teacher_weekly_under_weight, teacher_id=fid)
                 if teacher_weekly_over_weight > 0:
                     over_target = model.NewIntVar(
                         0, weekly_capacity, f"teacher_over_target_{fid}"
                     )
                     model.Add(over_target >= weekly_load - teacher_weekly_target)
-                    objective_terms.append(over_target * teacher_weekly_over_weight)
+                    objective_terms.append(over_target * teacher_weekly_over_weight, teacher_id=fid)
 
     # Avoid first/last period assignment for teachers.
+    stats.begin("teacher_boundary")
     if teacher_boundary_enabled and teacher_boundary_weight > 0:
         valid_hours = [h for h in range(HOURS_PER_DAY) if h not in break_hours_set]
         if valid_hours:
             first_hour = valid_hours[0]
             last_hour = valid_hours[-1]
-            for fid in faculty_ids:
+            for fid in occ_faculty_ids:
                 override = (
                     teacher_boundary_overrides.get(fid)
                     if isinstance(teacher_boundary_overrides.get(fid), dict)
@@ -955,43 +1504,43 @@ async def solve(request: Request) -> Dict[str, Any]:
                 avoid_first = _to_bool(override.get("avoidFirstPeriod"), teacher_boundary_avoid_first)
                 avoid_last = _to_bool(override.get("avoidLastPeriod"), teacher_boundary_avoid_last)
                 for day in range(DAYS_PER_WEEK):
-                    if avoid_first:
+                    if avoid_first and (fid, day, first_hour) in teacher_occ:
                         objective_terms.append(
-                            teacher_occ[(fid, day, first_hour)] * teacher_boundary_weight
+                            teacher_occ[(fid, day, first_hour)] * teacher_boundary_weight, teacher_id=fid
                         )
-                    if avoid_last and last_hour != first_hour:
+                    if avoid_last and last_hour != first_hour and (fid, day, last_hour) in teacher_occ:
                         objective_terms.append(
-                            teacher_occ[(fid, day, last_hour)] * teacher_boundary_weight
+                            teacher_occ[(fid, day, last_hour)] * teacher_boundary_weight, teacher_id=fid
                         )
 
+    stats.begin("teacher_preferences")
     if valid_hours:
         first_hour = valid_hours[0]
         last_hour = valid_hours[-1]
         for fid, prefs in teacher_preferences.items():
-            if fid not in faculty_ids:
+            if fid not in occ_faculty_ids:
                 continue
             avoid_first = bool(prefs.get("avoidFirstPeriod"))
             avoid_last = bool(prefs.get("avoidLastPeriod"))
             preferred_days = set(prefs.get("preferredDays") or [])
 
             for day in range(DAYS_PER_WEEK):
-                if avoid_first:
+                if avoid_first and (fid, day, first_hour) in teacher_occ:
                     objective_terms.append(
-                        teacher_occ[(fid, day, first_hour)] * teacher_pref_avoid_first_weight
+                        teacher_occ[(fid, day, first_hour)] * teacher_pref_avoid_first_weight, teacher_id=fid
                     )
-                if avoid_last and last_hour != first_hour:
+                if avoid_last and last_hour != first_hour and (fid, day, last_hour) in teacher_occ:
                     objective_terms.append(
-                        teacher_occ[(fid, day, last_hour)] * teacher_pref_avoid_last_weight
+                        teacher_occ[(fid, day, last_hour)] * teacher_pref_avoid_last_weight, teacher_id=fid
                     )
                 if preferred_days and day not in preferred_days:
-                    for hour in valid_hours:
-                        objective_terms.append(
-                            teacher_occ[(fid, day, hour)] * teacher_pref_non_preferred_day_weight
-                        )
+                    for occ in _occ_terms(teacher_occ, ((fid, day, hour) for hour in valid_hours)):
+                        objective_terms.append(occ * teacher_pref_non_preferred_day_weight, teacher_id=fid)
 
     # Soft objective: reduce subject clustering within a day.
+    stats.begin("subject_clustering")
     if subject_cluster_enabled and subject_cluster_weight > 0:
-        for cls in classes:
+        for cls in model_classes:
             class_id = cls["_id"]
             days = int(cls.get("days_per_week") or DAYS_PER_WEEK)
             for subj in subjects:
@@ -1015,12 +1564,15 @@ async def solve(request: Request) -> Dict[str, Any]:
                         0, HOURS_PER_DAY, f"subj_day_excess_{class_id}_{subj_id}_{day}"
                     )
                     model.Add(excess >= day_count - subject_cluster_max)
-                    objective_terms.append(excess * subject_cluster_weight)
+                    objective_terms.append(
+                        excess * subject_cluster_weight, class_id=class_id, subject_id=subj_id
+                    )
 
     # Spread/compact subject across week by controlling active teaching days.
+    stats.begin("subject_distribution")
     if subject_distribution_enabled and subject_distribution_weight > 0:
         usable_hours_per_day = len([h for h in range(HOURS_PER_DAY) if h not in break_hours_set])
-        for cls in classes:
+        for cls in model_classes:
             class_id = cls["_id"]
             days = int(cls.get("days_per_week") or DAYS_PER_WEEK)
             if days <= 0:
@@ -1063,18 +1615,23 @@ async def solve(request: Request) -> Dict[str, Any]:
                         0, len(day_presence_vars), f"subj_compact_excess_{class_id}_{subj_id}"
                     )
                     model.Add(excess_days >= active_days - min_days)
-                    objective_terms.append(excess_days * subject_distribution_weight)
+                    objective_terms.append(
+                        excess_days * subject_distribution_weight, class_id=class_id, subject_id=subj_id
+                    )
                 else:
                     target_days = min(req, len(day_presence_vars))
                     spread_shortage = model.NewIntVar(
                         0, target_days, f"subj_spread_shortage_{class_id}_{subj_id}"
                     )
                     model.Add(spread_shortage >= target_days - active_days)
-                    objective_terms.append(spread_shortage * subject_distribution_weight)
+                    objective_terms.append(
+                        spread_shortage * subject_distribution_weight, class_id=class_id, subject_id=subj_id
+                    )
 
     # High-hour subjects preference for early/late periods in a day.
+    stats.begin("high_load_timing")
     if high_load_timing_enabled and high_load_timing_weight > 0:
-        for cls in classes:
+        for cls in model_classes:
             class_id = cls["_id"]
             days = int(cls.get("days_per_week") or DAYS_PER_WEEK)
             for subj in subjects:
@@ -1094,7 +1651,9 @@ async def solve(request: Request) -> Dict[str, Any]:
                         else:
                             slot_cost = rank + 1
                         objective_terms.append(
-                            sum(terms) * high_load_timing_weight * slot_cost * demand_factor
+                            sum(terms) * high_load_timing_weight * slot_cost * demand_factor,
+                            class_id=class_id,
+                            subject_id=subj_id,
                         )
 
     # Medium soft constraint: global front-loading per class across the full week.
@@ -1104,19 +1663,23 @@ async def solve(request: Request) -> Dict[str, Any]:
     # 3) Penalize occupied slots with larger position index.
     # Together this strongly pushes empty slots toward the end of the week,
     # while still respecting hard constraints and fixed slots.
+    stats.begin("front_loading")
     if front_loading_enabled and front_loading_weight > 0:
-        for cls in classes:
+        for cls in model_classes:
             class_id = cls["_id"]
             days = int(cls.get("days_per_week") or DAYS_PER_WEEK)
             if days <= 0:
                 continue
 
-            flat_occ: List[cp_model.IntVar] = []
+            # Lean models have constant-0 entries; every term they would
+            # force to 0 is skipped, and the ones they reduce to a single
+            # occupancy use it directly.
+            flat_occ: List[Any] = []
             for day in range(days):
                 for hour in range(HOURS_PER_DAY):
                     if hour in break_hours_set:
                         continue
-                    flat_occ.append(class_occ[(class_id, day, hour)])
+                    flat_occ.append(class_occ.get((class_id, day, hour), 0))
 
             if len(flat_occ) <= 1:
                 continue
@@ -1124,16 +1687,25 @@ async def solve(request: Request) -> Dict[str, Any]:
             for i in range(len(flat_occ) - 1):
                 prev_occ = flat_occ[i]
                 next_occ = flat_occ[i + 1]
+                if isinstance(next_occ, int):
+                    continue
+                if isinstance(prev_occ, int):
+                    objective_terms.append(next_occ * front_loading_transition_weight, class_id=class_id)
+                    continue
                 violation = model.NewBoolVar(f"class_frontload_violation_{class_id}_{i}")
                 # violation = 1 iff (prev_occ=0 and next_occ=1)
                 model.Add(violation >= next_occ - prev_occ)
                 model.Add(violation <= next_occ)
                 model.Add(violation <= 1 - prev_occ)
-                objective_terms.append(violation * front_loading_transition_weight)
+                objective_terms.append(violation * front_loading_transition_weight, class_id=class_id)
 
             # Stronger compaction: penalize any empty slot that has an occupied slot later.
-            suffix_has_occ: List[cp_model.IntVar] = [None] * len(flat_occ)  # type: ignore
+            suffix_has_occ: List[Any] = [None] * len(flat_occ)
             for i in range(len(flat_occ) - 1, -1, -1):
+                later = 0 if i == len(flat_occ) - 1 else suffix_has_occ[i + 1]
+                if lean_model and (isinstance(flat_occ[i], int) or isinstance(later, int)):
+                    suffix_has_occ[i] = later if isinstance(flat_occ[i], int) else flat_occ[i]
+                    continue
                 s = model.NewBoolVar(f"class_suffix_has_occ_{class_id}_{i}")
                 suffix_has_occ[i] = s
                 if i == len(flat_occ) - 1:
@@ -1144,6 +1716,13 @@ async def solve(request: Request) -> Dict[str, Any]:
                     model.Add(s <= flat_occ[i] + suffix_has_occ[i + 1])
 
             for i in range(len(flat_occ) - 1):
+                if isinstance(suffix_has_occ[i + 1], int):
+                    continue
+                if isinstance(flat_occ[i], int):
+                    objective_terms.append(
+                        suffix_has_occ[i + 1] * front_loading_empty_before_later_weight, class_id=class_id
+                    )
+                    continue
                 empty_before_later_occ = model.NewBoolVar(
                     f"class_empty_before_late_occ_{class_id}_{i}"
                 )
@@ -1152,96 +1731,136 @@ async def solve(request: Request) -> Dict[str, Any]:
                 model.Add(empty_before_later_occ <= suffix_has_occ[i + 1])
                 model.Add(empty_before_later_occ >= suffix_has_occ[i + 1] - flat_occ[i])
                 objective_terms.append(
-                    empty_before_later_occ * front_loading_empty_before_later_weight
+                    empty_before_later_occ * front_loading_empty_before_later_weight, class_id=class_id
                 )
 
             # Additional compaction pressure: later occupied positions are costlier.
             # This improves week-end empty-slot packing, especially when fixed slots exist.
             for i, occ in enumerate(flat_occ):
-                objective_terms.append(occ * front_loading_late_slot_weight * (i + 1))
+                if not isinstance(occ, int):
+                    objective_terms.append(occ * front_loading_late_slot_weight * (i + 1), class_id=class_id)
+
+    # Warm start: hint every start variable from the previous timetable and,
+    # optionally, penalize dropping a previously placed lesson (i.e. moving it).
+    stats.begin("warm_start")
+    if previous_timetable:
+        previous_starts, unknown_cells = _previous_lesson_starts(previous_timetable, _combo_block)
+        for key, var in x.items():
+            model.AddHint(var, 1 if key in previous_starts else 0)
+        unplaceable = [key for key in previous_starts if key not in x]
+        if warm_start_stability_weight > 0:
+            for key in previous_starts:
+                var = x.get(key)
+                if var is not None:
+                    objective_terms.append((1 - var) * warm_start_stability_weight, combo_id=key[0])
+        if unknown_cells or unplaceable:
+            fixed_slot_warnings.append(
+                f"Warm start: {len(unplaceable)} previous lesson(s) no longer placeable, "
+                f"{unknown_cells} cell(s) with unknown combos"
+            )
 
+    stats.begin("objective")
+    explain_model: Optional[cp_model.CpModel] = None
+    if assumption_literals:
+        # Assumptions switch off most of CP-SAT's presolve and search, so the
+        # real solve runs with every guard fixed on; the copy is only solved
+        # to explain an INFEASIBLE status.
+        explain_model = model.Clone()
+        explain_model.ClearHints()
+        explain_model.AddAssumptions(list(assumption_literals.values()))
+        model.AddBoolAnd(list(assumption_literals.values()))
     if objective_terms:
         model.Minimize(sum(objective_terms))
+    stats.end()
+
+    return BuiltModel(
+        model=model,
+        x=x,
+        classes=classes,
+        faculties=faculties,
+        subjects=subjects,
+        combos=combos,
+        combo_by_id=combo_by_id,
+        subject_by_id=subject_by_id,
+        required_hours_by_class_subject=required_hours_by_class_subject,
+        days_per_week=DAYS_PER_WEEK,
+        hours_per_day=HOURS_PER_DAY,
+        break_hours_set=break_hours_set,
+        lab_block_size=lab_block_size,
+        theory_block_size=theory_block_size,
+        random_seed=random_seed,
+        time_limit_sec=solver_time_limit_sec,
+        applied_config=applied_config,
+        warnings=fixed_slot_warnings,
+        unmet_requirements=unmet_requirements,
+        has_objective=bool(objective_terms),
+        stats=stats,
+        objective_terms=objective_terms,
+        feasibility_time_limit_sec=feasibility_time_limit_sec if two_phase_enabled else None,
+        assumptions=assumptions,
+        explain_model=explain_model,
+        repair=repair_report,
+    )
 
-    solver = cp_model.CpSolver()
-    solver.parameters.max_time_in_seconds = solver_time_limit_sec
-    solver.parameters.num_search_workers = max(1, int(os.getenv("SOLVER_WORKERS", "8")))
-    solver.parameters.random_seed = random_seed
 
-    status = solver.Solve(model)
+def _empty_grid(days: int, hours_per_day: int, break_hours_set: set) -> List[List[Any]]:
+    return [
+        [BREAK if h in break_hours_set else EMPTY for h in range(hours_per_day)]
+        for _ in range(days)
+    ]
 
-    if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
-        return {
-            "ok": False,
-            "error": f"Solver status: {solver.StatusName(status)}",
-            "classes": classes,
-            "unmet_requirements": unmet_requirements,
-            "warnings": fixed_slot_warnings,
-            "config": applied_config,
-        }
 
-    # Build outputs
-    max_days = max([int(c.get("days_per_week") or DAYS_PER_WEEK) for c in classes] or [DAYS_PER_WEEK])
+def _decode_timetables(
+    built: BuiltModel, is_placed: Callable[[cp_model.IntVar], bool]
+) -> Tuple[Dict[str, List[List[Any]]], Dict[str, List[List[Any]]]]:
+    DAYS_PER_WEEK = built.days_per_week
+    HOURS_PER_DAY = built.hours_per_day
+    break_hours_set = built.break_hours_set
+    max_days = max([int(c.get("days_per_week") or DAYS_PER_WEEK) for c in built.classes] or [DAYS_PER_WEEK])
 
     class_timetables: Dict[str, List[List[Any]]] = {}
-    for cls in classes:
-        class_id = cls["_id"]
+    for cls in built.classes:
         days = int(cls.get("days_per_week") or DAYS_PER_WEEK)
-        table = []
-        for d in range(days):
-            row = []
-            for h in range(HOURS_PER_DAY):
-                if h in break_hours_set:
-                    row.append(BREAK)
-                else:
-                    row.append(EMPTY)
-            table.append(row)
-        class_timetables[class_id] = table
+        class_timetables[cls["_id"]] = _empty_grid(days, HOURS_PER_DAY, break_hours_set)
 
     faculty_timetables: Dict[str, List[List[Any]]] = {}
-    for f in faculties:
-        fid = f["_id"]
-        table = []
-        for d in range(max_days):
-            row = []
-            for h in range(HOURS_PER_DAY):
-                if h in break_hours_set:
-                    row.append(BREAK)
-                else:
-                    row.append(EMPTY)
-            table.append(row)
-        faculty_timetables[fid] = table
+    for f in built.faculties:
+        faculty_timetables[f["_id"]] = _empty_grid(max_days, HOURS_PER_DAY, break_hours_set)
 
-    for (combo_id, day, hour), var in x.items():
-        if solver.Value(var) != 1:
+    for (combo_id, day, hour), var in built.x.items():
+        if not is_placed(var):
             continue
-        combo = combo_by_id[combo_id]
-        subj = subject_by_id[combo["subject_id"]]
-        block = lab_block_size if subj.get("type") == "lab" else theory_block_size
-        for h in range(hour, hour + block):
+        combo = built.combo_by_id[combo_id]
+        for h in range(hour, hour + built.block_for(combo_id)):
             for class_id in combo.get("class_ids", []):
                 class_timetables[class_id][day][h] = combo_id
             for fid in combo.get("faculty_ids", []):
                 faculty_timetables[fid][day][h] = combo_id
 
-    # Post-solve unmet requirements report for transparency
-    for cls in classes:
+    return class_timetables, faculty_timetables
+
+
+def _unmet_requirements_report(
+    built: BuiltModel, class_timetables: Dict[str, List[List[Any]]]
+) -> List[Dict[str, Any]]:
+    unmet_requirements = list(built.unmet_requirements)
+    for cls in built.classes:
         class_id = cls["_id"]
-        days = int(cls.get("days_per_week") or DAYS_PER_WEEK)
-        for subj in subjects:
+        days = int(cls.get("days_per_week") or built.days_per_week)
+        for subj in built.subjects:
             subj_id = subj["_id"]
-            req = required_hours_by_class_subject[class_id][subj_id]
+            req = built.required_hours_by_class_subject[class_id][subj_id]
             if req <= 0:
                 continue
             scheduled = 0
             for d in range(days):
-                for h in range(HOURS_PER_DAY):
-                    if h in break_hours_set:
+                for h in range(built.hours_per_day):
+                    if h in built.break_hours_set:
                         continue
                     slot = class_timetables[class_id][d][h]
                     if slot == EMPTY or slot == BREAK:
                         continue
-                    combo = combo_by_id.get(str(slot))
+                    combo = built.combo_by_id.get(str(slot))
                     if combo and combo.get("subject_id") == subj_id:
                         scheduled += 1
             if scheduled < req and not any(
@@ -1257,13 +1876,1138 @@ async def solve(request: Request) -> Dict[str, Any]:
                         "reason": "infeasible_under_current_constraints",
                     }
                 )
+    return unmet_requirements
+
+
+def _watch_stop_event(solver: cp_model.CpSolver, stop_event: Any, done: threading.Event) -> None:
+    # Runs beside solver.Solve(); stop_event may be a multiprocessing proxy.
+    while not done.wait(STOP_POLL_INTERVAL_SEC):
+        try:
+            if stop_event.is_set():
+                solver.StopSearch()
+                return
+        except (EOFError, OSError):
+            # Manager went away (service shutdown): stop rather than run orphaned.
+            solver.StopSearch()
+            return
+
+
+class _SolutionStreamCallback(cp_model.CpSolverSolutionCallback):
+    """Pushes every improving incumbent, decoded to timetables, onto a queue
+    (if given), and stops the search once `target_objective` is reached."""
+
+    def __init__(
+        self,
+        built: BuiltModel,
+        progress_queue: Any,
+        tag: Optional[Dict[str, Any]] = None,
+        target_objective: Optional[float] = None,
+    ) -> None:
+        super().__init__()
+        self._built = built
+        self._queue = progress_queue
+        self._tag = tag or {}
+        self._target = target_objective
+        self._best: Any = None
+        self._count = 0
+
+    def on_solution_callback(self) -> None:
+        objective = self.ObjectiveValue() if self._built.has_objective else 0.0
+        if self._target is not None and objective <= self._target:
+            self.StopSearch()
+        if self._best is not None and objective >= self._best:
+            return
+        self._best = objective
+        self._count += 1
+        if self._queue is None:
+            return
+        class_timetables, faculty_timetables = _decode_timetables(
+            self._built, lambda var: self.Value(var) == 1
+        )
+        try:
+            self._queue.put(
+                {
+                    "type": "solution",
+                    "solution_index": self._count,
+                    "objective": objective,
+                    "bound": self.BestObjectiveBound() if self._built.has_objective else 0.0,
+                    "elapsed_sec": self.WallTime(),
+                    "class_timetables": class_timetables,
+                    "faculty_timetables": faculty_timetables,
+                    **self._tag,
+                }
+            )
+        except (EOFError, OSError):
+            # Nobody is listening any more; stop burning cores.
+            self.StopSearch()
+
+
+def _solver_workers() -> int:
+    # Inside a job: the cores the scheduler granted it.
+    return job_workers() or max(1, int(os.getenv("SOLVER_WORKERS", "8")))
+
+
+def _new_solver(
+    built: BuiltModel, num_workers: Optional[int] = None, params: Optional[Dict[str, Any]] = None
+) -> cp_model.CpSolver:
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = built.time_limit_sec
+    solver.parameters.num_search_workers = num_workers or _solver_workers()
+    solver.parameters.random_seed = built.random_seed
+    apply_params(solver, params)
+    return solver
+
+
+def _explain_infeasibility(
+    built: BuiltModel,
+    stop_event: Any,
+    num_workers: Optional[int],
+    solver_params: Optional[Dict[str, Any]],
+) -> Optional[Dict[str, Any]]:
+    """Re-solve under assumptions and report the families/entities CP-SAT
+    found sufficient for infeasibility (explain mode only; not minimal)."""
+    if built.explain_model is None:
+        return None
+    solver = _new_solver(built, num_workers, solver_params)
+    solver.parameters.max_time_in_seconds = built.time_limit_sec
+    if "linearization_level" not in (solver_params or {}):
+        # Presolve is mostly off under assumptions; the full LP relaxation
+        # recovers the counting arguments (hours vs. slots) it would find.
+        solver.parameters.linearization_level = 2
+
+    watcher_done = threading.Event()
+    if stop_event is not None:
+        threading.Thread(
+            target=_watch_stop_event, args=(solver, stop_event, watcher_done), daemon=True
+        ).start()
+    built.stats.begin("explain")
+    try:
+        status = solver.Solve(built.explain_model)
+    finally:
+        watcher_done.set()
+    built.stats.end()
+
+    conflicts: List[Dict[str, Any]] = []
+    if status == cp_model.INFEASIBLE:
+        conflicts = [
+            built.assumptions[index]
+            for index in solver.SufficientAssumptionsForInfeasibility()
+            if index in built.assumptions
+        ]
+    return {
+        "status": solver.StatusName(status),
+        "wall_time_sec": solver.WallTime(),
+        "families": sorted({c["family"] for c in conflicts}),
+        "conflicts": conflicts,
+    }
+
+
+def _solve_feasibility(
+    built: BuiltModel,
+    stop_event: Any,
+    progress_queue: Any,
+    num_workers: Optional[int],
+    solver_params: Optional[Dict[str, Any]],
+    progress_tag: Optional[Dict[str, Any]],
+) -> Tuple[Dict[str, Any], Optional[set]]:
+    """Phase 1 of the two-phase mode: hard constraints only, first solution.
+
+    The objective is dropped from a copy of the model (variable indices are
+    kept), and the solution found is hinted into the full model. Returns the
+    phase report and the indices of the placed start variables, if any.
+    """
+    model = built.model.Clone()
+    model.ClearObjective()
+    solver = _new_solver(built, num_workers, solver_params)
+    solver.parameters.max_time_in_seconds = built.feasibility_time_limit_sec
+    solver.parameters.stop_after_first_solution = True
+
+    watcher_done = threading.Event()
+    if stop_event is not None:
+        threading.Thread(
+            target=_watch_stop_event, args=(solver, stop_event, watcher_done), daemon=True
+        ).start()
+    try:
+        status = solver.Solve(model)
+    finally:
+        watcher_done.set()
+
+    # Without an objective, OPTIMAL just means a feasible timetable was found.
+    status_name = "FEASIBLE" if status == cp_model.OPTIMAL else solver.StatusName(status)
+    report = {"feasibility": {"status": status_name, "wall_time_sec": solver.WallTime()}}
+    if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        return report, None
+
+    placed = {var.Index() for var in built.x.values() if solver.Value(var) == 1}
+    built.model.ClearHints()
+    for var in built.x.values():
+        built.model.AddHint(var, 1 if var.Index() in placed else 0)
+    if progress_queue is not None:
+        class_timetables, faculty_timetables = _decode_timetables(
+            built, lambda var: var.Index() in placed
+        )
+        try:
+            progress_queue.put(
+                {
+                    "type": "solution",
+                    "solution_index": 0,
+                    "objective": None,
+                    "bound": None,
+                    "elapsed_sec": solver.WallTime(),
+                    "class_timetables": class_timetables,
+                    "faculty_timetables": faculty_timetables,
+                    "phase": "feasibility",
+                    **(progress_tag or {}),
+                }
+            )
+        except (EOFError, OSError):
+            pass
+    return report, placed
+
+
+def _solve_sub_model(
+    built: BuiltModel,
+    sub: cp_model.CpModel,
+    limit: float,
+    stop_event: Any,
+    num_workers: Optional[int],
+    solver_params: Optional[Dict[str, Any]],
+) -> Tuple[int, cp_model.CpSolver]:
+    """Solve a clone of built.model (LNS neighbourhood, pool alternative)."""
+    sub_solver = _new_solver(built, num_workers, solver_params)
+    sub_solver.parameters.max_time_in_seconds = limit
+    done = threading.Event()
+    if stop_event is not None:
+        threading.Thread(
+            target=_watch_stop_event, args=(sub_solver, stop_event, done), daemon=True
+        ).start()
+    try:
+        return sub_solver.Solve(sub), sub_solver
+    finally:
+        done.set()
+
+
+def _stop_requested(stop_event: Any) -> bool:
+    try:
+        return stop_event is not None and stop_event.is_set()
+    except (EOFError, OSError):
+        return True
+
+
+def _improve_with_lns(
+    built: BuiltModel,
+    solver: cp_model.CpSolver,
+    deadline: float,
+    stop_event: Any,
+    progress_queue: Any,
+    num_workers: Optional[int],
+    solver_params: Optional[Dict[str, Any]],
+    progress_tag: Optional[Dict[str, Any]],
+) -> Tuple[set, Dict[str, Any], cp_model.CpSolver]:
+    """Run the LNS driver (lns.py) from the incumbent `solver` holds.
+
+    Returns the indices of the placed start variables, the `lns` report and
+    the solver holding the final incumbent (sub-models are clones, so it
+    evaluates built.model's variables).
+    """
+    x_vars = list(built.x.values())
+    var_indices = [var.Index() for var in x_vars]
+    values = np.array([solver.Value(var) for var in x_vars], dtype=np.int8)
+    started = time.perf_counter() - solver.WallTime()
+    published = 0
+    last_solver = incumbent_solver = solver
+
+    def _solve_sub(sub: cp_model.CpModel, limit: float) -> Tuple[int, cp_model.CpSolver]:
+        nonlocal last_solver
+        status, last_solver = _solve_sub_model(built, sub, limit, stop_event, num_workers, solver_params)
+        return status, last_solver
+
+    def _publish(current: np.ndarray, objective: float) -> None:
+        nonlocal published, incumbent_solver
+        incumbent_solver = last_solver
+        if progress_queue is None:
+            return
+        published += 1
+        placed = {var_indices[pos] for pos in np.nonzero(current)[0].tolist()}
+        class_timetables, faculty_timetables = _decode_timetables(built, lambda var: var.Index() in placed)
+        try:
+            progress_queue.put(
+                {
+                    "type": "solution",
+                    "solution_index": published,
+                    "objective": objective,
+                    "bound": solver.BestObjectiveBound(),
+                    "elapsed_sec": time.perf_counter() - started,
+                    "class_timetables": class_timetables,
+                    "faculty_timetables": faculty_timetables,
+                    "phase": "lns",
+                    **(progress_tag or {}),
+                }
+            )
+        except (EOFError, OSError):
+            pass
+
+    values, report = run_lns(
+        built.model,
+        var_indices,
+        neighborhood_index(list(built.x), built.combo_by_id),
+        values,
+        solver.ObjectiveValue(),
+        solver.BestObjectiveBound(),
+        deadline,
+        built.applied_config["solver"]["lns"],
+        _solve_sub,
+        built.random_seed,
+        started,
+        on_improve=_publish,
+        should_stop=lambda: _stop_requested(stop_event),
+    )
+    return {var_indices[pos] for pos in np.nonzero(values)[0].tolist()}, report, incumbent_solver
+
+
+def _solution_pool(
+    built: BuiltModel,
+    is_placed: Callable[[cp_model.IntVar], bool],
+    objective: float,
+    status: str,
+    deadline: float,
+    stop_event: Any,
+    num_workers: Optional[int],
+    solver_params: Optional[Dict[str, Any]],
+) -> List[Dict[str, Any]]:
+    """The decoded timetable plus diverse alternatives (pool.py), ranked by
+    objective, with their timetables. `incumbent` marks the one returned at
+    the top level."""
+    x_vars = list(built.x.values())
+    var_indices = [var.Index() for var in x_vars]
+    best = np.array([1 if is_placed(var) else 0 for var in x_vars], dtype=np.int8)
+    members = run_pool(
+        built.model,
+        var_indices,
+        best,
+        objective,
+        built.applied_config["solver"]["solutionPool"],
+        lambda sub, limit: _solve_sub_model(built, sub, limit, stop_event, num_workers, solver_params),
+        deadline,
+        should_stop=lambda: _stop_requested(stop_event),
+    )
+    pool = []
+    for rank, member in enumerate(members, start=1):
+        placed = {var_indices[pos] for pos in np.nonzero(member["values"])[0].tolist()}
+        class_timetables, faculty_timetables = _decode_timetables(built, lambda var: var.Index() in placed)
+        pool.append(
+            {
+                "rank": rank,
+                "objective": member["objective"],
+                "status": member["status"] or status,
+                "difference": member["difference"],
+                "incumbent": member["status"] is None,
+                "class_timetables": class_timetables,
+                "faculty_timetables": faculty_timetables,
+            }
+        )
+    return pool
+
+
+def _solve_built_model(
+    built: BuiltModel,
+    stop_event: Any = None,
+    progress_queue: Any = None,
+    num_workers: Optional[int] = None,
+    progress_tag: Optional[Dict[str, Any]] = None,
+    target_objective: Optional[float] = None,
+    solver_params: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    stats = built.stats
+    if built.precheck_failures:
+        return {
+            "ok": False,
+            "error": "Capacity pre-check failed: "
+            + "; ".join(describe(reason) for reason in built.precheck_failures[:3])
+            + (f" (+{len(built.precheck_failures) - 3} more)" if len(built.precheck_failures) > 3 else ""),
+            "status": "INFEASIBLE",
+            "classes": built.classes,
+            "unmet_requirements": built.unmet_requirements,
+            "warnings": built.warnings,
+            "config": built.applied_config,
+            "stats": stats.as_dict(),
+            "precheck": built.precheck_failures,
+            **({"repair": built.repair} if built.repair is not None else {}),
+        }
+    model_dumps: List[str] = []
+    if built.applied_config["solver"]["dumpModel"]:
+        stats.begin("dump")
+        dump_dir = export_model(
+            built.model,
+            built.x,
+            built.combos,
+            {
+                "randomSeed": built.random_seed,
+                "timeLimitSec": built.time_limit_sec,
+                "numWorkers": num_workers or _solver_workers(),
+                "params": solver_params or {},
+            },
+        )
+        model_dumps.append(os.path.basename(dump_dir))
+        stats.end()
+    two_phase: Optional[Dict[str, Any]] = None
+    feasible_starts: Optional[set] = None
+    time_limit_sec = built.time_limit_sec
+    if built.feasibility_time_limit_sec is not None:
+        stats.begin("feasibility")
+        two_phase, feasible_starts = _solve_feasibility(
+            built, stop_event, progress_queue, num_workers, solver_params, progress_tag
+        )
+        stats.end()
+        if two_phase["feasibility"]["status"] == "INFEASIBLE":
+            core = _explain_infeasibility(built, stop_event, num_workers, solver_params)
+            return {
+                "ok": False,
+                "error": "Solver status: INFEASIBLE",
+                "status": "INFEASIBLE",
+                "classes": built.classes,
+                "unmet_requirements": built.unmet_requirements,
+                "warnings": built.warnings,
+                "config": built.applied_config,
+                "stats": stats.as_dict(),
+                "twoPhase": two_phase,
+                **({"infeasibility": core} if core is not None else {}),
+                **({"modelDumps": model_dumps} if model_dumps else {}),
+                **({"repair": built.repair} if built.repair is not None else {}),
+            }
+        time_limit_sec = max(0.0, time_limit_sec - two_phase["feasibility"]["wall_time_sec"])
+
+    lns = built.applied_config["solver"]["lns"]
+    lns_enabled = lns["enabled"] and built.has_objective
+    pool_cfg = built.applied_config["solver"]["solutionPool"]
+    pool_enabled = pool_cfg["enabled"] and pool_cfg["size"] > 1
+    # The pool's alternatives run inside the request's time limit: reserve
+    # their time (at most half of it) from the main search and LNS.
+    pool_reserve_sec = (
+        min((pool_cfg["size"] - 1) * pool_cfg["timeLimitSec"], 0.5 * time_limit_sec) if pool_enabled else 0.0
+    )
+    deadline = time.perf_counter() + time_limit_sec
+    search_limit_sec = time_limit_sec - pool_reserve_sec
+    solver = _new_solver(built, num_workers, solver_params)
+    solver.parameters.max_time_in_seconds = (
+        min(search_limit_sec, lns["initialTimeLimitSec"]) if lns_enabled else search_limit_sec
+    )
+
+    watcher_done = threading.Event()
+    if stop_event is not None:
+        threading.Thread(
+            target=_watch_stop_event, args=(solver, stop_event, watcher_done), daemon=True
+        ).start()
+    callback = (
+        _SolutionStreamCallback(built, progress_queue, progress_tag, target_objective)
+        if progress_queue is not None or target_objective is not None
+        else None
+    )
+    stats.begin("solve")
+    try:
+        status = solver.Solve(built.model, callback)
+    finally:
+        watcher_done.set()
+    stats.end()
+
+    lns_starts: Optional[set] = None
+    lns_report: Optional[Dict[str, Any]] = None
+    incumbent_solver = solver
+    if lns_enabled and status == cp_model.FEASIBLE:
+        stats.begin("lns")
+        lns_starts, lns_report, incumbent_solver = _improve_with_lns(
+            built,
+            solver,
+            deadline - pool_reserve_sec,
+            stop_event,
+            progress_queue,
+            num_workers,
+            solver_params,
+            progress_tag,
+        )
+        stats.end()
 
+    solved = status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+    if two_phase is not None:
+        two_phase["optimization"] = {
+            "status": solver.StatusName(status),
+            "wall_time_sec": solver.WallTime(),
+        }
+        two_phase["fallback"] = not solved and feasible_starts is not None
+        if two_phase["fallback"]:
+            built.warnings.append(
+                f"Optimization phase ended with {solver.StatusName(status)}; "
+                "returning the feasibility-phase timetable"
+            )
+    if not solved and not (two_phase and two_phase["fallback"]):
+        core = (
+            _explain_infeasibility(built, stop_event, num_workers, solver_params)
+            if status == cp_model.INFEASIBLE
+            else None
+        )
+        return {
+            "ok": False,
+            "error": f"Solver status: {solver.StatusName(status)}",
+            "status": solver.StatusName(status),
+            "classes": built.classes,
+            "unmet_requirements": built.unmet_requirements,
+            "warnings": built.warnings,
+            "config": built.applied_config,
+            "stats": {**stats.as_dict(), "solver": solver_stats(solver, status, built.has_objective)},
+            **({"twoPhase": two_phase} if two_phase is not None else {}),
+            **({"infeasibility": core} if core is not None else {}),
+            **({"modelDumps": model_dumps} if model_dumps else {}),
+            **({"repair": built.repair} if built.repair is not None else {}),
+        }
+
+    stats.begin("decode")
+    if lns_starts is not None:
+        is_placed = lambda var: var.Index() in lns_starts
+    elif solved:
+        is_placed = lambda var: solver.Value(var) == 1
+    else:
+        # Optimization phase ran out of time: keep the phase-1 timetable.
+        is_placed = lambda var: var.Index() in feasible_starts
+    class_timetables, faculty_timetables = _decode_timetables(built, is_placed)
+    stats.begin("report")
+    unmet_requirements = _unmet_requirements_report(built, class_timetables)
+    stats.end()
+
+    solver_section = solver_stats(solver, status, built.has_objective)
+    final_status = solver.StatusName(status) if solved else "FEASIBLE"
+    if lns_report is not None:
+        objective, bound = lns_report["objective"], solver_section["bound"]
+        solver_section["objective"] = objective
+        solver_section["gap"] = abs(objective - bound) / max(1.0, abs(objective))
+        final_status = "OPTIMAL" if lns_report["provedOptimal"] else "FEASIBLE"
+    breakdown: Optional[Dict[str, Any]] = None
+    if solved and built.has_objective:
+        stats.begin("breakdown")
+        breakdown = objective_breakdown(
+            built.objective_terms,
+            incumbent_solver.Value,
+            built.combo_by_id,
+            solver_section["objective"],
+            solver_section["bound"],
+        )
+        stats.end()
+    solution_pool: Optional[List[Dict[str, Any]]] = None
+    if pool_enabled and solved:
+        stats.begin("pool")
+        solution_pool = _solution_pool(
+            built,
+            is_placed,
+            solver_section["objective"] or 0.0,
+            final_status,
+            deadline,
+            stop_event,
+            num_workers,
+            solver_params,
+        )
+        stats.end()
     return {
         "ok": True,
+        "status": final_status,
         "class_timetables": class_timetables,
         "faculty_timetables": faculty_timetables,
-        "classes": classes,
+        "classes": built.classes,
         "unmet_requirements": unmet_requirements,
-        "warnings": fixed_slot_warnings,
-        "config": applied_config,
+        "warnings": built.warnings,
+        "config": built.applied_config,
+        "stats": {**stats.as_dict(), "solver": solver_section},
+        **({"twoPhase": two_phase} if two_phase is not None else {}),
+        **({"lns": lns_report} if lns_report is not None else {}),
+        **({"objectiveBreakdown": breakdown} if breakdown is not None else {}),
+        **({"solutionPool": solution_pool} if solution_pool is not None else {}),
+        **({"modelDumps": model_dumps} if model_dumps else {}),
+        **({"repair": built.repair} if built.repair is not None else {}),
+    }
+
+
+def _cap_time_limit(built: BuiltModel, limit_sec: float) -> None:
+    built.time_limit_sec = min(built.time_limit_sec, limit_sec)
+    if built.feasibility_time_limit_sec is not None:
+        built.feasibility_time_limit_sec = min(built.feasibility_time_limit_sec, limit_sec)
+
+
+def _solve_component(
+    payload: Dict[str, Any],
+    stop_event: Any,
+    progress_queue: Any,
+    num_workers: int,
+    progress_tag: Dict[str, Any],
+    deadline: float,
+    rounds_left: int,
+) -> Dict[str, Any]:
+    built = _build_model(payload)
+    # Components run `parallel` at a time against one request deadline
+    # (wall-clock time, shared across processes): each takes an even share
+    # of what is left for its round and the rounds after it.
+    _cap_time_limit(built, max(0.0, deadline - time.time()) / rounds_left)
+    return _solve_built_model(
+        built,
+        stop_event=stop_event,
+        progress_queue=progress_queue,
+        num_workers=num_workers,
+        progress_tag=progress_tag,
+    )
+
+
+def _solve_decomposed(
+    payload: Dict[str, Any],
+    parts: List[Dict[str, Any]],
+    stop_event: Any,
+    progress_queue: Any,
+) -> Dict[str, Any]:
+    """Solve independent components in parallel processes and merge them."""
+    constraint_config = payload.get("constraintConfig") or {}
+    max_parallel = max(
+        1,
+        int(
+            _cfg_get(
+                constraint_config,
+                ["solver", "maxParallelComponents"],
+                os.getenv(
+                    "SOLVER_MAX_PARALLEL_COMPONENTS", str(min(os.cpu_count() or 1, _solver_workers()))
+                ),
+            )
+        ),
+    )
+    # Never more components at once than the job's worker budget.
+    parallel = min(max_parallel, len(parts), _solver_workers())
+    # Share the CP-SAT worker budget between concurrently running components.
+    num_workers = max(1, _solver_workers() // parallel)
+    deadline = time.time() + _time_limit_sec(payload)
+    rounds = -(-len(parts) // parallel)
+    with ProcessPoolExecutor(
+        max_workers=parallel, mp_context=multiprocessing.get_context("spawn")
+    ) as pool:
+        futures = [
+            pool.submit(
+                _solve_component,
+                part,
+                stop_event,
+                progress_queue,
+                num_workers,
+                {"component": i, "components": len(parts)},
+                deadline,
+                rounds - i // parallel,
+            )
+            for i, part in enumerate(parts)
+        ]
+        results = [f.result() for f in futures]
+    merged = merge_results(payload, results, EMPTY, BREAK)
+    merged["stats"] = merge_stats([r.get("stats") for r in results])
+    return merged
+
+
+def _relay_stop_event(source: Any, target: Any, done: threading.Event) -> None:
+    while not done.wait(STOP_POLL_INTERVAL_SEC):
+        try:
+            if source.is_set():
+                target.set()
+                return
+        except (EOFError, OSError):
+            target.set()
+            return
+
+
+def _solve_portfolio_member(
+    payload: Dict[str, Any],
+    member: Dict[str, Any],
+    stop_event: Any,
+    progress_queue: Any,
+    target_objective: Optional[float],
+    deadline: float,
+) -> Dict[str, Any]:
+    built = _build_model({**payload, "random_seed": member["seed"]})
+    # Every run races against the same wall-clock deadline, taken before
+    # the processes were spawned.
+    _cap_time_limit(built, max(0.0, deadline - time.time()))
+    return _solve_built_model(
+        built,
+        stop_event=stop_event,
+        progress_queue=progress_queue,
+        num_workers=member["workers"],
+        progress_tag={"portfolio_member": member["name"]},
+        target_objective=target_objective,
+        solver_params=member["params"],
+    )
+
+
+def _solve_portfolio(
+    payload: Dict[str, Any], cfg: Dict[str, Any], stop_event: Any, progress_queue: Any
+) -> Dict[str, Any]:
+    """Race differently-seeded/parameterized runs; return the best one."""
+    try:
+        members = portfolio_members(cfg, _resolve_random_seed(payload), _solver_workers())
+    except ValueError as exc:
+        return {"ok": False, "error": f"Invalid portfolio config: {exc}"}
+    target = cfg["targetObjective"]
+    deadline = time.time() + _time_limit_sec(payload)
+    ctx = multiprocessing.get_context("spawn")
+    results: List[Dict[str, Any]] = [{} for _ in members]
+    with ctx.Manager() as manager, ProcessPoolExecutor(max_workers=len(members), mp_context=ctx) as pool:
+        # Set once the race is decided; every run watches it.
+        race_over = manager.Event()
+        relay_done = threading.Event()
+        if stop_event is not None:
+            threading.Thread(
+                target=_relay_stop_event, args=(stop_event, race_over, relay_done), daemon=True
+            ).start()
+        futures = {
+            pool.submit(
+                _solve_portfolio_member, payload, member, race_over, progress_queue, target, deadline
+            ): i
+            for i, member in enumerate(members)
+        }
+        try:
+            for fut in as_completed(futures):
+                i = futures[fut]
+                try:
+                    results[i] = fut.result()
+                except Exception as exc:
+                    # A crashed run (bad parameters, a killed process) loses
+                    # the race; the others can still win it.
+                    results[i] = {"ok": False, "error": f"Portfolio run {members[i]['name']} failed: {exc}"}
+                if reaches_target(results[i], target):
+                    race_over.set()
+        finally:
+            relay_done.set()
+
+    winner = best_index(results)
+    report = []
+    for member, result in zip(members, results):
+        solver_info = (result.get("stats") or {}).get("solver") or {}
+        report.append(
+            {
+                **member,
+                "status": result.get("status"),
+                "objective": solver_info.get("objective"),
+                "bound": solver_info.get("bound"),
+                "wall_time_sec": solver_info.get("wall_time_sec"),
+                # Runs that crashed have no status, only the error.
+                **({"error": result.get("error")} if "status" not in result else {}),
+            }
+        )
+    # Every run's bound is valid for the shared model; the tightest one wins.
+    bounds = [m["bound"] for m in report if m["bound"] is not None]
+    return {
+        **results[winner],
+        "portfolio": {
+            "winner": members[winner]["name"],
+            "targetObjective": target,
+            "bestBound": max(bounds) if bounds else None,
+            "members": report,
+        },
     }
+
+
+def _solve_payload(
+    payload: Dict[str, Any], stop_event: Any = None, progress_queue: Any = None
+) -> Dict[str, Any]:
+    """Build and solve one request synchronously. Runs inside a job worker process."""
+    constraint_config = payload.get("constraintConfig") or {}
+    portfolio = portfolio_config(constraint_config)
+    if portfolio["size"] > 1:
+        return _solve_portfolio(payload, portfolio, stop_event, progress_queue)
+    # Pool members differ across the whole timetable: keep the model whole.
+    pooled = _to_bool(_cfg_get(constraint_config, ["solver", "solutionPool", "enabled"], False), False)
+    if not pooled and _to_bool(_cfg_get(constraint_config, ["solver", "decompose"], True), True):
+        started = time.perf_counter()
+        parts = split_payload(payload)
+        split_sec = round(time.perf_counter() - started, 6)
+        if len(parts) > 1:
+            result = _solve_decomposed(payload, parts, stop_event, progress_queue)
+            result["stats"]["phases_sec"]["decompose"] = split_sec
+            return result
+    return _solve_built_model(
+        _build_model(payload), stop_event=stop_event, progress_queue=progress_queue
+    )
+
+
+def _replay_dump(request: Dict[str, Any], stop_event: Any = None) -> Dict[str, Any]:
+    """Solve a model dumped by solver.dumpModel. Runs inside a job worker process."""
+    started = time.perf_counter()
+    model, mapping = load_dump(request["path"])
+    load_sec = time.perf_counter() - started
+    solver = replay_solver(
+        mapping,
+        request.get("params") if isinstance(request.get("params"), dict) else None,
+        request.get("timeLimitSec"),
+        request.get("numWorkers"),
+        request.get("randomSeed"),
+    )
+    watcher_done = threading.Event()
+    if stop_event is not None:
+        threading.Thread(
+            target=_watch_stop_event, args=(solver, stop_event, watcher_done), daemon=True
+        ).start()
+    try:
+        status = solver.Solve(model)
+    finally:
+        watcher_done.set()
+    report = replay_report(solver, status, model, mapping)
+    report["stats"]["load_sec"] = round(load_sec, 6)
+    if not _to_bool(request.get("placements"), False):
+        report.pop("placements")
+    return report
+
+
+def _job_summary(job: Job) -> Dict[str, Any]:
+    summary = job.summary()
+    if summary["status"] == JOB_QUEUED:
+        position = job_manager.queue_position(job)
+        if position is not None:
+            summary["queue_position"] = position
+    return summary
+
+
+def _job_view(job: Job) -> Dict[str, Any]:
+    view = {"ok": True, **_job_summary(job)}
+    if job.status in (JOB_COMPLETED, JOB_CANCELLED) and job.result is not None:
+        view["result"] = job.result
+    if job.status == JOB_FAILED:
+        view["error"] = job.error
+    return view
+
+
+def _job_not_found(job_id: str) -> JSONResponse:
+    return JSONResponse(status_code=404, content={"ok": False, "error": f"Job not found: {job_id}"})
+
+
+def _on_solve_finished(key: str, job: Job) -> None:
+    with _in_flight_lock:
+        if _in_flight.get(key) is job:
+            del _in_flight[key]
+    if (
+        job.status == JOB_COMPLETED
+        and job.result is not None
+        and job.result.get("status") in CACHEABLE_STATUSES
+    ):
+        result_cache.put(key, job.result)
+
+
+def _track_job(job: Job) -> Job:
+    job.finished.add_done_callback(
+        lambda _fut: solver_metrics.record_job(job.status, job.result, job.wait_sec)
+    )
+    return job
+
+
+def _submit_solve(payload: Dict[str, Any]) -> Tuple[Job, str]:
+    """Submit a solve job, or reuse a cached result / identical in-flight job.
+
+    Returns the job, counted as one more waiter, and the cache outcome:
+    "hit", "shared", "miss" or "bypass".
+    """
+    # A dump request must write its own dump; a cached result would point
+    # at another request's.
+    dump_model = _to_bool(_cfg_get(payload.get("constraintConfig") or {}, ["solver", "dumpModel"], False), False)
+    if not result_cache.enabled or not _to_bool(payload.get("useCache"), True) or dump_model:
+        job = _track_job(job_manager.submit(_solve_payload, payload))
+        job.waiters += 1
+        return job, "bypass"
+    key = payload_cache_key(payload, _resolve_random_seed(payload))
+    cached = result_cache.get(key)
+    if cached is not None:
+        job = job_manager.completed(cached)
+        job.waiters += 1
+        return job, "hit"
+    with _in_flight_lock:
+        job = _in_flight.get(key)
+        if job is not None:
+            job.waiters += 1
+            return job, "shared"
+        job = _track_job(job_manager.submit(_solve_payload, payload))
+        job.waiters += 1
+        _in_flight[key] = job
+    job.finished.add_done_callback(lambda _fut, key=key, job=job: _on_solve_finished(key, job))
+    return job, "miss"
+
+
+def _release_job(job: Job) -> bool:
+    """Drop one waiter; the last one leaving cancels the job. True if it did."""
+    with _in_flight_lock:
+        job.waiters -= 1
+        abandoned = job.waiters <= 0 and not job.finished.done()
+    if abandoned:
+        job_manager.cancel(job.job_id)
+    return abandoned
+
+
+@app.post("/jobs", status_code=202)
+async def create_job(request: Request, response: Response) -> Any:
+    payload, error = await _read_payload(request)
+    if error is not None:
+        return error
+    job, cache_state = _submit_solve(payload)
+    solver_metrics.record_request(cache_state)
+    response.headers["X-Solver-Cache"] = cache_state
+    return {"ok": True, **_job_summary(job)}
+
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str) -> Any:
+    job = job_manager.get(job_id)
+    if job is None:
+        return _job_not_found(job_id)
+    return _job_view(job)
+
+
+@app.delete("/jobs/{job_id}")
+def cancel_job(job_id: str) -> Any:
+    job = job_manager.cancel(job_id)
+    if job is None:
+        return _job_not_found(job_id)
+    return {"ok": True, **job.summary()}
+
+
+def _queue_get(progress_queue: Any, timeout: float) -> Any:
+    try:
+        return progress_queue.get(timeout=timeout)
+    except queue.Empty:
+        return None
+
+
+def _encode_stream_event(event: Dict[str, Any], sse: bool) -> str:
+    data = json.dumps(event, separators=(",", ":"))
+    if sse:
+        return f"event: {event['type']}\ndata: {data}\n\n"
+    return data + "\n"
+
+
+async def _stream_job_events(job: Job, sse: bool):
+    loop = asyncio.get_running_loop()
+    try:
+        yield _encode_stream_event({"type": "job", **_job_summary(job)}, sse)
+        while not job.finished.done():
+            event = await loop.run_in_executor(
+                None, _queue_get, job.progress_queue, STREAM_POLL_INTERVAL_SEC
+            )
+            if event is not None:
+                yield _encode_stream_event(event, sse)
+        # The worker enqueues before returning, so anything left is already here.
+        while True:
+            try:
+                event = job.progress_queue.get_nowait()
+            except queue.Empty:
+                break
+            yield _encode_stream_event(event, sse)
+        final: Dict[str, Any] = {"type": "result", "status": job.status}
+        if job.result is not None:
+            final["result"] = job.result
+        if job.error is not None:
+            final["error"] = job.error
+        yield _encode_stream_event(final, sse)
+    finally:
+        # Client went away (or the stream was closed early): stop the search.
+        if not job.finished.done():
+            job_manager.cancel(job.job_id)
+
+
+@app.post("/solve/stream")
+async def solve_stream(request: Request) -> Any:
+    """Like /solve, but streams each improving solution as NDJSON (or SSE).
+
+    The first event carries the job id, so the caller can stop early with
+    DELETE /jobs/{id} and keep the last streamed timetable.
+    """
+    payload, error = await _read_payload(request)
+    if error is not None:
+        return error
+    sse = "text/event-stream" in request.headers.get("accept", "")
+    job = _track_job(job_manager.submit(_solve_payload, payload, stream=True))
+    solver_metrics.record_request("stream")
+    return StreamingResponse(
+        _stream_job_events(job, sse),
+        media_type="text/event-stream" if sse else "application/x-ndjson",
+    )
+
+
+def _request_deadline(request: Request) -> Optional[float]:
+    try:
+        budget = float(request.headers.get(DEADLINE_HEADER) or 0)
+    except ValueError:
+        return None
+    return time.monotonic() + budget if budget > 0 else None
+
+
+async def _solve_and_wait(payload: Dict[str, Any], request: Request, response: Response) -> Dict[str, Any]:
+    """Wait for the solve while the client is still there.
+
+    A client that disconnects, or whose X-Solver-Deadline-Sec budget runs out,
+    gives up its claim on the job; once nobody waits for it any more the job
+    is cancelled, which stops CP-SAT within a stop-poll interval. At the
+    deadline the best timetable found so far is returned.
+    """
+    deadline = _request_deadline(request)
+    job, cache_state = _submit_solve(payload)
+    solver_metrics.record_request(cache_state)
+    response.headers["X-Solver-Cache"] = cache_state
+    finished = asyncio.wrap_future(job.finished)
+    abandoned: Optional[str] = None
+    while not finished.done():
+        await asyncio.wait([finished], timeout=DISCONNECT_POLL_INTERVAL_SEC)
+        if finished.done():
+            break
+        if await request.is_disconnected():
+            abandoned = "disconnect"
+        elif deadline is not None and time.monotonic() >= deadline:
+            abandoned = "deadline"
+        else:
+            continue
+        break
+    cancelled = _release_job(job)
+    if abandoned is not None:
+        solver_metrics.record_abandoned(abandoned)
+        if abandoned == "disconnect":
+            return {"ok": False, "error": "Client disconnected"}
+        if not cancelled and not finished.done():
+            # Other requests still wait for this solve; it keeps running for them.
+            return {"ok": False, "error": "Deadline exceeded"}
+        # Cancelled: the worker returns its incumbent within a stop-poll interval.
+        await finished
+    if job.status == JOB_FAILED:
+        return {"ok": False, "error": f"Solver job failed: {job.error}"}
+    if job.result is None:
+        return {"ok": False, "error": "Solver job cancelled"}
+    return job.result
+
+
+async def _read_payload(request: Request) -> Tuple[Optional[Dict[str, Any]], Optional[JSONResponse]]:
+    """Decoded JSON or msgpack body (see ingest.py), or an error response."""
+    content_type = request.headers.get("content-type", "")
+    if is_msgpack(content_type) and msgpack is None:
+        return None, JSONResponse(
+            status_code=415, content={"ok": False, "error": "msgpack bodies need the msgpack package"}
+        )
+    try:
+        return decode_payload(await request.body(), content_type), None
+    except ValueError as exc:
+        return None, JSONResponse(status_code=400, content={"ok": False, "error": str(exc)})
+
+
+def _negotiate_layout(request: Request) -> Tuple[Optional[str], Optional[JSONResponse]]:
+    """Layout asked for by ?format= / the Accept header (see compact.py), or an error response."""
+    accept = request.headers.get("accept", "")
+    layout = response_layout(request.query_params.get("format"), accept)
+    if layout is None:
+        return None, JSONResponse(
+            status_code=400, content={"ok": False, "error": "format must be full, grid or starts"}
+        )
+    if wants_msgpack(accept) and msgpack is None:
+        return None, JSONResponse(
+            status_code=406, content={"ok": False, "error": "msgpack responses need the msgpack package"}
+        )
+    return layout, None
+
+
+def _result_starts(payload: Dict[str, Any], result: Dict[str, Any]) -> set:
+    """Placed (combo_id, day, hour) starts, recovered from the result grids."""
+    structural = (result.get("config") or {}).get("structural") or {}
+    subject_by_id = {s["_id"]: s for s in (_normalize_id(s) for s in payload.get("subjects", []))}
+    subject_of = {str(c.get("_id") or c.get("id")): str(c.get("subject_id")) for c in payload.get("combos", [])}
+
+    def _block_of(combo_id: str) -> int:
+        subject = subject_by_id.get(subject_of.get(combo_id))
+        if subject is None:
+            return 0
+        if subject.get("type") == "lab":
+            return int(structural.get("labBlockSize", 2))
+        return int(structural.get("theoryBlockSize", 1))
+
+    starts, _ = _previous_lesson_starts(result["class_timetables"], _block_of)
+    # Combos without classes only show up in the teacher grids.
+    faculty_starts, _ = _previous_lesson_starts(result.get("faculty_timetables") or {}, _block_of)
+    return starts | faculty_starts
+
+
+def _shaped_response(
+    request: Request, response: Response, payload: Dict[str, Any], result: Dict[str, Any], layout: str
+) -> Response:
+    if layout == "starts" and isinstance(result.get("class_timetables"), dict):
+        pool_starts = [
+            _result_starts(payload, {**member, "config": result.get("config")})
+            for member in result.get("solutionPool") or []
+        ]
+        result = compact_result(result, layout, _result_starts(payload, result), pool_starts)
+    else:
+        result = compact_result(result, layout)
+    return encode_response(
+        result,
+        request.headers.get("accept", ""),
+        request.headers.get("accept-encoding", ""),
+        headers=dict(response.headers),
+    )
+
+
+@app.post("/solve")
+async def solve(request: Request, response: Response) -> Any:
+    """Solve and wait. ?format=grid|starts (or Accept: application/json;
+    format=...) selects a compact layout; Accept: application/msgpack and
+    Accept-Encoding: gzip select the encoding (see compact.py)."""
+    layout, error = _negotiate_layout(request)
+    if error is not None:
+        return error
+    payload, error = await _read_payload(request)
+    if error is not None:
+        return error
+    return _shaped_response(
+        request, response, payload, await _solve_and_wait(payload, request, response), layout
+    )
+
+
+@app.post("/repair")
+async def repair(request: Request, response: Response) -> Any:
+    """Re-solve only the classes a change touches; the rest of the timetable is kept.
+
+    Body: a /solve payload that already reflects the change, plus the current
+    timetable as previousTimetable and changes {"classes", "teachers", "days"}.
+    constraintConfig.repair.neighborhood widens the freed set. Response
+    layout and encoding are negotiated as for /solve.
+    """
+    layout, error = _negotiate_layout(request)
+    if error is not None:
+        return error
+    payload, error = await _read_payload(request)
+    if error is not None:
+        return error
+    if not payload.get("previousTimetable") or not isinstance(payload.get("changes"), dict):
+        return JSONResponse(
+            status_code=400,
+            content={"ok": False, "error": "repair needs previousTimetable and a changes object"},
+        )
+    payload = {**payload, "repair": True}
+    return _shaped_response(
+        request, response, payload, await _solve_and_wait(payload, request, response), layout
+    )
+
+
+@app.post("/replay")
+async def replay(request: Request) -> Any:
+    """Re-solve a dumped model (see replay.py) with the given SatParameters.
+
+    Body: {"dump": <directory name under SOLVER_MODEL_DUMP_DIR>, "params",
+    "timeLimitSec", "numWorkers", "randomSeed", "placements"}.
+    """
+    body, error = await _read_payload(request)
+    if error is not None:
+        return error
+    try:
+        check_replay_request(body)
+    except ValueError as exc:
+        return JSONResponse(status_code=400, content={"ok": False, "error": str(exc)})
+    root = dump_root()
+    path = os.path.realpath(os.path.join(root, str(body.get("dump") or "")))
+    if os.path.dirname(path) != os.path.realpath(root) or not os.path.isdir(path):
+        return JSONResponse(
+            status_code=404, content={"ok": False, "error": f"Model dump not found: {body.get('dump')}"}
+        )
+    job = job_manager.submit(_replay_dump, {**body, "path": path})
+    await job_manager.wait(job)
+    if job.status == JOB_FAILED:
+        return {"ok": False, "error": f"Replay job failed: {job.error}"}
+    if job.result is None:
+        return {"ok": False, "error": "Replay job cancelled"}
+    return job.result
@@ -0,0 +1,106 @@
+# backend/solver/bench_ingest.py
+
+# Benchmark: request body parsing plus id normalization, per wire format.
+#
+#   python bench_ingest.py --classes 400 --repeat 20
+#
+# "json" is the current path (json.loads + the copying normalization pass).
+# The other variants parse with orjson / msgpack, with and without a
+# pre-normalized payload (normalizedIds), when those packages are
+# installed. Reports the best parse / normalize / combined time over
+# --repeat runs and the tracemalloc peak of one combined run.
+import argparse
+import json
+import time
+import tracemalloc
+from typing import Any, Callable, Dict
+
+from app import _normalize_entities
+from compact import msgpack
+from ingest import decode_payload, orjson
+from instance_generator import generate_instance
+
+
+def _best_ms(fn: Callable[[], Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return round(best * 1000, 2)
+
+
+def _measure(decode: Callable[[], Dict[str, Any]], repeat: int) -> Dict[str, float]:
+    def _run() -> None:
+        _normalize_entities(decode())
+
+    parsed = decode()
+    tracemalloc.start()
+    _run()
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "parse_ms": _best_ms(decode, repeat),
+        "normalize_ms": _best_ms(lambda: _normalize_entities(parsed), repeat),
+        "total_ms": _best_ms(_run, repeat),
+        "peak_mb": round(peak / 2**20, 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark payload parsing and normalization.")
+    parser.add_argument("--classes", type=int, default=400)
+    parser.add_argument("--teachers", type=int, default=None)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    payload = generate_instance(
+        num_classes=args.classes,
+        num_teachers=args.teachers or int(args.classes * 2.5),
+        seed=args.seed,
+    )
+    faculties, subjects, classes, combos = _normalize_entities(payload)
+    normalized = {
+        **payload,
+        "faculties": faculties,
+        "subjects": subjects,
+        "classes": classes,
+        "combos": combos,
+        "normalizedIds": True,
+    }
+
+    bodies = {"json": json.dumps(payload).encode("utf-8")}
+    variants = {"json": lambda: json.loads(bodies["json"])}
+    if orjson is not None:
+        bodies["json (normalizedIds)"] = orjson.dumps(normalized)
+        variants["orjson"] = lambda: decode_payload(bodies["json"], "application/json")
+        variants["orjson (normalizedIds)"] = lambda: decode_payload(
+            bodies["json (normalizedIds)"], "application/json"
+        )
+    if msgpack is not None:
+        bodies["msgpack"] = msgpack.packb(payload, use_bin_type=True)
+        bodies["msgpack (normalizedIds)"] = msgpack.packb(normalized, use_bin_type=True)
+        variants["msgpack"] = lambda: decode_payload(bodies["msgpack"], "application/msgpack")
+        variants["msgpack (normalizedIds)"] = lambda: decode_payload(
+            bodies["msgpack (normalizedIds)"], "application/msgpack"
+        )
+
+    print(
+        json.dumps(
+            {
+                "classes": args.classes,
+                "combos": len(payload["combos"]),
+                "body_bytes": {name: len(body) for name, body in bodies.items()},
+                "parse_and_normalize": {name: _measure(fn, args.repeat) for name, fn in variants.items()},
+                "skipped": [
+                    name for name, module in (("orjson", orjson), ("msgpack", msgpack)) if module is None
+                ],
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# backend/solver/bench_lean.py
+
+# Benchmark: solver.leanModel on vs. off.
+#
+#   python bench_lean.py --classes 60 --availability 0.2 --time-limit 30
+#
+# Builds the same instance both ways and reports the variables/constraints
+# each constraint family adds, the totals and the drop, plus the build time
+# and the status/objective reached within the time limit. --all-families
+# also turns on the optional occupancy-based families (recovery, daily
+# minimum, weekly load, boundary preference).
+import argparse
+import copy
+import json
+import time
+from typing import Any, Dict
+
+from app import _build_model, _new_solver
+from instance_generator import generate_instance
+
+OPTIONAL_FAMILIES = {
+    "teacherRecoveryBreak": {"enabled": True, "hard": False, "weight": 5},
+    "classDailyMinimumLoad": {"enabled": True, "hard": False, "weight": 5},
+    "teacherWeeklyLoadBalance": {"enabled": True},
+    "teacherBoundaryPreference": {"enabled": True},
+}
+
+
+def measure(payload: Dict[str, Any], lean: bool, time_limit: float, workers: int) -> Dict[str, Any]:
+    payload = copy.deepcopy(payload)
+    payload["constraintConfig"]["solver"] = {"timeLimitSec": time_limit, "leanModel": lean}
+    start = time.perf_counter()
+    built = _build_model(payload)
+    build_sec = time.perf_counter() - start
+    solver = _new_solver(built, workers)
+    status = solver.Solve(built.model)
+    stats = built.stats.as_dict()
+    return {
+        "build_sec": round(build_sec, 3),
+        "model": stats["model"],
+        "families": stats["families"],
+        "status": solver.StatusName(status),
+        "objective": solver.ObjectiveValue() if built.has_objective else None,
+        "solve_sec": round(solver.WallTime(), 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the lean model mode.")
+    parser.add_argument("--classes", type=int, default=60)
+    parser.add_argument("--teachers", type=int, default=None)
+    parser.add_argument("--availability", type=float, default=0.2)
+    parser.add_argument("--all-families", action="store_true")
+    parser.add_argument("--time-limit", type=float, default=30.0)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    payload = generate_instance(
+        num_classes=args.classes,
+        num_teachers=args.teachers or int(args.classes * 2.5),
+        availability_density=args.availability,
+        seed=args.seed,
+        constraint_config=OPTIONAL_FAMILIES if args.all_families else None,
+    )
+    full = measure(payload, False, args.time_limit, args.workers)
+    lean = measure(payload, True, args.time_limit, args.workers)
+    families = sorted(set(full["families"]) | set(lean["families"]))
+    zero = {"variables": 0, "constraints": 0}
+    print(
+        json.dumps(
+            {
+                "classes": args.classes,
+                "drop": {
+                    key: full["model"][key] - lean["model"][key] for key in ("variables", "constraints")
+                },
+                "families": {
+                    name: {
+                        "full": full["families"].get(name, zero),
+                        "lean": lean["families"].get(name, zero),
+                    }
+                    for name in families
+                    if full["families"].get(name, zero) != lean["families"].get(name, zero)
+                },
+                "full": {k: v for k, v in full.items() if k != "families"},
+                "lean": {k: v for k, v in lean.items() if k != "families"},
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# backend/solver/bench_lns.py
+
+# Benchmark: the custom LNS driver vs. a plain solver.Solve on the same
+# model and time budget.
+#
+#   python bench_lns.py --classes 120 --time-limit 120 --iteration-limit 2
+#
+# Records (elapsed, objective) for every improvement of both runs and
+# reports the objective each one had reached at a few checkpoints.
+import argparse
+import copy
+import json
+import time
+from typing import Any, Dict, List, Optional
+
+from ortools.sat.python import cp_model
+
+from app import _build_model, _new_solver, _solve_built_model
+from instance_generator import generate_instance
+
+
+class _Trajectory(cp_model.CpSolverSolutionCallback):
+    def __init__(self) -> None:
+        super().__init__()
+        self.points: List[Dict[str, float]] = []
+
+    def on_solution_callback(self) -> None:
+        self.points.append({"elapsed_sec": round(self.WallTime(), 4), "objective": self.ObjectiveValue()})
+
+
+def _objective_at(points: List[Dict[str, Any]], elapsed: float) -> Optional[float]:
+    reached = [p["objective"] for p in points if p["elapsed_sec"] <= elapsed]
+    return min(reached) if reached else None
+
+
+def plain(payload: Dict[str, Any], time_limit: float, workers: int) -> List[Dict[str, Any]]:
+    payload = copy.deepcopy(payload)
+    payload["constraintConfig"]["solver"] = {"timeLimitSec": time_limit}
+    built = _build_model(payload)
+    trajectory = _Trajectory()
+    solver = _new_solver(built, workers)
+    solver.Solve(built.model, trajectory)
+    return trajectory.points
+
+
+def lns(
+    payload: Dict[str, Any], time_limit: float, workers: int, initial: float, iteration: float
+) -> Dict[str, Any]:
+    payload = copy.deepcopy(payload)
+    payload["constraintConfig"]["solver"] = {
+        "timeLimitSec": time_limit,
+        "lns": {"enabled": True, "initialTimeLimitSec": initial, "iterationTimeLimitSec": iteration},
+    }
+    result = _solve_built_model(_build_model(payload), num_workers=workers)
+    return result.get("lns") or {"trajectory": [], "status": result.get("status")}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the LNS driver against plain CP-SAT.")
+    parser.add_argument("--classes", type=int, default=120)
+    parser.add_argument("--teachers", type=int, default=None)
+    parser.add_argument("--time-limit", type=float, default=120.0)
+    parser.add_argument("--initial-limit", type=float, default=None, help="default: 20%% of the time limit")
+    parser.add_argument("--iteration-limit", type=float, default=2.0)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    payload = generate_instance(
+        num_classes=args.classes,
+        num_teachers=args.teachers or int(args.classes * 2.5),
+        seed=args.seed,
+    )
+    initial = args.initial_limit or 0.2 * args.time_limit
+
+    started = time.perf_counter()
+    plain_points = plain(payload, args.time_limit, args.workers)
+    plain_sec = time.perf_counter() - started
+    started = time.perf_counter()
+    report = lns(payload, args.time_limit, args.workers, initial, args.iteration_limit)
+    lns_sec = time.perf_counter() - started
+
+    checkpoints = [round(args.time_limit * f, 2) for f in (0.25, 0.5, 0.75, 1.0)]
+    print(
+        json.dumps(
+            {
+                "classes": args.classes,
+                "combos": len(payload["combos"]),
+                "checkpoints": [
+                    {
+                        "elapsed_sec": t,
+                        "plain": _objective_at(plain_points, t),
+                        "lns": _objective_at(report["trajectory"], t),
+                    }
+                    for t in checkpoints
+                ],
+                "plain": {"run_sec": round(plain_sec, 2), "improvements": len(plain_points)},
+                "lns": {
+                    "run_sec": round(lns_sec, 2),
+                    "iterations": report.get("iterations"),
+                    "improvements": report.get("improvements"),
+                    "neighborhoods": report.get("neighborhoods"),
+                },
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
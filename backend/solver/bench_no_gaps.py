@@ -0,0 +1,80 @@
+# backend/solver/bench_no_gaps.py
+
+# Benchmark: no-gaps encodings ("pairwise" vs "chain").
+#
+#   python bench_no_gaps.py --sizes 10,40,120 --hours 8,10
+#
+# Reports model size, build time and time-to-first-feasible for each
+# encoding on the same synthetic instance.
+import argparse
+import copy
+import json
+import time
+from typing import Any, Dict, List
+
+from ortools.sat.python import cp_model
+
+from app import _build_model
+from instance_generator import generate_instance
+
+
+class _FirstSolution(cp_model.CpSolverSolutionCallback):
+    def __init__(self) -> None:
+        super().__init__()
+        self.first_solution_sec = None
+
+    def on_solution_callback(self) -> None:
+        if self.first_solution_sec is None:
+            self.first_solution_sec = self.WallTime()
+        self.StopSearch()
+
+
+def measure(payload: Dict[str, Any], encoding: str, time_limit: float, workers: int) -> Dict[str, Any]:
+    payload = copy.deepcopy(payload)
+    payload["constraintConfig"]["noGaps"] = {"hard": True, "encoding": encoding}
+    start = time.perf_counter()
+    built = _build_model(payload)
+    build_sec = time.perf_counter() - start
+    proto = built.model.Proto()
+
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = time_limit
+    solver.parameters.num_search_workers = workers
+    solver.parameters.random_seed = 1
+    callback = _FirstSolution()
+    status = solver.Solve(built.model, callback)
+    return {
+        "encoding": encoding,
+        "variables": len(proto.variables),
+        "constraints": len(proto.constraints),
+        "build_sec": round(build_sec, 4),
+        "first_feasible_sec": None if callback.first_solution_sec is None else round(callback.first_solution_sec, 4),
+        "status": solver.StatusName(status),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="10,40,120", help="comma separated class counts")
+    parser.add_argument("--hours", default="8", help="comma separated hoursPerDay values")
+    parser.add_argument("--time-limit", type=float, default=60.0)
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    results: List[Dict[str, Any]] = []
+    for hours in [int(h) for h in args.hours.split(",")]:
+        for num_classes in [int(n) for n in args.sizes.split(",")]:
+            payload = generate_instance(
+                num_classes=num_classes,
+                num_teachers=max(2, int(num_classes * 2.5)),
+                hours_per_day=hours,
+            )
+            for encoding in ("pairwise", "chain"):
+                row = measure(payload, encoding, args.time_limit, args.workers)
+                row.update({"classes": num_classes, "hoursPerDay": hours})
+                results.append(row)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+# backend/solver/bench_placement.py
+
+# Benchmark: legacy per-slot candidate loop vs. vectorized placement stage.
+#
+#   python bench_placement.py --classes 120 --teachers 300
+#
+# Both variants build the x variables and the class/teacher/subject cover
+# lists; the script checks they produce identical candidates and covers.
+# "generation" times use plain integers in place of BoolVars so the
+# (unchanged) cost of CpModel.NewBoolVar is reported separately.
+import argparse
+import itertools
+import json
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+from ortools.sat.python import cp_model
+
+from app import _normalize_id, _required_hours
+from instance_generator import generate_instance
+from placement import generate_placements
+
+
+def _prepare(payload: Dict[str, Any]) -> Dict[str, Any]:
+    cfg = payload["constraintConfig"]
+    subjects = [_normalize_id(s) for s in payload["subjects"]]
+    classes = [_normalize_id(c) for c in payload["classes"]]
+    avail = cfg.get("teacherAvailability") or {}
+    return {
+        "combos": payload["combos"],
+        "class_by_id": {c["_id"]: c for c in classes},
+        "subject_by_id": {s["_id"]: s for s in subjects},
+        "required_hours_by_class_subject": {
+            c["_id"]: {s["_id"]: _required_hours(c, s) for s in subjects} for c in classes
+        },
+        "days_per_week": cfg["schedule"]["daysPerWeek"],
+        "hours_per_day": cfg["schedule"]["hoursPerDay"],
+        "break_hours_set": set(cfg["schedule"]["breakHours"]),
+        "lab_block_size": 2,
+        "theory_block_size": 1,
+        "teacher_avail_enabled": bool(avail.get("enabled")),
+        "teacher_avail_hard": True,
+        "teacher_avail_global": set(),
+        "teacher_avail_by_teacher": {
+            tid: {(s["day"], s["hour"]) for s in slots}
+            for tid, slots in (avail.get("unavailableSlotsByTeacher") or {}).items()
+        },
+    }
+
+
+def legacy_candidates(new_var: Callable[[str], Any], inputs: Dict[str, Any]) -> Tuple[Dict, Dict, Dict, Dict]:
+    """The nested loop the model builder used before the vectorized stage."""
+    combos = inputs["combos"]
+    class_by_id = inputs["class_by_id"]
+    subject_by_id = inputs["subject_by_id"]
+    required = inputs["required_hours_by_class_subject"]
+    DAYS_PER_WEEK = inputs["days_per_week"]
+    HOURS_PER_DAY = inputs["hours_per_day"]
+    break_hours_set = inputs["break_hours_set"]
+    teacher_avail_enabled = inputs["teacher_avail_enabled"]
+    teacher_avail_hard = inputs["teacher_avail_hard"]
+    teacher_avail_global = inputs["teacher_avail_global"]
+    teacher_avail_by_teacher = inputs["teacher_avail_by_teacher"]
+
+    def _is_teacher_unavailable(fid: str, day: int, hour: int) -> bool:
+        key = (day, hour)
+        if key in teacher_avail_global:
+            return True
+        teacher_slots = teacher_avail_by_teacher.get(fid)
+        return bool(teacher_slots and key in teacher_slots)
+
+    x: Dict[Tuple[str, int, int], Any] = {}
+    covers: Dict[Tuple[str, int, int], List[Any]] = {}
+    teacher_covers: Dict[Tuple[str, int, int], List[Any]] = {}
+    subject_covers: Dict[Tuple[str, int, int, str], List[Any]] = {}
+    for combo in combos:
+        combo_id = combo["_id"]
+        class_ids = [cid for cid in (combo.get("class_ids") or []) if cid in class_by_id]
+        if not class_ids:
+            continue
+        subj = subject_by_id.get(combo["subject_id"])
+        if not subj:
+            continue
+        if any(required[cid].get(combo["subject_id"], 0) <= 0 for cid in class_ids):
+            continue
+        block = inputs["lab_block_size"] if subj.get("type") == "lab" else inputs["theory_block_size"]
+        max_days_for_combo = min(
+            [int(class_by_id[cid].get("days_per_week") or DAYS_PER_WEEK) for cid in class_ids] or [DAYS_PER_WEEK]
+        )
+        for day in range(max_days_for_combo):
+            for hour in range(HOURS_PER_DAY):
+                if hour in break_hours_set:
+                    continue
+                if hour + block > HOURS_PER_DAY:
+                    continue
+                if any(h in break_hours_set for h in range(hour, hour + block)):
+                    continue
+                violates_availability = False
+                if teacher_avail_enabled:
+                    for fid in combo.get("faculty_ids", []):
+                        if any(_is_teacher_unavailable(fid, day, h) for h in range(hour, hour + block)):
+                            violates_availability = True
+                            break
+                    if teacher_avail_hard and violates_availability:
+                        continue
+                var = new_var(f"x_{combo_id}_{day}_{hour}")
+                x[(combo_id, day, hour)] = var
+                for h in range(hour, hour + block):
+                    for class_id in class_ids:
+                        covers.setdefault((class_id, day, h), []).append(var)
+                        subject_covers.setdefault((class_id, day, h, combo["subject_id"]), []).append(var)
+                    for fid in combo.get("faculty_ids", []):
+                        teacher_covers.setdefault((fid, day, h), []).append(var)
+    return x, covers, teacher_covers, subject_covers
+
+
+def vectorized_candidates(new_var: Callable[[str], Any], inputs: Dict[str, Any]) -> Tuple[Dict, Dict, Dict, Dict]:
+    placements = generate_placements(**inputs)
+    keys = placements.keys()
+    x_vars = [new_var(f"x_{c}_{d}_{h}") for (c, d, h) in keys]
+    x = dict(zip(keys, x_vars))
+    covers = placements.class_covers(x_vars)
+    teacher_covers = placements.teacher_covers(x_vars)
+    subject_covers = placements.subject_covers(x_vars)
+    return x, covers, teacher_covers, subject_covers
+
+
+def _as_keys(result: Tuple[Dict, Dict, Dict, Dict]) -> Tuple[List, Dict, Dict, Dict]:
+    x, covers, teacher_covers, subject_covers = result
+    key_of = {var: key for key, var in x.items()}
+    to_keys = lambda groups: {k: [key_of[v] for v in vs] for k, vs in groups.items()}
+    return list(x.keys()), to_keys(covers), to_keys(teacher_covers), to_keys(subject_covers)
+
+
+def _int_vars() -> Callable[[str], int]:
+    counter = itertools.count()
+    return lambda _name: next(counter)
+
+
+def _time(fn, inputs: Dict[str, Any], repeats: int, with_model: bool) -> Tuple[float, Any]:
+    best = float("inf")
+    result = None
+    for _ in range(repeats):
+        new_var = cp_model.CpModel().NewBoolVar if with_model else _int_vars()
+        start = time.perf_counter()
+        result = fn(new_var, inputs)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--classes", type=int, default=120)
+    parser.add_argument("--teachers", type=int, default=300)
+    parser.add_argument("--subjects", type=int, default=8)
+    parser.add_argument("--availability", type=float, default=0.1)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    payload = generate_instance(
+        num_classes=args.classes,
+        num_teachers=args.teachers,
+        subjects_per_class=args.subjects,
+        availability_density=args.availability,
+    )
+    inputs = _prepare(payload)
+    legacy_gen_sec, legacy = _time(legacy_candidates, inputs, args.repeats, with_model=False)
+    vector_gen_sec, vector = _time(vectorized_candidates, inputs, args.repeats, with_model=False)
+    legacy_sec, _ = _time(legacy_candidates, inputs, args.repeats, with_model=True)
+    vector_sec, _ = _time(vectorized_candidates, inputs, args.repeats, with_model=True)
+    print(
+        json.dumps(
+            {
+                "classes": args.classes,
+                "teachers": args.teachers,
+                "placements": len(vector[0]),
+                "identical": _as_keys(legacy) == _as_keys(vector),
+                "generation": {
+                    "legacy_sec": round(legacy_gen_sec, 4),
+                    "vectorized_sec": round(vector_gen_sec, 4),
+                    "speedup": round(legacy_gen_sec / vector_gen_sec, 2),
+                },
+                "with_var_creation": {
+                    "legacy_sec": round(legacy_sec, 4),
+                    "vectorized_sec": round(vector_sec, 4),
+                    "speedup": round(legacy_sec / vector_sec, 2),
+                },
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
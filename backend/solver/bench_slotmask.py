@@ -0,0 +1,128 @@
+# backend/solver/bench_slotmask.py
+
+# Micro-benchmark: set-lookup slot checks vs. the SlotMasks bitsets.
+#
+#   python bench_slotmask.py --teachers 300 --days 6 --hours 8 --repeat 5
+#
+# Runs every teacher x day x hour x block availability check (block 1 and
+# the lab block) and every block-start check (every block size) both ways,
+# asserts the answers agree, and reports the best time over --repeat runs
+# plus the one-off mask build time.
+import argparse
+import json
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+from app import _normalize_slot_list, _normalize_teacher_slot_map
+from instance_generator import generate_instance
+from slotmask import SlotMasks
+
+
+def _best_ms(fn: Callable[[], Any], repeat: int) -> Tuple[float, Any]:
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return round(best * 1000, 3), result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark bitset slot masks against set lookups.")
+    parser.add_argument("--teachers", type=int, default=300)
+    parser.add_argument("--classes", type=int, default=None)
+    parser.add_argument("--days", type=int, default=6)
+    parser.add_argument("--hours", type=int, default=8)
+    parser.add_argument("--availability", type=float, default=0.2)
+    parser.add_argument("--lab-block", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    payload = generate_instance(
+        num_classes=args.classes or max(1, int(args.teachers / 2.5)),
+        num_teachers=args.teachers,
+        days_per_week=args.days,
+        hours_per_day=args.hours,
+        availability_density=args.availability,
+        seed=args.seed,
+    )
+    schedule = payload["constraintConfig"]["schedule"]
+    availability = payload["constraintConfig"]["teacherAvailability"]
+    days, hours = schedule["daysPerWeek"], schedule["hoursPerDay"]
+    break_hours = set(schedule["breakHours"])
+    unavailable_global = set(_normalize_slot_list(availability.get("globallyUnavailableSlots", [])))
+    unavailable_by_teacher = _normalize_teacher_slot_map(availability.get("unavailableSlotsByTeacher", {}))
+    teacher_ids = [f["_id"] for f in payload["faculties"]]
+    blocks = sorted({1, args.lab_block})
+    queries = [
+        (fid, day, hour, block)
+        for fid in teacher_ids
+        for day in range(days)
+        for hour in range(hours)
+        for block in blocks
+    ]
+    starts = [(start, block) for block in range(1, hours + 1) for start in range(hours)]
+
+    def _is_teacher_unavailable(fid: str, day: int, hour: int) -> bool:
+        key = (day, hour)
+        if key in unavailable_global:
+            return True
+        teacher_slots = unavailable_by_teacher.get(fid)
+        return bool(teacher_slots and key in teacher_slots)
+
+    def sets_availability() -> List[bool]:
+        return [
+            any(_is_teacher_unavailable(fid, day, h) for h in range(hour, min(hours, hour + block)))
+            for fid, day, hour, block in queries
+        ]
+
+    def sets_block_starts() -> List[bool]:
+        return [
+            start + block <= hours and not any(h in break_hours for h in range(start, start + block))
+            for start, block in starts
+        ]
+
+    def build() -> SlotMasks:
+        masks = SlotMasks(days, hours, break_hours, unavailable_global, unavailable_by_teacher)
+        for fid in teacher_ids:
+            for block in blocks:
+                masks.busy_starts(fid, block)
+        for block in range(1, hours + 1):
+            masks.block_starts(block)
+        return masks
+
+    build_ms, masks = _best_ms(build, args.repeat)
+
+    def masks_availability() -> List[bool]:
+        return [masks.teacher_busy(fid, day, hour, block) for fid, day, hour, block in queries]
+
+    def masks_block_starts() -> List[bool]:
+        return [bool(masks.block_starts(block) >> start & 1) for start, block in starts]
+
+    report: Dict[str, Any] = {
+        "teachers": len(teacher_ids),
+        "days": days,
+        "hours": hours,
+        "availability_checks": len(queries),
+        "block_start_checks": len(starts),
+        "mask_build_ms": build_ms,
+    }
+    for name, slow, fast in (
+        ("availability", sets_availability, masks_availability),
+        ("block_starts", sets_block_starts, masks_block_starts),
+    ):
+        sets_ms, expected = _best_ms(slow, args.repeat)
+        masks_ms, got = _best_ms(fast, args.repeat)
+        assert got == expected, f"{name}: bitset answers differ from set lookups"
+        report[name] = {
+            "sets_ms": sets_ms,
+            "masks_ms": masks_ms,
+            "speedup": round(sets_ms / masks_ms, 2) if masks_ms else None,
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# backend/solver/bench_symmetry.py
+
+# Benchmark: symmetry breaking for interchangeable combos on vs. off.
+#
+#   python bench_symmetry.py --sizes 2,4,8 --split 0.5
+#
+# Instances get identical twin combos (same classes, subject and teacher).
+# Reports time-to-first-feasible, and the status/bound reached with the
+# full time limit (small sizes are expected to be proven OPTIMAL).
+import argparse
+import copy
+import json
+import time
+from typing import Any, Dict, List
+
+from app import _build_model, _new_solver
+from bench_no_gaps import _FirstSolution
+from instance_generator import generate_instance
+
+
+def measure(payload: Dict[str, Any], enabled: bool, time_limit: float, workers: int) -> Dict[str, Any]:
+    payload = copy.deepcopy(payload)
+    payload["constraintConfig"]["symmetryBreaking"] = {"enabled": enabled}
+    payload["constraintConfig"]["solver"] = {"timeLimitSec": time_limit}
+
+    built = _build_model(payload)
+    first = _FirstSolution()
+    solver = _new_solver(built, workers)
+    solver.Solve(built.model, first)
+
+    built = _build_model(payload)
+    solver = _new_solver(built, workers)
+    start = time.perf_counter()
+    status = solver.Solve(built.model)
+    solve_sec = time.perf_counter() - start
+    return {
+        "symmetryBreaking": enabled,
+        "fixed_to_zero": built.stats.as_dict()["families"].get("symmetry_breaking", {}).get("constraints", 0),
+        "first_feasible_sec": None if first.first_solution_sec is None else round(first.first_solution_sec, 4),
+        "status": solver.StatusName(status),
+        "solve_sec": round(solve_sec, 4),
+        "objective": solver.ObjectiveValue() if solver.StatusName(status) in ("OPTIMAL", "FEASIBLE") else None,
+        "bound": solver.BestObjectiveBound(),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark combo symmetry breaking.")
+    parser.add_argument("--sizes", default="2,4,8", help="comma separated class counts")
+    parser.add_argument("--split", type=float, default=0.5, help="share of combos with a twin")
+    parser.add_argument("--time-limit", type=float, default=60.0)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    results: List[Dict[str, Any]] = []
+    for num_classes in [int(n) for n in args.sizes.split(",")]:
+        payload = generate_instance(
+            num_classes=num_classes,
+            num_teachers=max(2, int(num_classes * 2.5)),
+            split_combo_ratio=args.split,
+            seed=args.seed,
+        )
+        for enabled in (False, True):
+            row = measure(payload, enabled, args.time_limit, args.workers)
+            row.update({"classes": num_classes, "combos": len(payload["combos"])})
+            results.append(row)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
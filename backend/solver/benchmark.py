@@ -0,0 +1,123 @@
+# backend/solver/benchmark.py
+
+# Solver benchmark suite over synthetic instances.
+#
+#   python benchmark.py --suite scale --time-limit 30 --output bench.json
+#
+# Each instance is built with the service's own model builder and solved
+# with the same solver parameters as /solve (no job pool, no cache). One
+# JSON record per instance: build/solve time, model size, objective,
+# bound and status (PRECHECK_FAILED, unsolved, for instances the capacity
+# pre-check rejects).
+import argparse
+import copy
+import json
+import platform
+import time
+from typing import Any, Dict, List
+
+from ortools import __version__ as ortools_version
+from ortools.sat.python import cp_model
+
+from app import _build_model, _new_solver
+from instance_generator import generate_instance
+
+SUITES: Dict[str, List[Dict[str, Any]]] = {
+    "smoke": [
+        {"num_classes": 4, "num_teachers": 10},
+        {"num_classes": 8, "num_teachers": 20, "lab_ratio": 0.25, "fixed_slots_per_class": 2},
+    ],
+    "scale": [
+        {"num_classes": n, "num_teachers": int(n * 2.5)} for n in (10, 20, 40, 80, 120)
+    ],
+    "features": [
+        {"num_classes": 20, "num_teachers": 50},
+        {"num_classes": 20, "num_teachers": 50, "lab_ratio": 0.5},
+        {"num_classes": 20, "num_teachers": 50, "multi_class_ratio": 0.3},
+        {"num_classes": 20, "num_teachers": 50, "availability_density": 0.15},
+        {"num_classes": 20, "num_teachers": 50, "fixed_slots_per_class": 4},
+        {"num_classes": 20, "num_teachers": 50, "num_departments": 4},
+    ],
+}
+
+
+def run_instance(payload: Dict[str, Any], time_limit: float, workers: int) -> Dict[str, Any]:
+    payload = copy.deepcopy(payload)
+    payload.setdefault("constraintConfig", {}).setdefault("solver", {})["timeLimitSec"] = time_limit
+
+    start = time.perf_counter()
+    built = _build_model(payload)
+    build_sec = time.perf_counter() - start
+    proto = built.model.Proto()
+    size = {
+        "variables": len(proto.variables),
+        "constraints": len(proto.constraints),
+        "placements": len(built.x),
+        "warnings": len(built.warnings),
+    }
+    if built.precheck_failures:
+        # /solve rejects these before solving; the model is left empty.
+        return {
+            "status": "PRECHECK_FAILED",
+            "build_sec": round(build_sec, 4),
+            "solve_sec": None,
+            **size,
+            "objective": None,
+            "bound": None,
+            "precheck_failures": len(built.precheck_failures),
+        }
+
+    solver = _new_solver(built, workers)
+    start = time.perf_counter()
+    status = solver.Solve(built.model)
+    solve_sec = time.perf_counter() - start
+
+    solved = status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+    return {
+        "status": solver.StatusName(status),
+        "build_sec": round(build_sec, 4),
+        "solve_sec": round(solve_sec, 4),
+        **size,
+        "objective": solver.ObjectiveValue() if solved and built.has_objective else None,
+        "bound": solver.BestObjectiveBound() if built.has_objective else None,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the solver on synthetic instances.")
+    parser.add_argument("--suite", default="scale", choices=sorted(SUITES))
+    parser.add_argument("--seeds", default="0", help="comma separated instance seeds")
+    parser.add_argument("--time-limit", type=float, default=60.0)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--config", default=None, help="JSON constraintConfig overrides")
+    parser.add_argument("--output", default=None, help="write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    overrides = json.loads(args.config) if args.config else {}
+    results: List[Dict[str, Any]] = []
+    for params in SUITES[args.suite]:
+        for seed in [int(s) for s in args.seeds.split(",")]:
+            payload = generate_instance(**params, constraint_config=overrides, seed=seed)
+            row = {"instance": {**params, "seed": seed}}
+            row.update(run_instance(payload, args.time_limit, args.workers))
+            results.append(row)
+
+    report = {
+        "suite": args.suite,
+        "time_limit_sec": args.time_limit,
+        "workers": args.workers,
+        "config": overrides,
+        "ortools": ortools_version,
+        "python": platform.python_version(),
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+# backend/solver/cache.py
+
+# Content-addressed cache for solve results: in-memory LRU with an optional
+# on-disk tier, both bounded by size and TTL.
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+# Payload fields that influence the built model, the search or the shape of
+# the response. Anything else (request ids, UI metadata) must not split the
+# cache. Requests with side effects (solver.dumpModel) bypass it entirely.
+SOLVE_INPUT_KEYS = (
+    "faculties",
+    "subjects",
+    "classes",
+    "combos",
+    "constraintConfig",
+    "fixed_slots",
+    "fixedSlots",
+    "teacherPreferences",
+    "previousTimetable",
+    "repair",
+    "changes",
+    "DAYS_PER_WEEK",
+    "HOURS_PER_DAY",
+    "BREAK_HOURS",
+    "solver_time_limit_sec",
+    "normalizedIds",
+)
+
+
+def payload_cache_key(payload: Dict[str, Any], random_seed: int, extra: Optional[Dict[str, Any]] = None) -> str:
+    canonical = {key: payload.get(key) for key in SOLVE_INPUT_KEYS if payload.get(key) is not None}
+    canonical["random_seed"] = random_seed
+    if extra:
+        canonical["extra"] = extra
+    blob = json.dumps(canonical, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    def __init__(
+        self,
+        max_entries: int = 64,
+        max_bytes: int = 256 * 1024 * 1024,
+        ttl_sec: float = 3600.0,
+        disk_dir: Optional[str] = None,
+        disk_max_entries: int = 512,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_sec = ttl_sec
+        self.disk_dir = disk_dir
+        self.disk_max_entries = disk_max_entries
+        self._entries: "OrderedDict[str, Tuple[float, int, Dict[str, Any]]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 or bool(self.disk_dir)
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir or "", f"{key}.json")
+
+    def _evict_memory(self) -> None:
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _key, (_stored_at, size, _value) = self._entries.popitem(last=False)
+            self._bytes -= size
+
+    def _put_memory(self, key: str, value: Dict[str, Any], size: int, stored_at: float) -> None:
+        if self.max_entries <= 0 or size > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old[1]
+        self._entries[key] = (stored_at, size, value)
+        self._bytes += size
+        self._evict_memory()
+
+    def _get_disk(self, key: str) -> Optional[Tuple[float, int, Dict[str, Any]]]:
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            stored_at = os.path.getmtime(path)
+            if time.time() - stored_at > self.ttl_sec:
+                os.remove(path)
+                return None
+            with open(path, "r", encoding="utf-8") as fh:
+                blob = fh.read()
+            return stored_at, len(blob), json.loads(blob)
+        except (OSError, ValueError):
+            return None
+
+    def _put_disk(self, key: str, blob: str) -> None:
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as fh:
+                fh.write(blob)
+            os.replace(tmp_path, path)
+            files = [
+                os.path.join(self.disk_dir, name)
+                for name in os.listdir(self.disk_dir)
+                if name.endswith(".json")
+            ]
+            if len(files) > self.disk_max_entries:
+                files.sort(key=os.path.getmtime)
+                for old_path in files[: len(files) - self.disk_max_entries]:
+                    os.remove(old_path)
+        except OSError:
+            # The disk tier is best effort; memory still holds the entry.
+            pass
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if time.time() - entry[0] <= self.ttl_sec:
+                    self._entries.move_to_end(key)
+                    return entry[2]
+                del self._entries[key]
+                self._bytes -= entry[1]
+            disk_entry = self._get_disk(key)
+            if disk_entry is None:
+                return None
+            stored_at, size, value = disk_entry
+            self._put_memory(key, value, size, stored_at)
+            return value
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        if not self.enabled:
+            return
+        blob = json.dumps(value, separators=(",", ":"))
+        with self._lock:
+            self._put_memory(key, value, len(blob), time.time())
+            self._put_disk(key, blob)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes}
@@ -0,0 +1,140 @@
+# backend/solver/compact.py
+
+# Compact encodings of a /solve (or /repair) result, negotiated per request.
+#
+# Layout: ?format=<layout>, or a `format` parameter on the Accept media type
+# (Accept: application/json; format=grid):
+#   full    the usual response (default)
+#   grid    ids {combos, classes, faculties} plus integer-coded day x hour
+#           arrays in ids order: a cell >= 0 indexes ids.combos, -1 is
+#           empty, -2 a break
+#   starts  ids plus the placed starts only, as [combo index, day, hour]
+# grid and starts drop the echoed `classes` and `config`. solutionPool
+# members are re-encoded the same way, sharing ids.
+#
+# Encoding: Accept: application/msgpack (needs the optional msgpack
+# package), and gzip when the client sends Accept-Encoding: gzip.
+import gzip
+import json
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from fastapi import Response
+
+try:
+    import msgpack
+except ImportError:  # optional: only needed for Accept: application/msgpack
+    msgpack = None
+
+LAYOUTS = ("full", "grid", "starts")
+MSGPACK_TYPES = ("application/msgpack", "application/x-msgpack")
+GZIP_MIN_BYTES = 1024
+
+EMPTY_CODE = -1
+BREAK_CODE = -2
+
+_DROPPED_KEYS = ("class_timetables", "faculty_timetables", "classes", "config")
+
+
+def response_layout(query_format: Optional[str], accept: str) -> Optional[str]:
+    """The requested layout, or None when it is not one of LAYOUTS."""
+    value = query_format
+    if not value:
+        for media_range in accept.split(","):
+            for param in media_range.split(";")[1:]:
+                name, _, raw = param.partition("=")
+                if name.strip().lower() == "format":
+                    value = raw.strip().strip('"')
+    value = (value or "full").strip().lower()
+    return value if value in LAYOUTS else None
+
+
+def wants_msgpack(accept: str) -> bool:
+    return any(media_range.split(";")[0].strip().lower() in MSGPACK_TYPES for media_range in accept.split(","))
+
+
+def _code_grid(grid: List[List[Any]], combo_code: Dict[str, int]) -> List[List[int]]:
+    return [
+        [
+            BREAK_CODE if cell == "BREAK" else EMPTY_CODE if cell == -1 or cell is None
+            else combo_code.setdefault(str(cell), len(combo_code))
+            for cell in row
+        ]
+        for row in grid
+    ]
+
+
+def _compact_timetables(
+    result: Dict[str, Any],
+    layout: str,
+    starts: Optional[Iterable[Tuple[str, int, int]]],
+    combo_code: Dict[str, int],
+) -> Dict[str, Any]:
+    if layout == "grid":
+        return {
+            "class_timetables": [_code_grid(grid, combo_code) for grid in result["class_timetables"].values()],
+            "faculty_timetables": [
+                _code_grid(grid, combo_code) for grid in (result.get("faculty_timetables") or {}).values()
+            ],
+        }
+    return {
+        "starts": [
+            [combo_code.setdefault(combo_id, len(combo_code)), day, hour]
+            for combo_id, day, hour in sorted(starts or ())
+        ]
+    }
+
+
+def compact_result(
+    result: Dict[str, Any],
+    layout: str,
+    starts: Optional[Iterable[Tuple[str, int, int]]] = None,
+    pool_starts: Optional[List[Iterable[Tuple[str, int, int]]]] = None,
+) -> Dict[str, Any]:
+    """Re-encode a full result in `layout`. Results without timetables (errors,
+    infeasible requests) and the full layout are returned as they are.
+    `starts` (and `pool_starts`, per solutionPool member) are required for
+    the starts layout."""
+    if layout == "full" or not isinstance(result.get("class_timetables"), dict):
+        return result
+    class_timetables = result["class_timetables"]
+    faculty_timetables = result.get("faculty_timetables") or {}
+    combo_code: Dict[str, int] = {}
+    body = {key: value for key, value in result.items() if key not in _DROPPED_KEYS}
+    body["format"] = layout
+    body.update(_compact_timetables(result, layout, starts, combo_code))
+    if isinstance(result.get("solutionPool"), list):
+        pool = result["solutionPool"]
+        body["solutionPool"] = [
+            {
+                **{key: value for key, value in member.items() if key not in _DROPPED_KEYS},
+                **_compact_timetables(member, layout, member_starts, combo_code),
+            }
+            for member, member_starts in zip(pool, pool_starts or [()] * len(pool))
+        ]
+    body["ids"] = {
+        "combos": list(combo_code),
+        "classes": list(class_timetables),
+        "faculties": list(faculty_timetables),
+    }
+    return body
+
+
+def encode_response(
+    content: Dict[str, Any],
+    accept: str,
+    accept_encoding: str,
+    status_code: int = 200,
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """JSON or msgpack body, gzipped when the client accepts it and it pays off."""
+    headers = {**(headers or {}), "Vary": "Accept, Accept-Encoding"}
+    if wants_msgpack(accept) and msgpack is not None:
+        body = msgpack.packb(content, use_bin_type=True)
+        media_type = "application/msgpack"
+    else:
+        body = json.dumps(content, separators=(",", ":")).encode("utf-8")
+        media_type = "application/json"
+    if "gzip" in accept_encoding.lower() and len(body) >= GZIP_MIN_BYTES:
+        body = gzip.compress(body, compresslevel=5)
+        headers["Content-Encoding"] = "gzip"
+    return Response(content=body, status_code=status_code, media_type=media_type, headers=headers)
@@ -0,0 +1,289 @@
+# backend/solver/decompose.py
+
+# Independent-component decomposition of a /solve payload.
+#
+# Classes and teachers are nodes; every combo joins its classes and teachers.
+# All hard constraints and objective terms are per class, per teacher or per
+# combo, so connected components can be solved as separate CP-SAT models and
+# their timetables merged without changing the optimum.
+from typing import Any, Dict, List, Optional
+
+from objective import merge_breakdowns
+
+ENTITY_KEYS = ("faculties", "classes", "combos", "fixed_slots", "fixedSlots", "previousTimetable")
+
+
+def _entity_id(item: Dict[str, Any]) -> str:
+    return str(item.get("_id") or item.get("id"))
+
+
+def _combo_faculty_ids(combo: Dict[str, Any]) -> List[str]:
+    return [str(x) for x in (combo.get("faculty_ids") or ([combo.get("faculty_id")] if combo.get("faculty_id") else []))]
+
+
+class _UnionFind:
+    def __init__(self) -> None:
+        self.parent: Dict[Any, Any] = {}
+
+    def find(self, node: Any) -> Any:
+        self.parent.setdefault(node, node)
+        root = node
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[node] != root:
+            self.parent[node], node = root, self.parent[node]
+        return root
+
+    def union(self, a: Any, b: Any) -> None:
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[rb] = ra
+
+
+def split_payload(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Split a payload into one sub-payload per connected component.
+
+    Classes/teachers not touched by any combo are gathered into a single
+    extra component so they still get (empty, constraint-checked) timetables.
+    Always returns at least one payload; a single component returns [payload].
+    """
+    faculties = payload.get("faculties") or []
+    classes = payload.get("classes") or []
+    combos = payload.get("combos") or []
+
+    uf = _UnionFind()
+    for f in faculties:
+        uf.find(("f", _entity_id(f)))
+    for c in classes:
+        uf.find(("c", _entity_id(c)))
+    for combo in combos:
+        nodes = [("c", str(cid)) for cid in (combo.get("class_ids") or [])]
+        nodes += [("f", fid) for fid in _combo_faculty_ids(combo)]
+        for node in nodes[1:]:
+            uf.union(nodes[0], node)
+
+    # Component order follows the first class (then teacher) that belongs to it.
+    order: Dict[Any, int] = {}
+    for node in [("c", _entity_id(c)) for c in classes] + [("f", _entity_id(f)) for f in faculties]:
+        order.setdefault(uf.find(node), len(order))
+
+    combo_root: List[Any] = []
+    for combo in combos:
+        nodes = [("c", str(cid)) for cid in (combo.get("class_ids") or [])]
+        nodes += [("f", fid) for fid in _combo_faculty_ids(combo)]
+        combo_root.append(uf.find(nodes[0]) if nodes else None)
+
+    active_roots = {root for root in combo_root if root is not None}
+    if len(active_roots) <= 1:
+        return [payload]
+
+    # Components without combos are merged into one leftover bucket.
+    leftover = len(order)
+    bucket_of = {root: (idx if root in active_roots else leftover) for root, idx in order.items()}
+    bucket_ids = sorted(set(bucket_of.values()))
+    parts: Dict[int, Dict[str, Any]] = {
+        b: {"faculties": [], "classes": [], "combos": [], "fixed_slots": []} for b in bucket_ids
+    }
+    class_bucket: Dict[str, int] = {}
+    for f in faculties:
+        parts[bucket_of[uf.find(("f", _entity_id(f)))]]["faculties"].append(f)
+    for c in classes:
+        b = bucket_of[uf.find(("c", _entity_id(c)))]
+        class_bucket[_entity_id(c)] = b
+        parts[b]["classes"].append(c)
+    for combo, root in zip(combos, combo_root):
+        # Combos without classes or teachers never produce placements; keep
+        # them in the first component so fixed-slot lookups still find them.
+        parts[bucket_of[root] if root is not None else bucket_ids[0]]["combos"].append(combo)
+
+    fixed_slots = payload.get("fixed_slots") or payload.get("fixedSlots") or []
+    for fs in fixed_slots:
+        b = class_bucket.get(str(fs.get("class")), bucket_ids[0])
+        parts[b]["fixed_slots"].append(fs)
+
+    previous = payload.get("previousTimetable")
+    if isinstance(previous, dict) and isinstance(previous.get("class_timetables"), dict):
+        previous = previous["class_timetables"]
+
+    base = {k: v for k, v in payload.items() if k not in ENTITY_KEYS}
+    out: List[Dict[str, Any]] = []
+    for b in bucket_ids:
+        sub = {**base, **parts[b]}
+        if isinstance(previous, dict):
+            sub["previousTimetable"] = {
+                cid: grid for cid, grid in previous.items() if class_bucket.get(str(cid)) == b
+            }
+        out.append(sub)
+    return out
+
+
+# Worst first: the merged phase status is the worst component status.
+_STATUS_ORDER = ("MODEL_INVALID", "INFEASIBLE", "UNKNOWN", "FEASIBLE", "OPTIMAL")
+
+
+def _merged_status(statuses: List[Any]) -> Any:
+    known = [s for s in statuses if s in _STATUS_ORDER]
+    return min(known, key=_STATUS_ORDER.index) if known else (statuses[0] if statuses else None)
+
+
+def _merge_two_phase(results: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Per-phase status is the worst component's, wall time the max."""
+    parts = [r["twoPhase"] for r in results if r.get("twoPhase")]
+    if not parts:
+        return None
+    merged: Dict[str, Any] = {}
+    for phase in ("feasibility", "optimization"):
+        reports = [part[phase] for part in parts if phase in part]
+        if reports:
+            merged[phase] = {
+                "status": _merged_status([r.get("status") for r in reports]),
+                "wall_time_sec": max(r.get("wall_time_sec") or 0.0 for r in reports),
+            }
+    if any("fallback" in part for part in parts):
+        merged["fallback"] = any(part.get("fallback") for part in parts)
+    merged["components"] = len(parts)
+    return merged
+
+
+def _merge_lns(results: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Counts add up; each component's objective and trajectory are kept."""
+    parts = [(i, r["lns"]) for i, r in enumerate(results) if r.get("lns")]
+    if not parts:
+        return None
+    neighborhoods: Dict[str, Dict[str, int]] = {}
+    for _i, report in parts:
+        for kind, counts in report.get("neighborhoods", {}).items():
+            totals = neighborhoods.setdefault(kind, {"tried": 0, "improved": 0})
+            totals["tried"] += counts["tried"]
+            totals["improved"] += counts["improved"]
+    return {
+        "iterations": sum(report["iterations"] for _i, report in parts),
+        "improvements": sum(report["improvements"] for _i, report in parts),
+        "provedOptimal": all(report["provedOptimal"] for _i, report in parts),
+        "neighborhoods": neighborhoods,
+        "components": [
+            {
+                "component": i,
+                "objective": report["objective"],
+                "improvements": report["improvements"],
+                "trajectory": report["trajectory"],
+            }
+            for i, report in parts
+        ],
+    }
+
+
+def merge_results(
+    payload: Dict[str, Any], results: List[Dict[str, Any]], empty_cell: Any, break_cell: Any
+) -> Dict[str, Any]:
+    """Merge per-component /solve responses into one response."""
+    failed = [r for r in results if not r.get("ok")]
+    class_order = {_entity_id(c): i for i, c in enumerate(payload.get("classes") or [])}
+    classes = sorted(
+        [c for r in results for c in r.get("classes", [])],
+        key=lambda c: class_order.get(c["_id"], len(class_order)),
+    )
+    unmet = [u for r in results for u in r.get("unmet_requirements", [])]
+    warnings = [w for r in results for w in r.get("warnings", [])]
+    config = results[0].get("config") if results else {}
+    model_dumps = [d for r in results for d in r.get("modelDumps", [])]
+    repairs = [r["repair"] for r in results if r.get("repair")]
+    repair = (
+        {
+            "classes": sorted(cid for part in repairs for cid in part["classes"]),
+            "freeStarts": sum(part["freeStarts"] for part in repairs),
+            "frozenLessons": sum(part["frozenLessons"] for part in repairs),
+            # Components share no class or teacher, so the counts add up.
+            "modelledClasses": sum(part["modelledClasses"] for part in repairs),
+            "modelledTeachers": sum(part["modelledTeachers"] for part in repairs),
+        }
+        if repairs
+        else None
+    )
+    components = [
+        {
+            "classes": len(r.get("classes", [])),
+            "status": r.get("status"),
+        }
+        for r in results
+    ]
+    two_phase = _merge_two_phase(results)
+    lns = _merge_lns(results)
+
+    if failed:
+        merged = {
+            "ok": False,
+            "error": "; ".join(
+                f"component {i}: {r.get('error')}" for i, r in enumerate(results) if not r.get("ok")
+            ),
+            "status": failed[0].get("status"),
+            "classes": classes,
+            "unmet_requirements": unmet,
+            "warnings": warnings,
+            "config": config,
+            "components": components,
+        }
+        precheck = [p for r in results for p in r.get("precheck", [])]
+        if precheck:
+            merged["precheck"] = precheck
+        conflicts = [c for r in results for c in (r.get("infeasibility") or {}).get("conflicts", [])]
+        if conflicts:
+            merged["infeasibility"] = {
+                "families": sorted({c["family"] for c in conflicts}),
+                "conflicts": conflicts,
+            }
+        if two_phase is not None:
+            merged["twoPhase"] = two_phase
+        if model_dumps:
+            merged["modelDumps"] = model_dumps
+        if repair is not None:
+            merged["repair"] = repair
+        return merged
+
+    class_timetables: Dict[str, Any] = {}
+    faculty_timetables: Dict[str, Any] = {}
+    for r in results:
+        class_timetables.update(r.get("class_timetables", {}))
+        faculty_timetables.update(r.get("faculty_timetables", {}))
+
+    # Faculty grids span the longest class week of the whole payload; a
+    # component's own week may be shorter or (teacher-only bucket) longer.
+    max_days = max([len(grid) for grid in class_timetables.values()] or [0])
+    for fid, grid in faculty_timetables.items():
+        if not grid or max_days == 0:
+            continue
+        if len(grid) > max_days:
+            del grid[max_days:]
+        elif len(grid) < max_days:
+            template = grid[0]
+            grid.extend(
+                [
+                    [break_cell if cell == break_cell else empty_cell for cell in template]
+                    for _ in range(max_days - len(grid))
+                ]
+            )
+
+    statuses = {r.get("status") for r in results}
+    merged = {
+        "ok": True,
+        "status": "OPTIMAL" if statuses == {"OPTIMAL"} else "FEASIBLE",
+        "class_timetables": class_timetables,
+        "faculty_timetables": faculty_timetables,
+        "classes": classes,
+        "unmet_requirements": unmet,
+        "warnings": warnings,
+        "config": config,
+        "components": components,
+    }
+    breakdown = merge_breakdowns([r.get("objectiveBreakdown") for r in results])
+    if breakdown is not None:
+        merged["objectiveBreakdown"] = breakdown
+    if two_phase is not None:
+        merged["twoPhase"] = two_phase
+    if lns is not None:
+        merged["lns"] = lns
+    if model_dumps:
+        merged["modelDumps"] = model_dumps
+    if repair is not None:
+        merged["repair"] = repair
+    return merged
@@ -0,0 +1,43 @@
+# backend/solver/ingest.py
+
+# Request body decoding for the solve endpoints.
+#
+#   Content-Type: application/msgpack   msgpack (needs the optional msgpack
+#                                       package; 415 without it)
+#   anything else                       JSON, parsed with orjson when it is
+#                                       installed, json otherwise
+#
+# A payload with "normalizedIds": true promises what _build_model would
+# otherwise enforce by copying every entity: string `_id`s on faculties,
+# subjects and classes, subjects with a `type`, and combos with a string
+# `_id`/`subject_id` and string `faculty_ids`/`class_ids` lists. The entity
+# lists are then used as they are.
+import json
+from typing import Any, Dict
+
+from compact import MSGPACK_TYPES, msgpack
+
+try:
+    import orjson
+except ImportError:  # optional: faster JSON parsing
+    orjson = None
+
+
+def is_msgpack(content_type: str) -> bool:
+    return content_type.split(";")[0].strip().lower() in MSGPACK_TYPES
+
+
+def decode_payload(body: bytes, content_type: str) -> Dict[str, Any]:
+    """Raises ValueError for a body that is not a JSON/msgpack object."""
+    try:
+        if is_msgpack(content_type):
+            payload = msgpack.unpackb(body, raw=False)
+        elif orjson is not None:
+            payload = orjson.loads(body)
+        else:
+            payload = json.loads(body)
+    except (ValueError, TypeError) as exc:
+        raise ValueError(f"Unreadable request body: {exc}") from exc
+    if not isinstance(payload, dict):
+        raise ValueError("Request body must be an object")
+    return payload
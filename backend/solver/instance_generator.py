@@ -0,0 +1,242 @@
+# backend/solver/instance_generator.py
+
+# Synthetic /solve payloads for benchmarks. Ids are plain strings so the
+# payload can be posted to the service as-is.
+import argparse
+import json
+import random
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+
+def _merge_config(base: Dict[str, Any], override: Dict[str, Any]) -> Dict[str, Any]:
+    out = dict(base)
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(out.get(key), dict):
+            out[key] = _merge_config(out[key], value)
+        else:
+            out[key] = value
+    return out
+
+
+def generate_instance(
+    num_classes: int = 12,
+    num_teachers: int = 30,
+    subjects_per_class: int = 8,
+    lab_ratio: float = 0.2,
+    days_per_week: int = 6,
+    hours_per_day: int = 8,
+    break_hours: Optional[List[int]] = None,
+    availability_density: float = 0.0,
+    multi_class_ratio: float = 0.0,
+    fixed_slots_per_class: int = 0,
+    num_departments: int = 1,
+    split_combo_ratio: float = 0.0,
+    load_factor: float = 0.85,
+    constraint_config: Optional[Dict[str, Any]] = None,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """Build a feasible-looking instance.
+
+    - `lab_ratio`: share of each class's subjects that are labs (2-hour blocks).
+    - `availability_density`: fraction of teacher slots marked unavailable.
+    - `multi_class_ratio`: share of class/subject pairs taught as one combo
+      shared by two classes of the same department.
+    - `fixed_slots_per_class`: clash-free fixed slots pinned per class.
+    - `num_departments`: classes and teachers are split into disjoint groups
+      that never share a combo.
+    - `split_combo_ratio`: share of combos that get an identical twin (same
+      classes, subject and teacher), e.g. two sections of one course.
+    - `load_factor`: fraction of each class's usable slots that is required.
+    """
+    rng = random.Random(seed)
+    break_hours = [hours_per_day // 2] if break_hours is None else list(break_hours)
+    break_set = set(break_hours)
+    usable_per_day = hours_per_day - len(break_set)
+    usable = days_per_week * usable_per_day
+    num_departments = max(1, min(num_departments, num_classes, num_teachers))
+
+    faculties = [{"_id": f"f{i}", "name": f"Teacher {i}"} for i in range(num_teachers)]
+    num_labs = int(round(subjects_per_class * lab_ratio))
+    subjects = []
+    for i in range(subjects_per_class):
+        is_lab = i >= subjects_per_class - num_labs
+        subjects.append(
+            {
+                "_id": f"s{i}",
+                "name": f"Subject {i}",
+                "type": "lab" if is_lab else "theory",
+                "no_of_hours_per_week": 0,
+            }
+        )
+
+    unavailable: Dict[str, List[Dict[str, int]]] = {}
+    if availability_density > 0:
+        for f in faculties:
+            slots = [
+                {"day": d, "hour": h}
+                for d in range(days_per_week)
+                for h in range(hours_per_day)
+                if h not in break_set and rng.random() < availability_density
+            ]
+            if slots:
+                unavailable[f["_id"]] = slots
+    capacity = {f["_id"]: usable - len(unavailable.get(f["_id"], [])) for f in faculties}
+    load = {f["_id"]: 0 for f in faculties}
+
+    # Split ~load_factor of each class's usable slots over its subjects.
+    target_hours = int(usable * load_factor)
+    subject_hours: Dict[str, int] = {}
+    remaining = target_hours
+    for i, subj in enumerate(subjects):
+        share = max(1, remaining // (len(subjects) - i))
+        if subj["type"] == "lab":
+            share = max(2, share - share % 2)
+        subject_hours[subj["_id"]] = share
+        remaining -= share
+
+    classes = [
+        {
+            "_id": f"c{c}",
+            "name": f"Class {c}",
+            "days_per_week": days_per_week,
+            "subject_hours": dict(subject_hours),
+        }
+        for c in range(num_classes)
+    ]
+    dept_of_class = {c["_id"]: i % num_departments for i, c in enumerate(classes)}
+    dept_teachers: List[List[str]] = [[] for _ in range(num_departments)]
+    for i, f in enumerate(faculties):
+        dept_teachers[i % num_departments].append(f["_id"])
+
+    def _pick_teacher(dept: int, hours: int) -> str:
+        # Least-loaded of a small random sample keeps teachers under capacity.
+        pool = dept_teachers[dept]
+        sample = rng.sample(pool, min(3, len(pool)))
+        best = min(sample, key=lambda fid: load[fid] / max(1, capacity[fid]))
+        if load[best] + hours > capacity[best]:
+            best = min(pool, key=lambda fid: load[fid] / max(1, capacity[fid]))
+        load[best] += hours
+        return best
+
+    combos: List[Dict[str, Any]] = []
+    for subj in subjects:
+        pending = [c["_id"] for c in classes]
+        rng.shuffle(pending)
+        while pending:
+            class_id = pending.pop()
+            group = [class_id]
+            if rng.random() < multi_class_ratio:
+                partner = next(
+                    (cid for cid in pending if dept_of_class[cid] == dept_of_class[class_id]), None
+                )
+                if partner is not None:
+                    pending.remove(partner)
+                    group.append(partner)
+            combo = {
+                "_id": f"{'+'.join(sorted(group))}-{subj['_id']}",
+                "subject_id": subj["_id"],
+                "faculty_ids": [_pick_teacher(dept_of_class[class_id], subject_hours[subj["_id"]])],
+                "class_ids": sorted(group),
+            }
+            combos.append(combo)
+            if split_combo_ratio > 0 and rng.random() < split_combo_ratio:
+                combos.append({**combo, "_id": f"{combo['_id']}/2"})
+    combos.sort(key=lambda c: c["_id"])
+
+    fixed_slots: List[Dict[str, Any]] = []
+    if fixed_slots_per_class > 0:
+        unavailable_set = {
+            (fid, s["day"], s["hour"]) for fid, slots in unavailable.items() for s in slots
+        }
+        busy: Set[Tuple[str, int, int]] = set()
+        combos_by_class: Dict[str, List[Dict[str, Any]]] = {}
+        for combo in combos:
+            for cid in combo["class_ids"]:
+                combos_by_class.setdefault(cid, []).append(combo)
+        subject_by_id = {s["_id"]: s for s in subjects}
+        fixed_hours: Dict[str, int] = {}
+        for cls in classes:
+            placed = 0
+            for _attempt in range(fixed_slots_per_class * 20):
+                if placed >= fixed_slots_per_class:
+                    break
+                combo = rng.choice(combos_by_class[cls["_id"]])
+                block = 2 if subject_by_id[combo["subject_id"]]["type"] == "lab" else 1
+                day = rng.randrange(days_per_week)
+                hour = rng.randrange(hours_per_day - block + 1)
+                hours = range(hour, hour + block)
+                if fixed_hours.get(combo["_id"], 0) + block > subject_hours[combo["subject_id"]]:
+                    continue
+                owners = [("c", cid) for cid in combo["class_ids"]] + [("f", fid) for fid in combo["faculty_ids"]]
+                if any(h in break_set for h in hours):
+                    continue
+                if any((kind + oid, day, h) in busy for kind, oid in owners for h in hours):
+                    continue
+                if any((fid, day, h) in unavailable_set for fid in combo["faculty_ids"] for h in hours):
+                    continue
+                for kind, oid in owners:
+                    for h in hours:
+                        busy.add((kind + oid, day, h))
+                fixed_hours[combo["_id"]] = fixed_hours.get(combo["_id"], 0) + block
+                fixed_slots.append({"class": cls["_id"], "combo": combo["_id"], "day": day, "hour": hour})
+                placed += 1
+
+    config = {
+        "schedule": {
+            "daysPerWeek": days_per_week,
+            "hoursPerDay": hours_per_day,
+            "breakHours": break_hours,
+        },
+        "teacherAvailability": {
+            "enabled": availability_density > 0,
+            "hard": True,
+            "unavailableSlotsByTeacher": unavailable,
+        },
+    }
+    return {
+        "faculties": faculties,
+        "subjects": subjects,
+        "classes": classes,
+        "combos": combos,
+        "fixed_slots": fixed_slots,
+        "constraintConfig": _merge_config(config, constraint_config or {}),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Write a synthetic /solve payload as JSON.")
+    parser.add_argument("--classes", type=int, default=12)
+    parser.add_argument("--teachers", type=int, default=30)
+    parser.add_argument("--subjects", type=int, default=8)
+    parser.add_argument("--lab-ratio", type=float, default=0.2)
+    parser.add_argument("--days", type=int, default=6)
+    parser.add_argument("--hours", type=int, default=8)
+    parser.add_argument("--availability", type=float, default=0.0)
+    parser.add_argument("--multi-class", type=float, default=0.0)
+    parser.add_argument("--fixed-slots", type=int, default=0)
+    parser.add_argument("--departments", type=int, default=1)
+    parser.add_argument("--split-combos", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    print(
+        json.dumps(
+            generate_instance(
+                num_classes=args.classes,
+                num_teachers=args.teachers,
+                subjects_per_class=args.subjects,
+                lab_ratio=args.lab_ratio,
+                days_per_week=args.days,
+                hours_per_day=args.hours,
+                availability_density=args.availability,
+                multi_class_ratio=args.multi_class,
+                fixed_slots_per_class=args.fixed_slots,
+                num_departments=args.departments,
+                split_combo_ratio=args.split_combos,
+                seed=args.seed,
+            )
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
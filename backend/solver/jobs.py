@@ -0,0 +1,334 @@
+# backend/solver/jobs.py
+
+# Background solve jobs: a process pool runs model build + CP-SAT search so the
+# FastAPI event loop never blocks on a solve.
+#
+# Admission control: at most `max_workers` jobs run at once and at most
+# `max_queued` wait for a slot; beyond that submit() raises QueueFull. A job
+# is handed to the pool only when a slot is free, and then gets its share of
+# the usable cores (affinity mask, capped by a cgroup CPU quota): the cores
+# are split evenly between the jobs that will run side by side, never more
+# than are still unallocated nor more than `max_job_workers`. Inside the worker
+# job_workers() returns that share.
+import asyncio
+import math
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+FINISHED_STATUSES = (JOB_COMPLETED, JOB_FAILED, JOB_CANCELLED)
+
+# CP-SAT workers granted to the job running in this (worker) process.
+_job_workers: Optional[int] = None
+
+
+class QueueFull(Exception):
+    """Every run slot and queue slot is taken."""
+
+    def __init__(self, queued: int, max_queued: int) -> None:
+        super().__init__(f"Solver queue is full ({queued}/{max_queued} jobs waiting)")
+        self.queued = queued
+        self.max_queued = max_queued
+
+
+def _cgroup_cpu_quota() -> Optional[float]:
+    """CPUs allowed by the cgroup (v2 cpu.max or v1 CFS quota), None if unlimited."""
+    try:
+        with open("/sys/fs/cgroup/cpu.max", encoding="utf-8") as f:
+            quota, period = f.read().split()[:2]
+        return None if quota == "max" else int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    try:
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us", encoding="utf-8") as f:
+            quota_us = int(f.read())
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us", encoding="utf-8") as f:
+            period_us = int(f.read())
+        return None if quota_us <= 0 else quota_us / period_us
+    except (OSError, ValueError):
+        return None
+
+
+def available_cpus() -> int:
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on macOS/Windows
+        cpus = os.cpu_count() or 1
+    quota = _cgroup_cpu_quota()
+    if quota is not None:
+        cpus = min(cpus, math.floor(quota))
+    return max(1, cpus)
+
+
+def job_workers() -> Optional[int]:
+    """The running job's share of the cores (None outside a job worker)."""
+    return _job_workers
+
+
+def _run_job(
+    fn: Callable[..., Dict[str, Any]],
+    payload: Dict[str, Any],
+    started_event: Any,
+    kwargs: Dict[str, Any],
+    workers: Optional[int] = None,
+) -> Dict[str, Any]:
+    # Executed in the worker process.
+    global _job_workers
+    _job_workers = workers
+    started_event.set()
+    return fn(payload, **kwargs)
+
+
+class Job:
+    def __init__(self, job_id: str, stop_event: Any, started_event: Any, progress_queue: Any = None) -> None:
+        self.job_id = job_id
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.stop_event = stop_event
+        self.started_event = started_event
+        # Worker -> service channel for intermediate solutions (streamed jobs only).
+        self.progress_queue = progress_queue
+        self.cancel_requested = False
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.future: Optional[Future] = None
+        # Requests still waiting on the result (kept by the service).
+        self.waiters = 0
+        # Set when the scheduler hands the job to the pool.
+        self.dispatched_at: Optional[float] = None
+        self.workers: Optional[int] = None
+        # Always resolved (never cancelled) so awaiting it is safe for any outcome.
+        self.finished: Future = Future()
+        self._final_status: Optional[str] = None
+
+    @property
+    def status(self) -> str:
+        if self._final_status is not None:
+            return self._final_status
+        try:
+            return JOB_RUNNING if self.started_event.is_set() else JOB_QUEUED
+        except (EOFError, OSError):
+            return JOB_RUNNING
+
+    @property
+    def wait_sec(self) -> Optional[float]:
+        return None if self.dispatched_at is None else self.dispatched_at - self.created_at
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            **({"workers": self.workers} if self.workers is not None else {}),
+        }
+
+
+class JobManager:
+    """Tracks solve jobs and runs them in a lazily created process pool."""
+
+    def __init__(
+        self,
+        max_workers: int,
+        job_ttl_sec: float = 3600.0,
+        max_queued: Optional[int] = None,
+        cpus: Optional[int] = None,
+        max_job_workers: Optional[int] = None,
+    ) -> None:
+        self.max_workers = max_workers
+        self.job_ttl_sec = job_ttl_sec
+        self.max_queued = max_queued
+        self.cpus = cpus or available_cpus()
+        self.max_job_workers = max_job_workers or self.cpus
+        self._ctx = multiprocessing.get_context("spawn")
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._manager: Any = None
+        self._jobs: Dict[str, Job] = {}
+        self._pending: Deque[Tuple[Job, Callable[..., Dict[str, Any]], Dict[str, Any], Dict[str, Any]]] = deque()
+        self._running: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _ensure_started(self) -> None:
+        if self._manager is None:
+            self._manager = self._ctx.Manager()
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=self._ctx)
+
+    def _purge_expired(self) -> None:
+        cutoff = time.time() - self.job_ttl_sec
+        for job_id in [
+            jid for jid, job in self._jobs.items()
+            if job.finished_at is not None and job.finished_at < cutoff
+        ]:
+            del self._jobs[job_id]
+
+    def submit(self, fn: Callable[..., Dict[str, Any]], payload: Dict[str, Any], stream: bool = False) -> Job:
+        """Queue a job. Raises QueueFull when no run or queue slot is left."""
+        with self._lock:
+            self._purge_expired()
+            saturated = len(self._running) >= self.max_workers
+            if saturated and self.max_queued is not None and len(self._pending) >= self.max_queued:
+                raise QueueFull(len(self._pending), self.max_queued)
+            self._ensure_started()
+            job = Job(
+                uuid.uuid4().hex,
+                self._manager.Event(),
+                self._manager.Event(),
+                self._manager.Queue() if stream else None,
+            )
+            kwargs: Dict[str, Any] = {"stop_event": job.stop_event}
+            if stream:
+                kwargs["progress_queue"] = job.progress_queue
+            self._jobs[job.job_id] = job
+            self._pending.append((job, fn, payload, kwargs))
+            dispatched = self._dispatch()
+        self._watch(dispatched)
+        return job
+
+    def _share(self) -> int:
+        # Jobs that will run side by side once this one starts.
+        side_by_side = min(self.max_workers, len(self._running) + 1 + len(self._pending))
+        free = self.cpus - sum(self._running.values())
+        return max(1, min(self.max_job_workers, self.cpus // side_by_side, free))
+
+    def _dispatch(self) -> List[Job]:
+        """Hand queued jobs to the pool while run slots are free (lock held).
+        Returns the dispatched jobs; the caller attaches their done callbacks
+        once the lock is released."""
+        dispatched: List[Job] = []
+        while self._pending and len(self._running) < self.max_workers:
+            job, fn, payload, kwargs = self._pending.popleft()
+            workers = self._share()
+            self._ensure_started()
+            try:
+                future = self._executor.submit(_run_job, fn, payload, job.started_event, kwargs, workers)
+            except BrokenProcessPool:
+                # A worker died (e.g. OOM kill); replace the pool and retry once.
+                self._executor = None
+                self._ensure_started()
+                future = self._executor.submit(_run_job, fn, payload, job.started_event, kwargs, workers)
+            job.future = future
+            job.workers = workers
+            job.dispatched_at = time.time()
+            self._running[job.job_id] = workers
+            dispatched.append(job)
+        return dispatched
+
+    def _watch(self, jobs: List[Job]) -> None:
+        for job in jobs:
+            job.future.add_done_callback(lambda fut, job=job: self._on_done(job, fut))
+
+    def queue_position(self, job: Job) -> Optional[int]:
+        """1-based position among the jobs waiting for a run slot."""
+        with self._lock:
+            for position, (queued, _fn, _payload, _kwargs) in enumerate(self._pending, start=1):
+                if queued is job:
+                    return position
+        return None
+
+    def scheduler_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "running": len(self._running),
+                "queued": len(self._pending),
+                "allocated_cpus": sum(self._running.values()),
+                "cpus": self.cpus,
+                "max_running": self.max_workers,
+                "max_queued": self.max_queued,
+            }
+
+    def completed(self, result: Dict[str, Any]) -> Job:
+        """Register an already-finished job (e.g. served from the result cache)."""
+        job = Job(uuid.uuid4().hex, None, None)
+        job.result = result
+        job.finished_at = job.created_at
+        job._final_status = JOB_COMPLETED
+        job.finished.set_result(None)
+        with self._lock:
+            self._purge_expired()
+            self._jobs[job.job_id] = job
+        return job
+
+    def _on_done(self, job: Job, fut: Future) -> None:
+        with self._lock:
+            self._running.pop(job.job_id, None)
+            job.finished_at = time.time()
+            if fut.cancelled():
+                job._final_status = JOB_CANCELLED
+            elif fut.exception() is not None:
+                job.error = str(fut.exception()) or type(fut.exception()).__name__
+                job._final_status = JOB_FAILED
+            else:
+                job.result = fut.result()
+                job._final_status = JOB_CANCELLED if job.cancel_requested else JOB_COMPLETED
+            dispatched = self._dispatch() if self._executor is not None else []
+        self._watch(dispatched)
+        if not job.finished.done():
+            job.finished.set_result(None)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            self._purge_expired()
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        job = self.get(job_id)
+        if job is None or job.status in FINISHED_STATUSES:
+            return job
+        job.cancel_requested = True
+        with self._lock:
+            for entry in self._pending:
+                if entry[0] is job:
+                    # Never reached the pool: finish it here.
+                    self._pending.remove(entry)
+                    job.finished_at = time.time()
+                    job._final_status = JOB_CANCELLED
+                    break
+        if job._final_status == JOB_CANCELLED:
+            if not job.finished.done():
+                job.finished.set_result(None)
+            return job
+        if job.future is not None and not job.future.cancel():
+            # Already running: ask the worker to stop CP-SAT; the best solution
+            # found so far (if any) is kept as the job result.
+            job.stop_event.set()
+        return job
+
+    async def wait(self, job: Job) -> Job:
+        await asyncio.wrap_future(job.finished)
+        return job
+
+    def shutdown(self) -> None:
+        with self._lock:
+            queued = [entry[0] for entry in self._pending]
+            self._pending.clear()
+            for job in queued:
+                job._final_status = JOB_CANCELLED
+            pending = [job for job in self._jobs.values() if job.status not in FINISHED_STATUSES]
+            executor, self._executor = self._executor, None
+            manager, self._manager = self._manager, None
+        for job in queued:
+            if not job.finished.done():
+                job.finished.set_result(None)
+        for job in pending:
+            job.cancel_requested = True
+            try:
+                job.stop_event.set()
+            except (EOFError, OSError):
+                pass
+        # Done callbacks take self._lock, so the pool is drained outside it.
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+        if manager is not None:
+            manager.shutdown()
@@ -0,0 +1,138 @@
+# backend/solver/lns.py
+
+# Domain-specific large-neighbourhood search around a built model.
+#
+# Each iteration relaxes one structured neighbourhood of start variables:
+#   class    one class's week
+#   teacher  one teacher's week
+#   day      one day across all classes
+#   subject  all combos of one subject
+# fixes every other start to the incumbent (by narrowing domains on a clone
+# of the model) and re-solves that sub-model under a short time limit. An
+# improving sub-solution becomes the new incumbent. Kinds are tried in turn;
+# the entity within a kind is drawn at random.
+#
+# constraintConfig.solver.lns:
+#   enabled                 default false
+#   initialTimeLimitSec     full-model solve for the first incumbent
+#                           (default min(30, 20% of the time limit))
+#   iterationTimeLimitSec   per sub-solve (default 2)
+#   neighborhoods           kinds to cycle through (default all four)
+import random
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from ortools.sat.python import cp_model
+
+NEIGHBORHOOD_KINDS = ("class", "teacher", "day", "subject")
+
+
+def lns_config(constraint_config: Dict[str, Any], time_limit_sec: float) -> Dict[str, Any]:
+    """Resolved lns options except `enabled`."""
+    solver_cfg = constraint_config.get("solver") if isinstance(constraint_config.get("solver"), dict) else {}
+    cfg = solver_cfg.get("lns") if isinstance(solver_cfg.get("lns"), dict) else {}
+    kinds = [k for k in (cfg.get("neighborhoods") or NEIGHBORHOOD_KINDS) if k in NEIGHBORHOOD_KINDS]
+    return {
+        "initialTimeLimitSec": float(cfg.get("initialTimeLimitSec") or min(30.0, 0.2 * time_limit_sec)),
+        "iterationTimeLimitSec": float(cfg.get("iterationTimeLimitSec") or 2.0),
+        "neighborhoods": kinds or list(NEIGHBORHOOD_KINDS),
+    }
+
+
+def neighborhood_index(
+    keys: List[Tuple[str, int, int]], combo_by_id: Dict[str, Dict[str, Any]]
+) -> Dict[str, Dict[Any, List[int]]]:
+    """kind -> entity -> positions (into `keys`) of the starts it relaxes."""
+    index: Dict[str, Dict[Any, List[int]]] = {kind: {} for kind in NEIGHBORHOOD_KINDS}
+    for pos, (combo_id, day, _hour) in enumerate(keys):
+        combo = combo_by_id[combo_id]
+        for class_id in combo.get("class_ids", []):
+            index["class"].setdefault(class_id, []).append(pos)
+        for fid in combo.get("faculty_ids", []):
+            index["teacher"].setdefault(fid, []).append(pos)
+        index["day"].setdefault(day, []).append(pos)
+        index["subject"].setdefault(combo["subject_id"], []).append(pos)
+    return index
+
+
+def _sub_model(
+    model: cp_model.CpModel, var_indices: List[int], values: np.ndarray, relaxed: List[int]
+) -> cp_model.CpModel:
+    """Clone with every start outside `relaxed` fixed to its incumbent value;
+    the relaxed starts are hinted with it."""
+    sub = model.Clone()
+    sub.ClearHints()
+    free = np.zeros(len(var_indices), dtype=bool)
+    free[relaxed] = True
+    proto_vars = sub.Proto().variables
+    for pos in np.nonzero(~free)[0].tolist():
+        domain = proto_vars[var_indices[pos]].domain
+        domain[0] = domain[1] = int(values[pos])
+    for pos in relaxed:
+        sub.AddHint(sub.GetBoolVarFromProtoIndex(var_indices[pos]), int(values[pos]))
+    return sub
+
+
+def run_lns(
+    model: cp_model.CpModel,
+    var_indices: List[int],
+    neighborhoods: Dict[str, Dict[Any, List[int]]],
+    values: np.ndarray,
+    objective: float,
+    bound: float,
+    deadline: float,
+    cfg: Dict[str, Any],
+    solve: Callable[[cp_model.CpModel, float], Tuple[int, cp_model.CpSolver]],
+    seed: int,
+    started: float,
+    on_improve: Optional[Callable[[np.ndarray, float], None]] = None,
+    should_stop: Optional[Callable[[], bool]] = None,
+) -> Tuple[np.ndarray, Dict[str, Any]]:
+    """Improve the incumbent `values` (aligned with `var_indices`) until the
+    deadline, the bound or a stop request. Returns the best values and the
+    `lns` report."""
+    rng = random.Random(seed)
+    kinds = [k for k in cfg["neighborhoods"] if neighborhoods.get(k)]
+    entities = {k: sorted(neighborhoods[k], key=str) for k in kinds}
+    per_kind = {k: {"tried": 0, "improved": 0} for k in kinds}
+    trajectory: List[Dict[str, Any]] = [
+        {"elapsed_sec": round(time.perf_counter() - started, 4), "objective": objective, "neighborhood": "initial"}
+    ]
+    iterations = 0
+    while kinds and objective > bound and time.perf_counter() < deadline:
+        if should_stop is not None and should_stop():
+            break
+        kind = kinds[iterations % len(kinds)]
+        entity = rng.choice(entities[kind])
+        iterations += 1
+        per_kind[kind]["tried"] += 1
+        limit = min(cfg["iterationTimeLimitSec"], deadline - time.perf_counter())
+        if limit <= 0:
+            break
+        relaxed = neighborhoods[kind][entity]
+        sub = _sub_model(model, var_indices, values, relaxed)
+        status, solver = solve(sub, limit)
+        if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE) or solver.ObjectiveValue() >= objective:
+            continue
+        for pos in relaxed:
+            values[pos] = solver.Value(sub.GetBoolVarFromProtoIndex(var_indices[pos]))
+        objective = solver.ObjectiveValue()
+        per_kind[kind]["improved"] += 1
+        trajectory.append(
+            {
+                "elapsed_sec": round(time.perf_counter() - started, 4),
+                "objective": objective,
+                "neighborhood": f"{kind}:{entity}",
+            }
+        )
+        if on_improve is not None:
+            on_improve(values, objective)
+    return values, {
+        "iterations": iterations,
+        "improvements": len(trajectory) - 1,
+        "objective": objective,
+        "provedOptimal": objective <= bound,
+        "neighborhoods": per_kind,
+        "trajectory": trajectory,
+    }
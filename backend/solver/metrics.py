@@ -0,0 +1,205 @@
+# backend/solver/metrics.py
+
+# Minimal Prometheus text-format (0.0.4) counters and histograms for /metrics.
+# Solves run in worker processes, so everything here is recorded in the
+# service process from the `stats` section of finished results; the
+# scheduler gauges are sampled from the job manager on each scrape.
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+SECONDS_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+SIZE_BUCKETS = (1e2, 1e3, 1e4, 3e4, 1e5, 3e5, 1e6, 3e6)
+RATIO_BUCKETS = (0.0, 0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+def _label_key(labels: Optional[Dict[str, Any]]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in (labels or {}).items()))
+
+
+def _format_labels(key: LabelKey, extra: Iterable[Tuple[str, str]] = ()) -> str:
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    escaped = [
+        (k, v.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')) for k, v in pairs
+    ]
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str) -> None:
+        self.name = name
+        self.help = help_text
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = _label_key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(key)} {_format_value(value)}")
+        return lines
+
+
+class Gauge:
+    def __init__(self, name: str, help_text: str) -> None:
+        self.name = name
+        self.help = help_text
+        self._values: Dict[LabelKey, float] = {}
+
+    def set(self, value: float, **labels: Any) -> None:
+        self._values[_label_key(labels)] = value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        for key, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets: Tuple[float, ...] = SECONDS_BUCKETS) -> None:
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._series: Dict[LabelKey, List[float]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = _label_key(labels)
+        # Per-bucket counts followed by sum and count.
+        series = self._series.setdefault(key, [0.0] * (len(self.buckets) + 2))
+        for i, upper in enumerate(self.buckets):
+            if value <= upper:
+                series[i] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, series in sorted(self._series.items()):
+            for upper, count in zip(self.buckets, series):
+                le = (("le", _format_value(upper)),)
+                lines.append(f"{self.name}_bucket{_format_labels(key, le)} {_format_value(count)}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(series[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {_format_value(series[-1])}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._metrics: List[Any] = []
+
+    def counter(self, name: str, help_text: str) -> Counter:
+        metric = Counter(name, help_text)
+        self._metrics.append(metric)
+        return metric
+
+    def gauge(self, name: str, help_text: str) -> Gauge:
+        metric = Gauge(name, help_text)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help_text: str, buckets: Tuple[float, ...] = SECONDS_BUCKETS) -> Histogram:
+        metric = Histogram(name, help_text, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    @property
+    def lock(self) -> threading.Lock:
+        return self._lock
+
+    def render(self) -> str:
+        with self._lock:
+            lines: List[str] = []
+            for metric in self._metrics:
+                lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class SolverMetrics:
+    """The solver service's metric set."""
+
+    def __init__(self) -> None:
+        self.registry = MetricsRegistry()
+        r = self.registry
+        self.requests = r.counter(
+            "solver_requests_total", "Solve requests by cache outcome (rejected: queue full)."
+        )
+        self.jobs = r.counter("solver_jobs_total", "Finished solve jobs by job status.")
+        self.statuses = r.counter("solver_solve_status_total", "Finished solves by CP-SAT status.")
+        self.phase_seconds = r.histogram("solver_phase_seconds", "Wall time per solve phase.")
+        self.solve_seconds = r.histogram("solver_cpsat_wall_seconds", "CP-SAT wall time per solve.")
+        self.variables = r.histogram("solver_model_variables", "Variables per built model.", SIZE_BUCKETS)
+        self.constraints = r.histogram("solver_model_constraints", "Constraints per built model.", SIZE_BUCKETS)
+        self.family_variables = r.counter(
+            "solver_family_variables_total", "Variables added per constraint family."
+        )
+        self.family_constraints = r.counter(
+            "solver_family_constraints_total", "Constraints added per constraint family."
+        )
+        self.conflicts = r.counter("solver_cpsat_conflicts_total", "CP-SAT conflicts.")
+        self.branches = r.counter("solver_cpsat_branches_total", "CP-SAT branches.")
+        self.gap = r.histogram("solver_objective_gap", "Relative objective/bound gap at the end of a solve.", RATIO_BUCKETS)
+        self.abandoned = r.counter(
+            "solver_abandoned_requests_total", "Solve requests given up by the client, by reason."
+        )
+        self.queue_wait = r.histogram("solver_queue_wait_seconds", "Time jobs waited for a run slot.")
+        self.queued_jobs = r.gauge("solver_queued_jobs", "Jobs waiting for a run slot.")
+        self.running_jobs = r.gauge("solver_running_jobs", "Jobs running in the process pool.")
+        self.allocated_cpus = r.gauge("solver_allocated_cpus", "CP-SAT workers granted to running jobs.")
+        self.cpus = r.gauge("solver_cpus", "Cores the scheduler splits between jobs.")
+
+    def record_request(self, cache_state: str) -> None:
+        with self.registry.lock:
+            self.requests.inc(cache=cache_state)
+
+    def record_abandoned(self, reason: str) -> None:
+        with self.registry.lock:
+            self.abandoned.inc(reason=reason)
+
+    def record_scheduler(self, scheduler: Dict[str, Any]) -> None:
+        with self.registry.lock:
+            self.queued_jobs.set(scheduler["queued"])
+            self.running_jobs.set(scheduler["running"])
+            self.allocated_cpus.set(scheduler["allocated_cpus"])
+            self.cpus.set(scheduler["cpus"])
+
+    def record_job(
+        self, job_status: str, result: Optional[Dict[str, Any]], wait_sec: Optional[float] = None
+    ) -> None:
+        with self.registry.lock:
+            self.jobs.inc(status=job_status)
+            if wait_sec is not None:
+                self.queue_wait.observe(wait_sec)
+            stats = (result or {}).get("stats")
+            if not stats:
+                return
+            self.statuses.inc(status=result.get("status"))
+            for phase, sec in stats.get("phases_sec", {}).items():
+                self.phase_seconds.observe(sec, phase=phase)
+            for family, counts in stats.get("families", {}).items():
+                self.family_variables.inc(counts["variables"], family=family)
+                self.family_constraints.inc(counts["constraints"], family=family)
+            model = stats.get("model") or {}
+            self.variables.observe(model.get("variables", 0))
+            self.constraints.observe(model.get("constraints", 0))
+            solver = stats.get("solver") or {}
+            self.solve_seconds.observe(solver.get("wall_time_sec") or 0.0)
+            self.conflicts.inc(solver.get("conflicts") or 0)
+            self.branches.inc(solver.get("branches") or 0)
+            if solver.get("gap") is not None:
+                self.gap.observe(solver["gap"])
+
+    def render(self) -> str:
+        return self.registry.render()
@@ -0,0 +1,112 @@
+# backend/solver/objective.py
+
+# Objective terms tagged with the constraint family and entity they belong
+# to, and the per-family / per-entity breakdown of a solved objective.
+#
+# The model builder appends every penalty to an ObjectiveTerms list; the
+# family defaults to the open stats phase ("teacher_continuity", ...) and the
+# entity is given like for _assume(): class_id, teacher_id, subject_id, or
+# combo_id (resolved to the combo's classes, teachers and subject). After
+# solving, each term is evaluated once against the incumbent:
+#
+#   objectiveBreakdown
+#     objective, bound
+#     families    family -> {penalty, terms, active}, largest penalty first
+#     entities    class | teacher | subject -> id -> penalty (non-zero only)
+#
+# A term shared by several classes/teachers (a multi-class or multi-teacher
+# combo) counts in full for each of them, so entity totals can add up to
+# more than the family total.
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from stats import SolveStats
+
+ENTITY_KINDS = ("class", "teacher", "subject")
+
+
+class ObjectiveTerms(list):
+    """A list of objective terms (sum() it as usual) with one tag per term."""
+
+    def __init__(self, stats: SolveStats) -> None:
+        super().__init__()
+        self._stats = stats
+        self.tags: List[Tuple[str, Dict[str, str]]] = []
+
+    def append(self, term: Any, family: Optional[str] = None, **entity: str) -> None:
+        super().append(term)
+        self.tags.append((family or self._stats.current or "objective", entity))
+
+
+def _entity_ids(
+    entity: Dict[str, str], combo_by_id: Dict[str, Dict[str, Any]]
+) -> Iterable[Tuple[str, str]]:
+    combo = combo_by_id.get(entity.get("combo_id", ""))
+    if combo is not None:
+        for class_id in combo.get("class_ids", []):
+            yield "class", class_id
+        for fid in combo.get("faculty_ids", []):
+            yield "teacher", fid
+        yield "subject", combo["subject_id"]
+    for kind in ENTITY_KINDS:
+        if f"{kind}_id" in entity:
+            yield kind, entity[f"{kind}_id"]
+
+
+def _ranked(totals: Dict[str, Any], key: Callable[[Any], int]) -> Dict[str, Any]:
+    return dict(sorted(totals.items(), key=lambda item: -key(item[1])))
+
+
+def objective_breakdown(
+    terms: ObjectiveTerms,
+    value: Callable[[Any], int],
+    combo_by_id: Dict[str, Dict[str, Any]],
+    objective: Optional[float],
+    bound: Optional[float],
+) -> Dict[str, Any]:
+    """Evaluate every term with `value` (e.g. solver.Value) and total them."""
+    families: Dict[str, Dict[str, int]] = {}
+    entities: Dict[str, Dict[str, int]] = {kind: {} for kind in ENTITY_KINDS}
+    for term, (family, entity) in zip(terms, terms.tags):
+        totals = families.setdefault(family, {"penalty": 0, "terms": 0, "active": 0})
+        totals["terms"] += 1
+        penalty = int(value(term))
+        if not penalty:
+            continue
+        totals["penalty"] += penalty
+        totals["active"] += 1
+        for kind, entity_id in _entity_ids(entity, combo_by_id):
+            entities[kind][entity_id] = entities[kind].get(entity_id, 0) + penalty
+    return {
+        "objective": objective,
+        "bound": bound,
+        "families": _ranked(families, lambda totals: totals["penalty"]),
+        "entities": {kind: _ranked(totals, lambda penalty: penalty) for kind, totals in entities.items()},
+    }
+
+
+def merge_breakdowns(parts: List[Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+    """Combine per-component breakdowns: independent components add up."""
+    parts = [p for p in parts if p]
+    if not parts:
+        return None
+    families: Dict[str, Dict[str, int]] = {}
+    entities: Dict[str, Dict[str, int]] = {kind: {} for kind in ENTITY_KINDS}
+    for part in parts:
+        for family, totals in part["families"].items():
+            merged = families.setdefault(family, {"penalty": 0, "terms": 0, "active": 0})
+            for key in merged:
+                merged[key] += totals[key]
+        for kind, totals in part["entities"].items():
+            for entity_id, penalty in totals.items():
+                entities[kind][entity_id] = entities[kind].get(entity_id, 0) + penalty
+
+    def _total(key: str) -> Optional[float]:
+        values = [p[key] for p in parts]
+        return None if any(v is None for v in values) else sum(values)
+
+    return {
+        "objective": _total("objective"),
+        "bound": _total("bound"),
+        "families": _ranked(families, lambda totals: totals["penalty"]),
+        "entities": {kind: _ranked(totals, lambda penalty: penalty) for kind, totals in entities.items()},
+    }
@@ -0,0 +1,347 @@
+# backend/solver/placement.py
+
+# Vectorized candidate-placement generation for the model builder.
+#
+# Instead of looping combo x day x hour x block x faculty in Python, the
+# valid start positions of every combo are computed with NumPy masks:
+#   - start_ok[block]      (H,)      block fits in the day and avoids breaks
+#                                    (the SlotMasks block-start bits)
+#   - unavailable_block    (T, D, H) teacher busy somewhere in [h, h + block)
+#   - combo x teacher incidence, combo x day limits
+# and the class/teacher/subject cover lists are produced by grouping flat
+# slot keys rather than by per-placement dict appends.
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from slotmask import SlotMasks
+
+
+class Placements:
+    """Candidate start placements (one future x var each), in combo/day/hour order."""
+
+    def __init__(
+        self,
+        combo_ids: List[str],
+        combo_idx: np.ndarray,
+        day: np.ndarray,
+        hour: np.ndarray,
+        block: np.ndarray,
+        violates: np.ndarray,
+        class_ids: List[str],
+        teacher_ids: List[str],
+        subject_ids: List[str],
+        combo_class_ptr: np.ndarray,
+        combo_class_idx: np.ndarray,
+        combo_teacher_ptr: np.ndarray,
+        combo_teacher_idx: np.ndarray,
+        combo_subject_idx: np.ndarray,
+        num_days: int,
+        hours_per_day: int,
+    ) -> None:
+        self.combo_ids = combo_ids
+        self.combo_idx = combo_idx
+        self.day = day
+        self.hour = hour
+        self.block = block
+        self.violates = violates
+        self.class_ids = class_ids
+        self.teacher_ids = teacher_ids
+        self.subject_ids = subject_ids
+        self._combo_class_ptr = combo_class_ptr
+        self._combo_class_idx = combo_class_idx
+        self._combo_teacher_ptr = combo_teacher_ptr
+        self._combo_teacher_idx = combo_teacher_idx
+        self._combo_subject_idx = combo_subject_idx
+        self._num_days = num_days
+        self._hours_per_day = hours_per_day
+
+    def __len__(self) -> int:
+        return int(self.combo_idx.shape[0])
+
+    def keys(self) -> List[Tuple[str, int, int]]:
+        combo_ids = self.combo_ids
+        return [
+            (combo_ids[c], d, h)
+            for c, d, h in zip(self.combo_idx.tolist(), self.day.tolist(), self.hour.tolist())
+        ]
+
+    def subset(self, keep: np.ndarray) -> "Placements":
+        """The placements where the (P,) bool mask `keep` is set, order kept."""
+        return Placements(
+            combo_ids=self.combo_ids,
+            combo_idx=self.combo_idx[keep],
+            day=self.day[keep],
+            hour=self.hour[keep],
+            block=self.block[keep],
+            violates=self.violates[keep],
+            class_ids=self.class_ids,
+            teacher_ids=self.teacher_ids,
+            subject_ids=self.subject_ids,
+            combo_class_ptr=self._combo_class_ptr,
+            combo_class_idx=self._combo_class_idx,
+            combo_teacher_ptr=self._combo_teacher_ptr,
+            combo_teacher_idx=self._combo_teacher_idx,
+            combo_subject_idx=self._combo_subject_idx,
+            num_days=self._num_days,
+            hours_per_day=self._hours_per_day,
+        )
+
+    def touches_classes(self, class_ids: Iterable[str]) -> np.ndarray:
+        """(P,) bool: the placement's combo includes one of `class_ids`."""
+        wanted = set(class_ids)
+        class_hit = np.array([cid in wanted for cid in self.class_ids], dtype=bool)
+        ptr = self._combo_class_ptr
+        combo_hit = np.array(
+            [
+                bool(class_hit[self._combo_class_idx[ptr[c] : ptr[c + 1]]].any())
+                for c in range(len(self.combo_ids))
+            ],
+            dtype=bool,
+        )
+        return combo_hit[self.combo_idx] if len(self.combo_ids) else np.zeros(len(self), dtype=bool)
+
+    def _expand(self, ptr: np.ndarray, idx: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Expand placements over (entity in combo) x (hour offset in block).
+
+        Returns placement index, entity index and covered hour per cover entry,
+        ordered by placement index (matching the legacy append order).
+        """
+        starts = ptr[self.combo_idx]
+        counts = ptr[self.combo_idx + 1] - starts
+        p = np.repeat(np.arange(len(self), dtype=np.int64), counts)
+        within = np.arange(p.shape[0], dtype=np.int64) - np.repeat(np.cumsum(counts) - counts, counts)
+        entity = idx[starts[p] + within]
+
+        blocks = self.block[p]
+        p2 = np.repeat(p, blocks)
+        offset = np.arange(p2.shape[0], dtype=np.int64) - np.repeat(np.cumsum(blocks) - blocks, blocks)
+        return p2, np.repeat(entity, blocks), self.hour[p2] + offset
+
+    def _group(self, key: np.ndarray, p: np.ndarray, values: List[Any]) -> Tuple[List[int], List[List[Any]]]:
+        """Group values[p] by key; within a group the placement order is kept."""
+        order = np.argsort(key, kind="stable")
+        key_sorted = key[order]
+        unique_keys, first = np.unique(key_sorted, return_index=True)
+        ordered = [values[i] for i in p[order].tolist()]
+        bounds = first.tolist() + [len(ordered)]
+        return unique_keys.tolist(), [ordered[bounds[i] : bounds[i + 1]] for i in range(len(unique_keys))]
+
+    def _slot_keys(self, entity_ids: List[str], keys: List[int]) -> List[Tuple[str, int, int]]:
+        slots = self._num_days * self._hours_per_day
+        return [
+            (entity_ids[k // slots], (k % slots) // self._hours_per_day, k % self._hours_per_day)
+            for k in keys
+        ]
+
+    def class_covers(self, values: List[Any]) -> Dict[Tuple[str, int, int], List[Any]]:
+        """(class_id, day, hour) -> values of the placements covering that slot."""
+        p, cls, hour = self._expand(self._combo_class_ptr, self._combo_class_idx)
+        keys, groups = self._group(
+            (cls * self._num_days + self.day[p]) * self._hours_per_day + hour, p, values
+        )
+        return dict(zip(self._slot_keys(self.class_ids, keys), groups))
+
+    def subject_covers(self, values: List[Any]) -> Dict[Tuple[str, int, int, str], List[Any]]:
+        """(class_id, day, hour, subject_id) -> values of the covering placements."""
+        p, cls, hour = self._expand(self._combo_class_ptr, self._combo_class_idx)
+        num_subjects = max(1, len(self.subject_ids))
+        slot_key = (cls * self._num_days + self.day[p]) * self._hours_per_day + hour
+        keys, groups = self._group(
+            slot_key * num_subjects + self._combo_subject_idx[self.combo_idx[p]], p, values
+        )
+        slot_keys = self._slot_keys(self.class_ids, [k // num_subjects for k in keys])
+        subject_ids = [self.subject_ids[k % num_subjects] for k in keys]
+        return {
+            (cid, day, hour, sid): group
+            for (cid, day, hour), sid, group in zip(slot_keys, subject_ids, groups)
+        }
+
+    def _covered_slots(self, owner: np.ndarray, p: np.ndarray, hour: np.ndarray) -> Dict[int, Set[Tuple[int, int]]]:
+        slots = self._num_days * self._hours_per_day
+        combined = np.unique(owner * slots + self.day[p] * self._hours_per_day + hour)
+        out: Dict[int, Set[Tuple[int, int]]] = {}
+        for owner_idx, slot in zip((combined // slots).tolist(), (combined % slots).tolist()):
+            out.setdefault(owner_idx, set()).add(divmod(slot, self._hours_per_day))
+        return out
+
+    def subject_slots(self) -> Dict[Tuple[str, str], Set[Tuple[int, int]]]:
+        """(class_id, subject_id) -> (day, hour) slots some placement covers."""
+        p, cls, hour = self._expand(self._combo_class_ptr, self._combo_class_idx)
+        num_subjects = max(1, len(self.subject_ids))
+        owner = cls * num_subjects + self._combo_subject_idx[self.combo_idx[p]]
+        return {
+            (self.class_ids[k // num_subjects], self.subject_ids[k % num_subjects]): slots
+            for k, slots in self._covered_slots(owner, p, hour).items()
+        }
+
+    def teacher_slots(self) -> Dict[str, Set[Tuple[int, int]]]:
+        """faculty_id -> (day, hour) slots some placement covers."""
+        p, fac, hour = self._expand(self._combo_teacher_ptr, self._combo_teacher_idx)
+        return {self.teacher_ids[k]: slots for k, slots in self._covered_slots(fac, p, hour).items()}
+
+    def teacher_covers(self, values: List[Any]) -> Dict[Tuple[str, int, int], List[Any]]:
+        """(faculty_id, day, hour) -> values of the placements covering that slot."""
+        p, fac, hour = self._expand(self._combo_teacher_ptr, self._combo_teacher_idx)
+        keys, groups = self._group(
+            (fac * self._num_days + self.day[p]) * self._hours_per_day + hour, p, values
+        )
+        return dict(zip(self._slot_keys(self.teacher_ids, keys), groups))
+
+
+def block_start_mask(slot_masks: SlotMasks, block: int) -> np.ndarray:
+    """(H,) bool: a block of `block` hours may start at h (fits, no break inside)."""
+    bits = slot_masks.block_starts(block)
+    return np.array([bool(bits >> h & 1) for h in range(slot_masks.hours_per_day)], dtype=bool)
+
+
+def teacher_unavailability(
+    teacher_ids: List[str],
+    num_days: int,
+    hours_per_day: int,
+    global_slots: Set[Tuple[int, int]],
+    slots_by_teacher: Dict[str, Set[Tuple[int, int]]],
+) -> np.ndarray:
+    """(T, D, H) bool availability matrix: True where the teacher is unavailable."""
+    unavailable = np.zeros((len(teacher_ids), num_days, hours_per_day), dtype=bool)
+    for day, hour in global_slots:
+        if 0 <= day < num_days and 0 <= hour < hours_per_day:
+            unavailable[:, day, hour] = True
+    for t, fid in enumerate(teacher_ids):
+        for day, hour in slots_by_teacher.get(fid, ()):
+            if 0 <= day < num_days and 0 <= hour < hours_per_day:
+                unavailable[t, day, hour] = True
+    return unavailable
+
+
+def block_unavailability(unavailable: np.ndarray, block: int) -> np.ndarray:
+    """(T, D, H) bool: some hour of [h, h + block) is unavailable."""
+    out = unavailable.copy()
+    hours_per_day = unavailable.shape[2]
+    for k in range(1, block):
+        out[:, :, : hours_per_day - k] |= unavailable[:, :, k:]
+    return out
+
+
+def _csr(lists: List[List[int]]) -> Tuple[np.ndarray, np.ndarray]:
+    ptr = np.zeros(len(lists) + 1, dtype=np.int64)
+    ptr[1:] = np.cumsum([len(items) for items in lists])
+    idx = np.fromiter((i for items in lists for i in items), dtype=np.int64, count=int(ptr[-1]))
+    return ptr, idx
+
+
+def generate_placements(
+    combos: List[Dict[str, Any]],
+    class_by_id: Dict[str, Dict[str, Any]],
+    subject_by_id: Dict[str, Dict[str, Any]],
+    required_hours_by_class_subject: Dict[str, Dict[str, int]],
+    days_per_week: int,
+    hours_per_day: int,
+    break_hours_set: Set[int],
+    lab_block_size: int,
+    theory_block_size: int,
+    teacher_avail_enabled: bool = False,
+    teacher_avail_hard: bool = True,
+    teacher_avail_global: Optional[Set[Tuple[int, int]]] = None,
+    teacher_avail_by_teacher: Optional[Dict[str, Set[Tuple[int, int]]]] = None,
+    slot_masks: Optional[SlotMasks] = None,
+) -> Placements:
+    """Same candidate set and order as the per-slot loop in the model builder.
+    `slot_masks` (the builder's, if it has one) supplies the block starts."""
+    class_ids = list(class_by_id.keys())
+    class_index = {cid: i for i, cid in enumerate(class_ids)}
+    subject_ids = list(subject_by_id.keys())
+    subject_index = {sid: i for i, sid in enumerate(subject_ids)}
+    teacher_ids: List[str] = []
+    teacher_index: Dict[str, int] = {}
+
+    kept_combo_ids: List[str] = []
+    kept_class_lists: List[List[int]] = []
+    kept_teacher_lists: List[List[int]] = []
+    kept_subject: List[int] = []
+    kept_block: List[int] = []
+    kept_days: List[int] = []
+    for combo in combos:
+        class_list = [cid for cid in (combo.get("class_ids") or []) if cid in class_by_id]
+        if not class_list:
+            continue
+        subj = subject_by_id.get(combo["subject_id"])
+        if not subj:
+            continue
+        if any(required_hours_by_class_subject[cid].get(combo["subject_id"], 0) <= 0 for cid in class_list):
+            continue
+        teacher_list = []
+        for fid in combo.get("faculty_ids", []):
+            if fid not in teacher_index:
+                teacher_index[fid] = len(teacher_ids)
+                teacher_ids.append(fid)
+            teacher_list.append(teacher_index[fid])
+        kept_combo_ids.append(combo["_id"])
+        kept_class_lists.append([class_index[cid] for cid in class_list])
+        kept_teacher_lists.append(teacher_list)
+        kept_subject.append(subject_index[combo["subject_id"]])
+        kept_block.append(lab_block_size if subj.get("type") == "lab" else theory_block_size)
+        kept_days.append(
+            min([int(class_by_id[cid].get("days_per_week") or days_per_week) for cid in class_list])
+        )
+
+    num_combos = len(kept_combo_ids)
+    num_days = max([days_per_week] + kept_days)
+    combo_block = np.asarray(kept_block, dtype=np.int64)
+    combo_class_ptr, combo_class_idx = _csr(kept_class_lists)
+    combo_teacher_ptr, combo_teacher_idx = _csr(kept_teacher_lists)
+
+    # valid[c, d, h]: block fits at h and day d exists for every class of combo c.
+    day_ok = np.arange(num_days)[None, :] < np.asarray(kept_days, dtype=np.int64).reshape(-1, 1)
+    violates = np.zeros((num_combos, num_days, hours_per_day), dtype=bool)
+    valid = np.zeros((num_combos, num_days, hours_per_day), dtype=bool)
+
+    unavailable = None
+    if teacher_avail_enabled and teacher_ids:
+        unavailable = teacher_unavailability(
+            teacher_ids,
+            num_days,
+            hours_per_day,
+            teacher_avail_global or set(),
+            teacher_avail_by_teacher or {},
+        )
+
+    if slot_masks is None:
+        slot_masks = SlotMasks(num_days, hours_per_day, break_hours_set, set(), {})
+    for block in sorted(set(kept_block)):
+        rows = np.nonzero(combo_block == block)[0]
+        start_ok = block_start_mask(slot_masks, block)
+        valid[rows] = day_ok[rows][:, :, None] & start_ok[None, None, :]
+        if unavailable is not None:
+            # combo x teacher incidence (C_b, T) @ (T, D*H): > 0 where any
+            # teacher of the combo is busy somewhere inside the block.
+            incidence = np.zeros((rows.shape[0], len(teacher_ids)), dtype=np.int32)
+            for r, c in enumerate(rows.tolist()):
+                incidence[r, combo_teacher_idx[combo_teacher_ptr[c] : combo_teacher_ptr[c + 1]]] = 1
+            busy = block_unavailability(unavailable, block).reshape(len(teacher_ids), -1)
+            violates[rows] = (incidence @ busy.astype(np.int32)).reshape(
+                rows.shape[0], num_days, hours_per_day
+            ) > 0
+
+    if unavailable is not None and teacher_avail_hard:
+        valid &= ~violates
+
+    combo_idx, day, hour = np.nonzero(valid)
+    return Placements(
+        combo_ids=kept_combo_ids,
+        combo_idx=combo_idx.astype(np.int64),
+        day=day.astype(np.int64),
+        hour=hour.astype(np.int64),
+        block=combo_block[combo_idx],
+        violates=violates[combo_idx, day, hour],
+        class_ids=class_ids,
+        teacher_ids=teacher_ids,
+        subject_ids=subject_ids,
+        combo_class_ptr=combo_class_ptr,
+        combo_class_idx=combo_class_idx,
+        combo_teacher_ptr=combo_teacher_ptr,
+        combo_teacher_idx=combo_teacher_idx,
+        combo_subject_idx=np.asarray(kept_subject, dtype=np.int64),
+        num_days=num_days,
+        hours_per_day=hours_per_day,
+    )
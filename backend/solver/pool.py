@@ -0,0 +1,107 @@
+# backend/solver/pool.py
+
+# A pool of diverse alternative timetables from one built model.
+#
+# After the main solve, each further member is the best solution (within a
+# short time limit) of a clone of the model that must differ from every
+# pooled solution in at least `minDifference` start variables (Hamming
+# distance over the x vars). The clone carries no hint: the incumbent is
+# exactly what the diversity constraint forbids. Incumbents reported during
+# the main search are not used: they are earlier, worse versions of the
+# same timetable.
+#
+# constraintConfig.solver.solutionPool:
+#   enabled          default false
+#   size             solutions returned, the best one included (default 3,
+#                    at most 10)
+#   minDifference    starts each member must differ in (default 4)
+#   timeLimitSec     per alternative (default min(10, 20% of the time
+#                    limit)). The pool runs inside the request's time limit:
+#                    (size - 1) x timeLimitSec, at most half of it, is
+#                    reserved from the main search, and an alternative only
+#                    gets what is left before the request's deadline.
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from ortools.sat.python import cp_model
+
+MAX_POOL_SIZE = 10
+
+
+def pool_config(constraint_config: Dict[str, Any], time_limit_sec: float) -> Dict[str, Any]:
+    """Resolved solutionPool options except `enabled`."""
+    solver_cfg = constraint_config.get("solver") if isinstance(constraint_config.get("solver"), dict) else {}
+    cfg = solver_cfg.get("solutionPool") if isinstance(solver_cfg.get("solutionPool"), dict) else {}
+    return {
+        "size": min(MAX_POOL_SIZE, max(1, int(cfg.get("size") or 3))),
+        "minDifference": max(1, int(cfg.get("minDifference") or 4)),
+        "timeLimitSec": float(cfg.get("timeLimitSec") or min(10.0, 0.2 * time_limit_sec)),
+    }
+
+
+def hamming(a: np.ndarray, b: np.ndarray) -> int:
+    return int(np.count_nonzero(a != b))
+
+
+def _diverse_model(
+    model: cp_model.CpModel,
+    var_indices: List[int],
+    pooled: List[np.ndarray],
+    min_difference: int,
+) -> cp_model.CpModel:
+    """Clone that must differ from every pooled solution in >= min_difference
+    starts."""
+    sub = model.Clone()
+    sub.ClearHints()
+    xs = [sub.GetBoolVarFromProtoIndex(index) for index in var_indices]
+    for values in pooled:
+        # sum over placed (1 - x) + sum over unplaced x
+        coeffs = np.where(values == 1, -1, 1).tolist()
+        sub.Add(cp_model.LinearExpr.WeightedSum(xs, coeffs) >= min_difference - int(values.sum()))
+    return sub
+
+
+def run_pool(
+    model: cp_model.CpModel,
+    var_indices: List[int],
+    best: np.ndarray,
+    objective: float,
+    cfg: Dict[str, Any],
+    solve: Callable[[cp_model.CpModel, float], Tuple[int, cp_model.CpSolver]],
+    deadline: float,
+    should_stop: Optional[Callable[[], bool]] = None,
+) -> List[Dict[str, Any]]:
+    """Pool members ranked by objective, starting from the incumbent `best`
+    (aligned with `var_indices`). Each member has `values`, `objective`,
+    `status` (None for the incumbent) and `difference`, the Hamming distance
+    to the top-ranked member. An alternative can outrank a FEASIBLE (not
+    proven optimal) incumbent."""
+    pooled = [best]
+    members = [{"values": best, "objective": objective, "status": None}]
+    while len(pooled) < cfg["size"]:
+        if should_stop is not None and should_stop():
+            break
+        limit = min(cfg["timeLimitSec"], deadline - time.perf_counter())
+        if limit <= 0:
+            break
+        sub = _diverse_model(model, var_indices, pooled, cfg["minDifference"])
+        status, solver = solve(sub, limit)
+        if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            # INFEASIBLE: no timetable that different exists; UNKNOWN: out of time.
+            break
+        values = np.array(
+            [solver.Value(sub.GetBoolVarFromProtoIndex(index)) for index in var_indices], dtype=np.int8
+        )
+        pooled.append(values)
+        members.append(
+            {
+                "values": values,
+                "objective": solver.ObjectiveValue() if model.HasObjective() else 0.0,
+                "status": solver.StatusName(status),
+            }
+        )
+    members.sort(key=lambda m: m["objective"])
+    for member in members:
+        member["difference"] = hamming(member["values"], members[0]["values"])
+    return members
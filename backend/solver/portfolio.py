@@ -0,0 +1,111 @@
+# backend/solver/portfolio.py
+
+# Portfolio solving: K independent CP-SAT runs of the same payload with
+# different seeds and parameter sets, raced in separate processes.
+#
+# constraintConfig.solver.portfolio:
+#   size              number of runs (default SOLVER_PORTFOLIO_SIZE, 1 = off,
+#                     at most MAX_PORTFOLIO_SIZE)
+#   members           optional [{name, params, seed, workers}]; missing
+#                     entries are filled from DEFAULT_MEMBERS
+#   targetObjective   stop every run once one reaches this objective
+#   workersPerMember  CP-SAT workers per run (default SOLVER_WORKERS // size)
+#
+# The runs share the job's cores: size is cut to the worker budget, and
+# workersPerMember / members[].workers can only lower a run's even share.
+import os
+from typing import Any, Dict, List, Optional
+
+from ortools.sat.python import cp_model
+
+# Every run is its own spawned process.
+MAX_PORTFOLIO_SIZE = 8
+
+# SatParameters overrides, in text-format field names.
+DEFAULT_MEMBERS: List[Dict[str, Any]] = [
+    {"name": "default", "params": {}},
+    {"name": "quick_restart", "params": {"search_branching": "PORTFOLIO_WITH_QUICK_RESTART_SEARCH"}},
+    {"name": "lp_heavy", "params": {"linearization_level": 2}},
+    {"name": "no_lp", "params": {"linearization_level": 0}},
+    {"name": "pseudo_cost", "params": {"search_branching": "PSEUDO_COST_SEARCH"}},
+    {"name": "core", "params": {"optimize_with_core": True}},
+]
+
+
+def _text_value(value: Any) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+def params_text(params: Dict[str, Any]) -> str:
+    return " ".join(f"{key}: {_text_value(value)}" for key, value in params.items())
+
+
+def apply_params(solver: cp_model.CpSolver, params: Optional[Dict[str, Any]]) -> None:
+    if params and not solver.parameters.merge_text_format(params_text(params)):
+        raise ValueError(f"Invalid solver parameters: {params}")
+
+
+def portfolio_config(constraint_config: Dict[str, Any]) -> Dict[str, Any]:
+    solver_cfg = constraint_config.get("solver") if isinstance(constraint_config.get("solver"), dict) else {}
+    cfg = solver_cfg.get("portfolio")
+    cfg = cfg if isinstance(cfg, dict) else {}
+    members = cfg.get("members") if isinstance(cfg.get("members"), list) else []
+    size = int(cfg.get("size") or len(members) or os.getenv("SOLVER_PORTFOLIO_SIZE", "1"))
+    target = cfg.get("targetObjective")
+    return {
+        "size": min(MAX_PORTFOLIO_SIZE, max(1, size)),
+        "members": members,
+        "targetObjective": None if target is None else float(target),
+        "workersPerMember": cfg.get("workersPerMember"),
+    }
+
+
+def portfolio_members(cfg: Dict[str, Any], base_seed: int, total_workers: int) -> List[Dict[str, Any]]:
+    """Resolve the run list, at most `total_workers` CP-SAT workers in all.
+    Raises ValueError on unknown solver parameters."""
+    size = min(cfg["size"], max(1, total_workers))
+    share = max(1, total_workers // size)
+    default_workers = min(share, int(cfg["workersPerMember"] or share))
+    members: List[Dict[str, Any]] = []
+    for i in range(size):
+        given = cfg["members"][i] if i < len(cfg["members"]) else {}
+        preset = DEFAULT_MEMBERS[i % len(DEFAULT_MEMBERS)]
+        params = dict(given.get("params") if isinstance(given.get("params"), dict) else preset["params"])
+        name = str(given.get("name") or preset["name"])
+        if i >= len(DEFAULT_MEMBERS) and not given.get("name"):
+            name = f"{name}#{i // len(DEFAULT_MEMBERS)}"
+        apply_params(cp_model.CpSolver(), params)
+        members.append(
+            {
+                "name": name,
+                "seed": int(given.get("seed") if given.get("seed") is not None else base_seed + i),
+                "workers": max(1, min(share, int(given.get("workers") or default_workers))),
+                "params": params,
+            }
+        )
+    return members
+
+
+def reaches_target(result: Dict[str, Any], target: Optional[float]) -> bool:
+    """True when no other run needs to keep going after this result."""
+    if result.get("status") in ("OPTIMAL", "INFEASIBLE"):
+        return True
+    objective = ((result.get("stats") or {}).get("solver") or {}).get("objective")
+    return target is not None and objective is not None and objective <= target
+
+
+def best_index(results: List[Dict[str, Any]]) -> int:
+    """Lowest objective among successful runs (OPTIMAL wins ties); else the
+    first INFEASIBLE proof; else the first run."""
+
+    def _objective(result: Dict[str, Any]) -> float:
+        value = ((result.get("stats") or {}).get("solver") or {}).get("objective")
+        return float("inf") if value is None else value
+
+    solved = [i for i, r in enumerate(results) if r.get("ok")]
+    if solved:
+        return min(solved, key=lambda i: (_objective(results[i]), results[i].get("status") != "OPTIMAL", i))
+    proofs = [i for i, r in enumerate(results) if r.get("status") == "INFEASIBLE"]
+    return proofs[0] if proofs else 0
@@ -0,0 +1,260 @@
+# backend/solver/precheck.py
+
+# Capacity pre-check: necessary conditions for feasibility that can be
+# decided in milliseconds, before any CP-SAT variable is created.
+#
+# All checks work on hour units and the candidate starts the model would
+# get (so breaks, block fit, class days and hard teacher availability are
+# already applied):
+#   - fixed slots: two fixed lessons on one class/teacher hour, or more
+#     fixed hours than a class/subject requires
+#   - counting: a class's (or teacher's) demand vs. its usable slots
+#   - Hall condition: demand units matched to distinct slots they can use;
+#     a deficient set of subjects is reported with its neighbourhood size
+# Counting and matching only apply when weekly subject hours are hard.
+from typing import Any, Callable, Dict, Iterable, List, Set, Tuple
+
+Slot = Tuple[int, int]
+
+
+def _match_demand(
+    demand: Dict[Any, int], allowed: Dict[Any, Set[Slot]], slots: Set[Slot]
+) -> List[Dict[str, Any]]:
+    """Assign demand units to distinct slots; return Hall violators.
+
+    Greedy first (scarcest demand first), then alternating-path search for
+    whatever is left. When a unit cannot be placed, the keys and slots
+    reached by the failed search form a set K with |N(K)| < demand(K).
+    """
+    owner: Dict[Slot, Any] = {}
+    held: Dict[Any, Set[Slot]] = {k: set() for k in demand}
+    options = {k: sorted(allowed.get(k, set()) & slots) for k in demand}
+    for key in sorted(demand, key=lambda k: len(options[k])):
+        for slot in options[key]:
+            if len(held[key]) >= demand[key]:
+                break
+            if slot not in owner:
+                owner[slot] = key
+                held[key].add(slot)
+
+    violations: List[Dict[str, Any]] = []
+    dead: Set[Any] = set()
+    for key in demand:
+        while len(held[key]) < demand[key] and key not in dead:
+            # parent[k] = (key that wants the slot k holds, that slot)
+            parent: Dict[Any, Tuple[Any, Any]] = {key: (None, None)}
+            frontier = [key]
+            reached: Set[Slot] = set()
+            free_slot = None
+            while frontier and free_slot is None:
+                nxt = []
+                for k in frontier:
+                    for slot in options[k]:
+                        if slot in held[k] or slot in reached:
+                            continue
+                        reached.add(slot)
+                        other = owner.get(slot)
+                        if other is None:
+                            free_slot = (k, slot)
+                            break
+                        if other not in parent:
+                            parent[other] = (k, slot)
+                            nxt.append(other)
+                    if free_slot is not None:
+                        break
+                frontier = nxt
+            if free_slot is None:
+                keys = list(parent)
+                violations.append(
+                    {
+                        "keys": keys,
+                        "demand_hours": sum(demand[k] for k in keys),
+                        "available_slots": len(reached | {s for k in keys for s in held[k]}),
+                    }
+                )
+                dead.update(keys)
+                break
+            # Shift ownership back along the alternating path.
+            k, slot = free_slot
+            while k is not None:
+                owner[slot] = k
+                held[k].add(slot)
+                prev_k, prev_slot = parent[k]
+                if prev_k is not None:
+                    held[k].discard(prev_slot)
+                k, slot = prev_k, prev_slot
+    return violations
+
+
+def capacity_precheck(
+    classes: List[Dict[str, Any]],
+    combos: List[Dict[str, Any]],
+    required_hours_by_class_subject: Dict[str, Dict[str, int]],
+    class_slots: Dict[str, Set[Slot]],
+    subject_slots: Dict[Tuple[str, str], Set[Slot]],
+    teacher_slots: Dict[str, Set[Slot]],
+    fixed_starts: Iterable[Tuple[str, int, int]],
+    block_for: Callable[[str], int],
+    weekly_hours_hard: bool,
+) -> List[Dict[str, Any]]:
+    """Return structured reasons why the request cannot be feasible ([] = pass).
+
+    `subject_slots[(class, subject)]` / `teacher_slots[teacher]` are the hours
+    some candidate start covers; `class_slots` are all usable class hours.
+    Only the classes in `classes` (and `required_hours_by_class_subject`)
+    are checked.
+    """
+    combo_by_id = {c["_id"]: c for c in combos}
+    reasons: List[Dict[str, Any]] = []
+
+    # Fixed slots: overlaps and excess hours.
+    class_fixed: Dict[Tuple[str, int, int], str] = {}
+    teacher_fixed: Dict[Tuple[str, int, int], str] = {}
+    fixed_hours: Dict[Tuple[str, str], int] = {}
+    for combo_id, day, hour in sorted(set(fixed_starts)):
+        combo = combo_by_id[combo_id]
+        block = block_for(combo_id)
+        for class_id in combo.get("class_ids", []):
+            key = (class_id, combo["subject_id"])
+            fixed_hours[key] = fixed_hours.get(key, 0) + block
+        owners = [("class", cid, class_fixed) for cid in combo.get("class_ids", [])]
+        owners += [("teacher", fid, teacher_fixed) for fid in combo.get("faculty_ids", [])]
+        for kind, entity_id, taken in owners:
+            for h in range(hour, hour + block):
+                other = taken.get((entity_id, day, h))
+                if other is not None and other != combo_id:
+                    reasons.append(
+                        {
+                            "type": "fixed_slot_conflict",
+                            f"{kind}_id": entity_id,
+                            "day": day,
+                            "hour": h,
+                            "combos": [other, combo_id],
+                        }
+                    )
+                taken.setdefault((entity_id, day, h), combo_id)
+    for (class_id, subj_id), hours in sorted(fixed_hours.items()):
+        if class_id not in required_hours_by_class_subject:
+            continue
+        req = required_hours_by_class_subject[class_id].get(subj_id, 0)
+        if hours > req:
+            reasons.append(
+                {
+                    "type": "fixed_slots_exceed_required",
+                    "class_id": class_id,
+                    "subject_id": subj_id,
+                    "fixed_hours": hours,
+                    "required_hours": req,
+                }
+            )
+
+    if not weekly_hours_hard:
+        return reasons
+
+    combos_by_class_subject: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+    for combo in combos:
+        for class_id in combo.get("class_ids", []):
+            combos_by_class_subject.setdefault((class_id, combo["subject_id"]), []).append(combo)
+
+    # Classes: counting, then Hall over subjects x class hours.
+    for cls in classes:
+        class_id = cls["_id"]
+        demand: Dict[str, int] = {}
+        for subj_id, req in required_hours_by_class_subject[class_id].items():
+            remaining = req - fixed_hours.get((class_id, subj_id), 0)
+            if req > 0 and not subject_slots.get((class_id, subj_id)) and remaining > 0:
+                reasons.append(
+                    {
+                        "type": "no_candidate_slots",
+                        "class_id": class_id,
+                        "subject_id": subj_id,
+                        "required_hours": req,
+                        "combos": [c["_id"] for c in combos_by_class_subject.get((class_id, subj_id), [])],
+                    }
+                )
+            elif remaining > 0:
+                demand[subj_id] = remaining
+        free = {slot for slot in class_slots[class_id] if (class_id, *slot) not in class_fixed}
+        total = sum(demand.values())
+        if total > len(free):
+            reasons.append(
+                {
+                    "type": "class_overloaded",
+                    "class_id": class_id,
+                    "required_hours": total,
+                    "available_slots": len(free),
+                }
+            )
+            continue
+        allowed = {s: subject_slots.get((class_id, s), set()) for s in demand}
+        for violation in _match_demand(demand, allowed, free):
+            reasons.append(
+                {
+                    "type": "class_subjects_lack_slots",
+                    "class_id": class_id,
+                    "subject_ids": violation["keys"],
+                    "required_hours": violation["demand_hours"],
+                    "available_slots": violation["available_slots"],
+                }
+            )
+
+    # Teachers: only demand that no other teacher can take over is forced,
+    # i.e. class/subject pairs served solely by single-class combos of theirs.
+    forced: Dict[str, Dict[Tuple[str, str], int]] = {}
+    for (class_id, subj_id), serving in combos_by_class_subject.items():
+        req = required_hours_by_class_subject.get(class_id, {}).get(subj_id, 0)
+        remaining = req - fixed_hours.get((class_id, subj_id), 0)
+        if remaining <= 0 or any(len(c.get("class_ids", [])) != 1 for c in serving):
+            continue
+        common = set.intersection(*[set(c.get("faculty_ids", [])) for c in serving])
+        for fid in common:
+            forced.setdefault(fid, {})[(class_id, subj_id)] = remaining
+    for fid, demand in sorted(forced.items()):
+        free = {slot for slot in teacher_slots.get(fid, set()) if (fid, *slot) not in teacher_fixed}
+        total = sum(demand.values())
+        if total > len(free):
+            reasons.append(
+                {
+                    "type": "teacher_overloaded",
+                    "teacher_id": fid,
+                    "required_hours": total,
+                    "available_slots": len(free),
+                }
+            )
+            continue
+        allowed = {key: subject_slots.get(key, set()) for key in demand}
+        for violation in _match_demand(demand, allowed, free):
+            reasons.append(
+                {
+                    "type": "teacher_lessons_lack_slots",
+                    "teacher_id": fid,
+                    "lessons": [{"class_id": c, "subject_id": s} for c, s in violation["keys"]],
+                    "required_hours": violation["demand_hours"],
+                    "available_slots": violation["available_slots"],
+                }
+            )
+    return reasons
+
+
+def describe(reason: Dict[str, Any]) -> str:
+    kind = reason["type"]
+    if kind == "fixed_slot_conflict":
+        who = reason.get("class_id") or reason.get("teacher_id")
+        return f"fixed slots {reason['combos']} overlap for {who} at {reason['day']},{reason['hour']}"
+    if kind == "fixed_slots_exceed_required":
+        return (
+            f"class {reason['class_id']} has {reason['fixed_hours']} fixed hours of subject "
+            f"{reason['subject_id']} but requires {reason['required_hours']}"
+        )
+    if kind == "no_candidate_slots":
+        return f"class {reason['class_id']} subject {reason['subject_id']} has no slot it can be placed in"
+    if kind in ("class_overloaded", "class_subjects_lack_slots"):
+        subjects = f" (subjects {reason['subject_ids']})" if "subject_ids" in reason else ""
+        return (
+            f"class {reason['class_id']}{subjects} needs {reason['required_hours']} hours "
+            f"but has {reason['available_slots']} usable slots"
+        )
+    return (
+        f"teacher {reason['teacher_id']} needs {reason['required_hours']} hours "
+        f"but has {reason['available_slots']} usable slots"
+    )
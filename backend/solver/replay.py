@@ -0,0 +1,201 @@
+# backend/solver/replay.py
+
+# Export of built CP-SAT models for offline profiling, and their replay.
+#
+# constraintConfig.solver.dumpModel writes each built model to its own
+# directory under SOLVER_MODEL_DUMP_DIR (default ./model_dumps):
+#   model.pb      CpModelProto, binary (for other CP-SAT front ends)
+#   model.pbtxt   the same, text format (what replay loads: the Python
+#                 wrapper only parses text; the binary would need a slow
+#                 protobuf round trip)
+#   mapping.json  start var index -> anonymized (combo, day, hour), the
+#                 anonymized classes/teachers/subject of each combo and the
+#                 seed/time limit/workers/parameters the request ran with
+# Variable names carry payload ids, so they are replaced by v<index>.
+#
+# Replay reloads a dump and solves it with chosen SatParameters, skipping
+# payload parsing and model construction:
+#   python replay.py model_dumps/<dump> --param linearization_level=2
+import argparse
+import json
+import os
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from ortools.sat.python import cp_model
+
+from jobs import job_workers
+from portfolio import apply_params
+from stats import solver_stats
+
+MODEL_BINARY = "model.pb"
+MODEL_TEXT = "model.pbtxt"
+MAPPING = "mapping.json"
+
+
+def dump_root() -> str:
+    return os.path.abspath(os.getenv("SOLVER_MODEL_DUMP_DIR", "model_dumps"))
+
+
+def _anonymizer(prefix: str):
+    names: Dict[str, str] = {}
+
+    def _name(raw_id: Any) -> str:
+        return names.setdefault(str(raw_id), f"{prefix}{len(names)}")
+
+    return _name
+
+
+def export_model(
+    model: cp_model.CpModel,
+    x: Dict[Tuple[str, int, int], cp_model.IntVar],
+    combos: List[Dict[str, Any]],
+    solve: Dict[str, Any],
+    root: Optional[str] = None,
+) -> str:
+    """Write one built model as an anonymized dump; returns its directory."""
+    directory = os.path.join(
+        root or dump_root(), f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    )
+    os.makedirs(directory, exist_ok=True)
+
+    combo_name, class_name = _anonymizer("k"), _anonymizer("c")
+    teacher_name, subject_name = _anonymizer("t"), _anonymizer("s")
+    anon_combos = {
+        combo_name(c["_id"]): {
+            "classes": [class_name(cid) for cid in c.get("class_ids", [])],
+            "teachers": [teacher_name(fid) for fid in c.get("faculty_ids", [])],
+            "subject": subject_name(c["subject_id"]),
+        }
+        for c in combos
+    }
+
+    anonymous = model.Clone()
+    proto = anonymous.Proto()
+    proto.clear_name()
+    for i, var in enumerate(proto.variables):
+        var.name = f"v{i}"
+    anonymous.ExportToFile(os.path.join(directory, MODEL_BINARY))
+    anonymous.ExportToFile(os.path.join(directory, MODEL_TEXT))
+
+    mapping = {
+        "x": [[var.Index(), combo_name(cid), day, hour] for (cid, day, hour), var in x.items()],
+        "combos": anon_combos,
+        "solve": solve,
+        "model": {"variables": len(proto.variables), "constraints": len(proto.constraints)},
+    }
+    with open(os.path.join(directory, MAPPING), "w", encoding="utf-8") as f:
+        json.dump(mapping, f, separators=(",", ":"))
+    return directory
+
+
+def load_dump(directory: str) -> Tuple[cp_model.CpModel, Dict[str, Any]]:
+    """Raises FileNotFoundError / ValueError for a missing or unreadable dump."""
+    with open(os.path.join(directory, MAPPING), encoding="utf-8") as f:
+        mapping = json.load(f)
+    with open(os.path.join(directory, MODEL_TEXT), encoding="utf-8") as f:
+        text = f.read()
+    model = cp_model.CpModel()
+    if not model.Proto().parse_text_format(text):
+        raise ValueError(f"Unreadable model dump: {directory}")
+    return model, mapping
+
+
+def replay_solver(
+    mapping: Dict[str, Any],
+    params: Optional[Dict[str, Any]] = None,
+    time_limit_sec: Optional[float] = None,
+    num_workers: Optional[int] = None,
+    random_seed: Optional[int] = None,
+) -> cp_model.CpSolver:
+    """Solver set up like the original request, then overridden by `params`."""
+    solve = mapping.get("solve") or {}
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = float(
+        time_limit_sec if time_limit_sec is not None else solve.get("timeLimitSec", 60)
+    )
+    # Inside a job: the cores the scheduler granted it, at most.
+    granted = job_workers()
+    workers = int(num_workers or granted or solve.get("numWorkers") or 8)
+    solver.parameters.num_workers = min(workers, granted) if granted else workers
+    solver.parameters.random_seed = int(
+        random_seed if random_seed is not None else solve.get("randomSeed", 1)
+    )
+    apply_params(solver, {**(solve.get("params") or {}), **(params or {})})
+    return solver
+
+
+def check_replay_request(body: Dict[str, Any]) -> None:
+    """Raises ValueError for a /replay body replay_solver would choke on."""
+    for key, cast in (("timeLimitSec", float), ("numWorkers", int), ("randomSeed", int)):
+        value = body.get(key)
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            raise ValueError(f"{key} must be a number")
+        try:
+            number = cast(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"{key} must be a number") from None
+        if key != "randomSeed" and not number > 0:
+            raise ValueError(f"{key} must be positive")
+    params = body.get("params")
+    if params is not None:
+        if not isinstance(params, dict):
+            raise ValueError("params must be an object of SatParameters fields")
+        apply_params(cp_model.CpSolver(), params)
+
+
+def replay_report(
+    solver: cp_model.CpSolver, status: int, model: cp_model.CpModel, mapping: Dict[str, Any]
+) -> Dict[str, Any]:
+    solved = status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+    placements: List[List[Any]] = []
+    if solved:
+        for index, combo, day, hour in mapping["x"]:
+            if solver.Value(model.GetBoolVarFromProtoIndex(index)):
+                placements.append([combo, day, hour])
+    return {
+        "ok": solved,
+        "status": solver.StatusName(status),
+        "placements": placements,
+        "stats": {
+            "model": mapping.get("model"),
+            "solver": solver_stats(solver, status, model.HasObjective()),
+        },
+    }
+
+
+def _parse_param(text: str) -> Tuple[str, Any]:
+    key, _, raw = text.partition("=")
+    try:
+        value: Any = json.loads(raw)
+    except ValueError:
+        value = raw
+    return key.strip(), value
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Solve a dumped timetable model.")
+    parser.add_argument("dump", help="dump directory written by solver.dumpModel")
+    parser.add_argument("--param", action="append", default=[], help="SatParameters override, key=value")
+    parser.add_argument("--time-limit", type=float, default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--placements", action="store_true", help="include the placed starts")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    model, mapping = load_dump(args.dump)
+    load_sec = time.perf_counter() - started
+    solver = replay_solver(mapping, dict(_parse_param(p) for p in args.param), args.time_limit, args.workers, args.seed)
+    report = replay_report(solver, solver.Solve(model), model, mapping)
+    report["stats"]["load_sec"] = round(load_sec, 6)
+    if not args.placements:
+        report.pop("placements")
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# backend/solver/slotmask.py
+
+# Integer bitset slot masks for the scalar checks in the model builder
+# (fixed-slot validation, explain-mode availability guards, continuity
+# windows) and the block starts of candidate generation (placement.py, which
+# does the per-teacher availability tests on NumPy arrays instead).
+#
+#   hour masks   bit h            breaks, valid block starts per block size
+#   week masks   bit d * H + h    teacher unavailability (global slots OR-ed
+#                                 in), and "busy somewhere in [h, h + block)"
+#                                 per teacher and block size
+#
+# Every check is then one shift-and-AND instead of a loop of set lookups.
+from typing import Dict, Iterable, List, Set, Tuple
+
+
+def _hour_bits(hours: Iterable[int], hours_per_day: int) -> int:
+    bits = 0
+    for h in hours:
+        if 0 <= h < hours_per_day:
+            bits |= 1 << h
+    return bits
+
+
+def _slot_bits(slots: Iterable[Tuple[int, int]], num_days: int, hours_per_day: int) -> int:
+    bits = 0
+    for day, hour in slots:
+        if 0 <= day < num_days and 0 <= hour < hours_per_day:
+            bits |= 1 << (day * hours_per_day + hour)
+    return bits
+
+
+class SlotMasks:
+    """Bitset views of breaks and teacher availability for one instance."""
+
+    def __init__(
+        self,
+        num_days: int,
+        hours_per_day: int,
+        break_hours: Iterable[int],
+        global_unavailable: Set[Tuple[int, int]],
+        unavailable_by_teacher: Dict[str, Set[Tuple[int, int]]],
+    ) -> None:
+        self.num_days = num_days
+        self.hours_per_day = hours_per_day
+        self.breaks = _hour_bits(break_hours, hours_per_day)
+        self._global = _slot_bits(global_unavailable, num_days, hours_per_day)
+        self._by_teacher = {
+            fid: _slot_bits(slots, num_days, hours_per_day) | self._global
+            for fid, slots in unavailable_by_teacher.items()
+        }
+        self._starts: Dict[int, int] = {}
+        self._busy: Dict[Tuple[str, int], int] = {}
+        # _inside[k]: week bits of the hours h with h + k still in the same day.
+        self._inside: List[int] = []
+
+    def is_break(self, hour: int) -> bool:
+        return bool(self.breaks >> hour & 1)
+
+    def block_starts(self, block: int) -> int:
+        """Hour bits h where a block of `block` hours fits and has no break inside."""
+        bits = self._starts.get(block)
+        if bits is None:
+            bits = (1 << max(0, self.hours_per_day - block + 1)) - 1
+            for k in range(block):
+                bits &= ~(self.breaks >> k)
+            self._starts[block] = bits
+        return bits
+
+    def start_hours(self, block: int) -> List[int]:
+        bits = self.block_starts(block)
+        return [h for h in range(self.hours_per_day) if bits >> h & 1]
+
+    def unavailable(self, fid: str) -> int:
+        """Week bits where teacher `fid` is unavailable."""
+        return self._by_teacher.get(fid, self._global)
+
+    def _inside_mask(self, k: int) -> int:
+        hours_per_day = self.hours_per_day
+        while len(self._inside) <= k:
+            shift = len(self._inside)
+            day_bits = (1 << max(0, hours_per_day - shift)) - 1
+            self._inside.append(
+                sum(day_bits << (day * hours_per_day) for day in range(self.num_days))
+            )
+        return self._inside[k]
+
+    def busy_starts(self, fid: str, block: int) -> int:
+        """Week bits (d, h) where `fid` is unavailable somewhere in [h, h + block)
+        of day d (the window is cut at the end of the day)."""
+        key = (fid, block)
+        bits = self._busy.get(key)
+        if bits is None:
+            unavailable = self.unavailable(fid)
+            bits = unavailable
+            for k in range(1, block):
+                bits |= (unavailable >> k) & self._inside_mask(k)
+            self._busy[key] = bits
+        return bits
+
+    def teacher_busy(self, fid: str, day: int, hour: int, block: int = 1) -> bool:
+        return bool(self.busy_starts(fid, block) >> (day * self.hours_per_day + hour) & 1)
+
+    def any_teacher_busy(self, fids: Iterable[str], day: int, hour: int, block: int = 1) -> bool:
+        bit = 1 << (day * self.hours_per_day + hour)
+        return any(self.busy_starts(fid, block) & bit for fid in fids)
@@ -0,0 +1,131 @@
+# backend/solver/stats.py
+
+# Per-phase timing and model-size accounting for one solve.
+#
+# Phases are laps: begin("x") closes whatever phase was open, so the model
+# builder only needs one line per section. While a model is attached, each
+# phase also records how many variables/constraints it added.
+import time
+from typing import Any, Dict, List, Optional
+
+from ortools.sat.python import cp_model
+
+
+class SolveStats:
+    def __init__(self) -> None:
+        self.phases: Dict[str, float] = {}
+        self.families: Dict[str, Dict[str, int]] = {}
+        self._model: Optional[cp_model.CpModel] = None
+        self._open: Optional[str] = None
+        self._started = 0.0
+        self._sizes = (0, 0)
+
+    def _model_sizes(self) -> tuple:
+        if self._model is None:
+            return (0, 0)
+        proto = self._model.Proto()
+        return (len(proto.variables), len(proto.constraints))
+
+    def attach(self, model: cp_model.CpModel) -> None:
+        self._model = model
+        self._sizes = self._model_sizes()
+
+    @property
+    def current(self) -> Optional[str]:
+        """The open phase, if any."""
+        return self._open
+
+    def begin(self, name: str) -> None:
+        self.end()
+        self._open = name
+        self._started = time.perf_counter()
+        self._sizes = self._model_sizes()
+
+    def end(self) -> None:
+        if self._open is None:
+            return
+        name, self._open = self._open, None
+        self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - self._started
+        if self._model is None:
+            return
+        variables, constraints = self._model_sizes()
+        added_vars, added_constraints = variables - self._sizes[0], constraints - self._sizes[1]
+        if added_vars or added_constraints:
+            family = self.families.setdefault(name, {"variables": 0, "constraints": 0})
+            family["variables"] += added_vars
+            family["constraints"] += added_constraints
+
+    def as_dict(self) -> Dict[str, Any]:
+        self.end()
+        variables, constraints = self._model_sizes()
+        return {
+            "phases_sec": {k: round(v, 6) for k, v in self.phases.items()},
+            "families": {k: dict(v) for k, v in self.families.items()},
+            "model": {"variables": variables, "constraints": constraints},
+        }
+
+
+def solver_stats(solver: cp_model.CpSolver, status: int, has_objective: bool) -> Dict[str, Any]:
+    """CP-SAT response statistics for the `stats.solver` section."""
+    solved = status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+    objective = solver.ObjectiveValue() if solved and has_objective else None
+    bound = solver.BestObjectiveBound() if has_objective else None
+    gap = None
+    if objective is not None and bound is not None:
+        gap = abs(objective - bound) / max(1.0, abs(objective))
+    return {
+        "status": solver.StatusName(status),
+        "wall_time_sec": solver.WallTime(),
+        "user_time_sec": solver.UserTime(),
+        "deterministic_time": solver.ResponseProto().deterministic_time,
+        "conflicts": solver.NumConflicts(),
+        "branches": solver.NumBranches(),
+        "booleans": solver.NumBooleans(),
+        "objective": objective,
+        "bound": bound,
+        "gap": gap,
+    }
+
+
+def merge_stats(parts: List[Optional[Dict[str, Any]]]) -> Dict[str, Any]:
+    """Combine per-component stats: times and counts add up, wall time is the max."""
+    parts = [p for p in parts if p]
+    phases: Dict[str, float] = {}
+    families: Dict[str, Dict[str, int]] = {}
+    model = {"variables": 0, "constraints": 0}
+    solver: Dict[str, Any] = {
+        "wall_time_sec": 0.0,
+        "user_time_sec": 0.0,
+        "deterministic_time": 0.0,
+        "conflicts": 0,
+        "branches": 0,
+        "booleans": 0,
+        "objective": None,
+        "bound": None,
+        "gap": None,
+    }
+    for part in parts:
+        for name, sec in part.get("phases_sec", {}).items():
+            phases[name] = round(phases.get(name, 0.0) + sec, 6)
+        for name, counts in part.get("families", {}).items():
+            family = families.setdefault(name, {"variables": 0, "constraints": 0})
+            family["variables"] += counts["variables"]
+            family["constraints"] += counts["constraints"]
+        for key in model:
+            model[key] += part.get("model", {}).get(key, 0)
+        sub = part.get("solver") or {}
+        solver["wall_time_sec"] = max(solver["wall_time_sec"], sub.get("wall_time_sec") or 0.0)
+        for key in ("user_time_sec", "deterministic_time", "conflicts", "branches", "booleans"):
+            solver[key] += sub.get(key) or 0
+        for key in ("objective", "bound"):
+            if sub.get(key) is not None:
+                solver[key] = (solver[key] or 0) + sub[key]
+    if solver["objective"] is not None and solver["bound"] is not None:
+        solver["gap"] = abs(solver["objective"] - solver["bound"]) / max(1.0, abs(solver["objective"]))
+    return {
+        "phases_sec": phases,
+        "families": families,
+        "model": model,
+        "solver": solver,
+        "components": len(parts),
+    }
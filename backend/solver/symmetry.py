@@ -0,0 +1,43 @@
+# backend/solver/symmetry.py
+
+# Symmetry breaking for interchangeable combos.
+#
+# Two combos with the same classes, subject and teachers have identical
+# candidate starts and feed exactly the same class/teacher/subject covers;
+# only their sum counts towards weekly hours. Any lesson placed on one of
+# them can be relabelled to the other without changing feasibility or the
+# objective, so CP-SAT would otherwise explore every relabelling. Fixing all
+# non-representative members to zero keeps exactly one labelling.
+#
+# Repeated lessons of one combo need no extra constraint: starts are 0/1 per
+# (combo, day, hour), which is already a set rather than a numbered list of
+# lessons.
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+
+def equivalent_combo_groups(
+    combos: List[Dict[str, Any]],
+    class_by_id: Dict[str, Dict[str, Any]],
+    subject_by_id: Dict[str, Dict[str, Any]],
+) -> List[List[str]]:
+    """Groups (2+ members, payload order) of interchangeable combo ids."""
+    groups: Dict[Tuple[Any, ...], List[str]] = {}
+    for combo in combos:
+        class_ids = tuple(sorted(cid for cid in combo.get("class_ids", []) if cid in class_by_id))
+        if not class_ids or combo["subject_id"] not in subject_by_id:
+            continue
+        key = (class_ids, combo["subject_id"], tuple(sorted(combo.get("faculty_ids", []))))
+        groups.setdefault(key, []).append(combo["_id"])
+    return [ids for ids in groups.values() if len(ids) > 1]
+
+
+def redundant_combo_ids(groups: Iterable[List[str]], referenced: Set[str]) -> List[str]:
+    """Members whose starts can be fixed to 0.
+
+    The first member of each group is its representative. Combos referenced
+    by fixed slots or a previous timetable are distinguishable and kept.
+    """
+    redundant: List[str] = []
+    for group in groups:
+        redundant += [cid for cid in group[1:] if cid not in referenced]
+    return redundant
@@ -0,0 +1,10 @@
+# backend/solver/tests/conftest.py
+
+# The solver modules import each other as top-level modules (the service runs
+# from backend/solver), so the tests put that directory on the import path:
+#
+#   cd backend/solver && python -m pytest tests
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,106 @@
+import copy
+import os
+from typing import Any, Dict
+
+import cache
+from cache import ResultCache, payload_cache_key
+
+
+def _payload() -> Dict[str, Any]:
+    return {
+        "faculties": [{"_id": "f1"}],
+        "subjects": [{"_id": "s1"}],
+        "classes": [{"_id": "c1"}],
+        "combos": [{"_id": "k1", "class_ids": ["c1"], "faculty_ids": ["f1"], "subject_id": "s1"}],
+        "constraintConfig": {"solver": {"timeLimitSec": 10}, "schedule": {"hoursPerDay": 8}},
+    }
+
+
+def test_payload_cache_key_ignores_key_order_and_metadata():
+    payload = _payload()
+    reordered = dict(reversed(list(copy.deepcopy(payload).items())))
+    reordered["constraintConfig"] = dict(reversed(list(reordered["constraintConfig"].items())))
+    reordered["requestId"] = "abc"
+    reordered["useCache"] = True
+    assert payload_cache_key(reordered, 1) == payload_cache_key(payload, 1)
+
+
+def test_payload_cache_key_splits_on_inputs():
+    payload = _payload()
+    key = payload_cache_key(payload, 1)
+    assert payload_cache_key(payload, 2) != key
+    assert payload_cache_key(payload, 1, extra={"format": "grid"}) != key
+    for field, value in (
+        ("normalizedIds", True),
+        ("fixed_slots", [{"class": "c1", "combo": "k1", "day": 0, "hour": 0}]),
+        ("previousTimetable", {"c1": [["k1"]]}),
+        ("solver_time_limit_sec", 5),
+    ):
+        assert payload_cache_key({**payload, field: value}, 1) != key, field
+    changed = copy.deepcopy(payload)
+    changed["constraintConfig"]["solver"]["timeLimitSec"] = 20
+    assert payload_cache_key(changed, 1) != key
+
+
+def test_result_cache_lru_eviction():
+    store = ResultCache(max_entries=2)
+    store.put("a", {"v": 1})
+    store.put("b", {"v": 2})
+    assert store.get("a") == {"v": 1}
+    store.put("c", {"v": 3})
+    # "b" was the least recently used entry.
+    assert store.get("b") is None
+    assert store.get("a") == {"v": 1}
+    assert store.get("c") == {"v": 3}
+    assert store.stats()["entries"] == 2
+
+
+def test_result_cache_byte_budget():
+    # Each entry is 18 bytes of JSON.
+    store = ResultCache(max_entries=10, max_bytes=30)
+    store.put("a", {"v": "x" * 10})
+    store.put("b", {"v": "y" * 10})
+    assert store.get("a") is None
+    assert store.get("b") is not None
+    # Larger than the whole budget: never stored.
+    store.put("big", {"v": "z" * 100})
+    assert store.get("big") is None
+    assert store.stats()["bytes"] == 18
+
+
+def test_result_cache_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "time", lambda: now[0])
+    store = ResultCache(ttl_sec=60)
+    store.put("a", {"v": 1})
+    now[0] += 59
+    assert store.get("a") == {"v": 1}
+    now[0] += 2
+    assert store.get("a") is None
+    assert store.stats() == {"entries": 0, "bytes": 0}
+
+
+def test_result_cache_disk_tier(tmp_path):
+    disk = str(tmp_path)
+    ResultCache(max_entries=1, disk_dir=disk).put("a", {"v": 1})
+    # A fresh process (empty memory tier) reads it back from disk.
+    fresh = ResultCache(max_entries=1, disk_dir=disk)
+    assert fresh.get("a") == {"v": 1}
+    assert fresh.stats()["entries"] == 1
+
+
+def test_result_cache_disk_bound(tmp_path):
+    disk = str(tmp_path)
+    store = ResultCache(max_entries=0, disk_dir=disk, disk_max_entries=2)
+    for i, key in enumerate(("a", "b", "c")):
+        store.put(key, {"v": key})
+        # Distinct mtimes so the oldest file is the one removed.
+        os.utime(os.path.join(disk, f"{key}.json"), (i, i))
+    assert sorted(os.listdir(disk)) == ["b.json", "c.json"]
+
+
+def test_result_cache_disabled():
+    store = ResultCache(max_entries=0)
+    assert not store.enabled
+    store.put("a", {"v": 1})
+    assert store.get("a") is None
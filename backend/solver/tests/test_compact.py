@@ -0,0 +1,97 @@
+import gzip
+import json
+from typing import Any, Dict
+
+import pytest
+
+from compact import BREAK_CODE, EMPTY_CODE, compact_result, encode_response, response_layout, wants_msgpack
+
+
+def _result() -> Dict[str, Any]:
+    return {
+        "ok": True,
+        "status": "OPTIMAL",
+        "class_timetables": {
+            "c1": [["k1", "BREAK", -1], ["k2", "BREAK", "k1"]],
+            "c2": [[-1, "BREAK", "k3"], [None, "BREAK", -1]],
+        },
+        "faculty_timetables": {"f1": [["k1", "BREAK", "k3"], ["k2", "BREAK", "k1"]]},
+        "classes": [{"_id": "c1"}, {"_id": "c2"}],
+        "config": {"solver": {}},
+        "warnings": [],
+    }
+
+
+@pytest.mark.parametrize(
+    "query, accept, layout",
+    [
+        (None, "", "full"),
+        ("grid", "", "grid"),
+        ("STARTS", "", "starts"),
+        (None, "application/json; format=grid", "grid"),
+        (None, 'text/html, application/json;q=0.9;format="starts"', "starts"),
+        ("full", "application/json; format=grid", "full"),
+        ("columns", "", None),
+    ],
+)
+def test_response_layout(query, accept, layout):
+    assert response_layout(query, accept) == layout
+
+
+def test_wants_msgpack():
+    assert wants_msgpack("application/msgpack")
+    assert wants_msgpack("application/json;q=0.5, application/x-msgpack")
+    assert not wants_msgpack("application/json")
+
+
+def test_compact_result_full_and_errors_pass_through():
+    result = _result()
+    assert compact_result(result, "full") is result
+    error = {"ok": False, "error": "Capacity pre-check failed", "status": "INFEASIBLE"}
+    assert compact_result(error, "grid") is error
+
+
+def test_compact_result_grid():
+    body = compact_result(_result(), "grid")
+    assert body["format"] == "grid"
+    assert body["ids"] == {"combos": ["k1", "k2", "k3"], "classes": ["c1", "c2"], "faculties": ["f1"]}
+    assert body["class_timetables"] == [
+        [[0, BREAK_CODE, EMPTY_CODE], [1, BREAK_CODE, 0]],
+        [[EMPTY_CODE, BREAK_CODE, 2], [EMPTY_CODE, BREAK_CODE, EMPTY_CODE]],
+    ]
+    assert body["faculty_timetables"] == [[[0, BREAK_CODE, 2], [1, BREAK_CODE, 0]]]
+    assert "classes" not in body and "config" not in body
+    assert body["warnings"] == []
+
+
+def test_compact_result_starts():
+    starts = [("k2", 1, 0), ("k1", 0, 0), ("k1", 1, 2), ("k3", 0, 2)]
+    body = compact_result(_result(), "starts", starts)
+    assert body["ids"]["combos"] == ["k1", "k2", "k3"]
+    assert body["starts"] == [[0, 0, 0], [0, 1, 2], [1, 1, 0], [2, 0, 2]]
+    assert "class_timetables" not in body and "faculty_timetables" not in body
+
+
+def test_compact_result_pool_shares_ids():
+    result = _result()
+    alternative = {**_result(), "objective": 5}
+    alternative["class_timetables"]["c1"][0][0] = "k4"
+    result["solutionPool"] = [{**_result(), "objective": 3}, alternative]
+    body = compact_result(result, "grid")
+    assert body["ids"]["combos"] == ["k1", "k2", "k3", "k4"]
+    assert [member["objective"] for member in body["solutionPool"]] == [3, 5]
+    assert body["solutionPool"][1]["class_timetables"][0][0][0] == 3
+    assert "classes" not in body["solutionPool"][0]
+
+
+def test_encode_response_gzip_only_when_it_pays_off():
+    small = encode_response({"ok": True}, "application/json", "gzip")
+    assert "content-encoding" not in small.headers
+    assert json.loads(small.body) == {"ok": True}
+
+    content = compact_result(_result(), "grid")
+    content["warnings"] = ["w" * 50] * 50
+    large = encode_response(content, "application/json", "gzip, deflate")
+    assert large.headers["content-encoding"] == "gzip"
+    assert large.headers["vary"] == "Accept, Accept-Encoding"
+    assert json.loads(gzip.decompress(large.body)) == content
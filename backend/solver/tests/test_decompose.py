@@ -0,0 +1,188 @@
+from typing import Any, Dict, List
+
+from decompose import merge_results, split_payload
+from instance_generator import generate_instance
+
+EMPTY, BREAK = -1, "BREAK"
+
+
+def _payload() -> Dict[str, Any]:
+    # c1/c2 share teacher f1; c3 is taught by f2 alone; c4 and f3 have no combo.
+    return {
+        "faculties": [{"_id": "f1"}, {"_id": "f2"}, {"_id": "f3"}],
+        "classes": [{"_id": "c1"}, {"_id": "c2"}, {"_id": "c3"}, {"_id": "c4"}],
+        "subjects": [{"_id": "s1"}],
+        "combos": [
+            {"_id": "k1", "class_ids": ["c1"], "faculty_ids": ["f1"], "subject_id": "s1"},
+            {"_id": "k2", "class_ids": ["c2"], "faculty_ids": ["f1"], "subject_id": "s1"},
+            {"_id": "k3", "class_ids": ["c3"], "faculty_ids": ["f2"], "subject_id": "s1"},
+        ],
+        "fixed_slots": [{"class": "c3", "combo": "k3", "day": 0, "hour": 1}],
+        "previousTimetable": {"c1": [[1]], "c3": [[3]]},
+        "constraintConfig": {"solver": {"timeLimitSec": 5}},
+    }
+
+
+def _ids(items: List[Dict[str, Any]]) -> List[str]:
+    return [item["_id"] for item in items]
+
+
+def test_split_payload_by_component():
+    parts = split_payload(_payload())
+    assert [_ids(p["classes"]) for p in parts] == [["c1", "c2"], ["c3"], ["c4"]]
+    assert [_ids(p["faculties"]) for p in parts] == [["f1"], ["f2"], ["f3"]]
+    assert [_ids(p["combos"]) for p in parts] == [["k1", "k2"], ["k3"], []]
+    assert [len(p["fixed_slots"]) for p in parts] == [0, 1, 0]
+    assert [p["previousTimetable"] for p in parts] == [{"c1": [[1]]}, {"c3": [[3]]}, {}]
+    # Shared, non-entity fields are copied into every part.
+    assert all(p["subjects"] == [{"_id": "s1"}] for p in parts)
+    assert all(p["constraintConfig"] == {"solver": {"timeLimitSec": 5}} for p in parts)
+
+
+def test_split_payload_keeps_connected_payload_whole():
+    payload = _payload()
+    payload["combos"].append({"_id": "k4", "class_ids": ["c1", "c3"], "faculty_ids": [], "subject_id": "s1"})
+    assert split_payload(payload) == [payload]
+
+
+def test_split_payload_generated_departments():
+    payload = generate_instance(num_classes=6, num_teachers=12, num_departments=3, seed=0)
+    parts = split_payload(payload)
+    assert len(parts) == 3
+    for key in ("classes", "faculties", "combos"):
+        assert sorted(_ids([i for p in parts for i in p[key]])) == sorted(_ids(payload[key]))
+    for part in parts:
+        class_ids = set(_ids(part["classes"]))
+        faculty_ids = set(_ids(part["faculties"]))
+        for combo in part["combos"]:
+            assert set(combo["class_ids"]) <= class_ids
+            assert set(combo["faculty_ids"]) <= faculty_ids
+
+
+def _result(class_id: str, status: str = "OPTIMAL", **extra: Any) -> Dict[str, Any]:
+    return {
+        "ok": True,
+        "status": status,
+        "class_timetables": {class_id: [[class_id, BREAK]]},
+        "faculty_timetables": {},
+        "classes": [{"_id": class_id}],
+        "unmet_requirements": [],
+        "warnings": [f"{class_id} warning"],
+        "config": {"solver": {}},
+        **extra,
+    }
+
+
+def test_merge_results_combines_timetables():
+    payload = {"classes": [{"_id": "c1"}, {"_id": "c2"}]}
+    first = _result("c2", faculty_timetables={"f1": [[EMPTY, BREAK], [EMPTY, BREAK]]})
+    second = _result("c1", "FEASIBLE")
+    second["class_timetables"]["c1"].append([EMPTY, BREAK])
+    merged = merge_results(payload, [first, second], EMPTY, BREAK)
+    assert merged["ok"] is True
+    assert merged["status"] == "FEASIBLE"
+    assert _ids(merged["classes"]) == ["c1", "c2"]
+    assert sorted(merged["class_timetables"]) == ["c1", "c2"]
+    assert merged["warnings"] == ["c2 warning", "c1 warning"]
+    assert merged["components"] == [{"classes": 1, "status": "OPTIMAL"}, {"classes": 1, "status": "FEASIBLE"}]
+    # Faculty grids span the longest class week.
+    assert merged["faculty_timetables"]["f1"] == [[EMPTY, BREAK], [EMPTY, BREAK]]
+
+    merged = merge_results(payload, [_result("c1"), _result("c2")], EMPTY, BREAK)
+    assert merged["status"] == "OPTIMAL"
+
+
+def test_merge_results_pads_short_faculty_grids():
+    long_week = _result("c1")
+    long_week["class_timetables"]["c1"] = [[EMPTY, BREAK]] * 3
+    short_teacher = _result("c2", faculty_timetables={"f2": [["k9", BREAK]]})
+    merged = merge_results({"classes": []}, [long_week, short_teacher], EMPTY, BREAK)
+    assert merged["faculty_timetables"]["f2"] == [["k9", BREAK], [EMPTY, BREAK], [EMPTY, BREAK]]
+
+
+def test_merge_results_reports_failed_components():
+    failed = {
+        "ok": False,
+        "status": "INFEASIBLE",
+        "error": "Capacity pre-check failed",
+        "classes": [{"_id": "c2"}],
+        "precheck": [{"type": "class_overloaded", "class_id": "c2"}],
+    }
+    merged = merge_results({"classes": []}, [_result("c1"), failed], EMPTY, BREAK)
+    assert merged["ok"] is False
+    assert merged["status"] == "INFEASIBLE"
+    assert merged["error"] == "component 1: Capacity pre-check failed"
+    assert merged["precheck"] == failed["precheck"]
+    assert "class_timetables" not in merged
+
+
+def test_merge_results_sums_repair_reports():
+    def _repair(class_id: str) -> Dict[str, Any]:
+        report = {
+            "classes": [class_id],
+            "freeStarts": 5,
+            "frozenLessons": 2,
+            "modelledClasses": 1,
+            "modelledTeachers": 2,
+        }
+        return _result(class_id, repair=report)
+
+    merged = merge_results({"classes": []}, [_repair("c2"), _repair("c1")], EMPTY, BREAK)
+    assert merged["repair"] == {
+        "classes": ["c1", "c2"],
+        "freeStarts": 10,
+        "frozenLessons": 4,
+        "modelledClasses": 2,
+        "modelledTeachers": 4,
+    }
+
+
+def test_merge_results_merges_phase_reports():
+    two_phase = [
+        {
+            "feasibility": {"status": "FEASIBLE", "wall_time_sec": 1.0},
+            "optimization": {"status": "OPTIMAL", "wall_time_sec": 2.0},
+        },
+        {
+            "feasibility": {"status": "FEASIBLE", "wall_time_sec": 3.0},
+            "optimization": {"status": "FEASIBLE", "wall_time_sec": 1.0},
+            "fallback": False,
+        },
+    ]
+    lns = [
+        {
+            "iterations": 4,
+            "improvements": 1,
+            "provedOptimal": True,
+            "objective": 10,
+            "trajectory": [12, 10],
+            "neighborhoods": {"class": {"tried": 3, "improved": 1}},
+        },
+        {
+            "iterations": 6,
+            "improvements": 2,
+            "provedOptimal": False,
+            "objective": 7,
+            "trajectory": [9, 8, 7],
+            "neighborhoods": {"class": {"tried": 2, "improved": 1}, "teacher": {"tried": 4, "improved": 1}},
+        },
+    ]
+    results = [
+        _result("c1", twoPhase=two_phase[0], lns=lns[0]),
+        _result("c2", twoPhase=two_phase[1], lns=lns[1]),
+    ]
+    merged = merge_results({"classes": []}, results, EMPTY, BREAK)
+    assert merged["twoPhase"] == {
+        "feasibility": {"status": "FEASIBLE", "wall_time_sec": 3.0},
+        "optimization": {"status": "FEASIBLE", "wall_time_sec": 2.0},
+        "fallback": False,
+        "components": 2,
+    }
+    assert merged["lns"]["iterations"] == 10
+    assert merged["lns"]["improvements"] == 3
+    assert merged["lns"]["provedOptimal"] is False
+    assert merged["lns"]["neighborhoods"] == {
+        "class": {"tried": 5, "improved": 2},
+        "teacher": {"tried": 4, "improved": 1},
+    }
+    assert [c["objective"] for c in merged["lns"]["components"]] == [10, 7]
@@ -0,0 +1,118 @@
+from typing import Any, Dict, Optional
+
+import pytest
+from ortools.sat.python import cp_model
+
+from portfolio import (
+    DEFAULT_MEMBERS,
+    MAX_PORTFOLIO_SIZE,
+    apply_params,
+    best_index,
+    params_text,
+    portfolio_config,
+    portfolio_members,
+    reaches_target,
+)
+
+
+def _config(**portfolio: Any) -> Dict[str, Any]:
+    return portfolio_config({"solver": {"portfolio": portfolio}})
+
+
+def _run(status: str, objective: Optional[float] = None, ok: Optional[bool] = None) -> Dict[str, Any]:
+    solved = status in ("OPTIMAL", "FEASIBLE")
+    return {
+        "ok": solved if ok is None else ok,
+        "status": status,
+        "stats": {"solver": {"objective": objective}},
+    }
+
+
+def test_params_text_and_apply_params():
+    assert params_text({"linearization_level": 2, "optimize_with_core": True}) == (
+        "linearization_level: 2 optimize_with_core: true"
+    )
+    solver = cp_model.CpSolver()
+    apply_params(solver, {"linearization_level": 2})
+    assert solver.parameters.linearization_level == 2
+    with pytest.raises(ValueError):
+        apply_params(cp_model.CpSolver(), {"no_such_field": 1})
+
+
+def test_portfolio_config_size(monkeypatch):
+    monkeypatch.setenv("SOLVER_PORTFOLIO_SIZE", "1")
+    assert _config()["size"] == 1
+    assert _config(members=[{}, {}, {}])["size"] == 3
+    assert _config(size=64)["size"] == MAX_PORTFOLIO_SIZE
+    assert _config(size=-3)["size"] == 1
+
+
+def test_portfolio_members_defaults():
+    members = portfolio_members(_config(size=3), base_seed=7, total_workers=8)
+    assert [m["name"] for m in members] == [m["name"] for m in DEFAULT_MEMBERS[:3]]
+    assert [m["seed"] for m in members] == [7, 8, 9]
+    assert [m["workers"] for m in members] == [2, 2, 2]
+
+
+def test_portfolio_members_overrides():
+    cfg = _config(size=2, members=[{"name": "mine", "params": {"linearization_level": 0}, "seed": 42}])
+    members = portfolio_members(cfg, base_seed=1, total_workers=4)
+    assert members[0] == {"name": "mine", "seed": 42, "workers": 2, "params": {"linearization_level": 0}}
+    assert members[1]["name"] == DEFAULT_MEMBERS[1]["name"]
+
+
+def test_portfolio_members_rejects_unknown_params():
+    with pytest.raises(ValueError):
+        portfolio_members(_config(size=1, members=[{"params": {"no_such_field": 1}}]), 1, 4)
+
+
+def test_portfolio_members_names_repeated_presets():
+    members = portfolio_members(_config(size=len(DEFAULT_MEMBERS) + 1), 1, 64)
+    assert members[-1]["name"] == f"{DEFAULT_MEMBERS[0]['name']}#1"
+
+
+@pytest.mark.parametrize(
+    "portfolio, total_workers",
+    [
+        ({"size": 8, "workersPerMember": 8}, 4),
+        ({"size": 2, "members": [{"workers": 16}, {}]}, 4),
+        ({"size": 3, "workersPerMember": 5}, 8),
+        ({"size": 4}, 1),
+    ],
+)
+def test_portfolio_members_stay_within_worker_budget(portfolio, total_workers):
+    members = portfolio_members(_config(**portfolio), 1, total_workers)
+    assert sum(m["workers"] for m in members) <= total_workers
+    assert all(m["workers"] >= 1 for m in members)
+
+
+def test_portfolio_members_overrides_only_lower_the_share():
+    members = portfolio_members(_config(size=2, workersPerMember=1, members=[{"workers": 3}]), 1, 8)
+    assert [m["workers"] for m in members] == [3, 1]
+
+
+def test_reaches_target():
+    assert reaches_target(_run("OPTIMAL", 10), None)
+    assert reaches_target(_run("INFEASIBLE"), None)
+    assert not reaches_target(_run("FEASIBLE", 10), None)
+    assert reaches_target(_run("FEASIBLE", 10), 10)
+    assert not reaches_target(_run("FEASIBLE", 11), 10)
+    assert not reaches_target({"ok": False, "error": "crashed"}, 10)
+
+
+def test_best_index_lowest_objective():
+    assert best_index([_run("FEASIBLE", 12), _run("FEASIBLE", 9), _run("FEASIBLE", 10)]) == 1
+
+
+def test_best_index_optimal_wins_ties():
+    assert best_index([_run("FEASIBLE", 9), _run("OPTIMAL", 9)]) == 1
+
+
+def test_best_index_skips_failed_runs():
+    crashed = {"ok": False, "error": "Portfolio run default failed: killed"}
+    assert best_index([crashed, _run("UNKNOWN"), _run("FEASIBLE", 30)]) == 2
+
+
+def test_best_index_without_solution():
+    assert best_index([_run("UNKNOWN"), _run("INFEASIBLE", ok=False)]) == 1
+    assert best_index([{"ok": False, "error": "crashed"}, _run("UNKNOWN")]) == 0
@@ -0,0 +1,261 @@
+import random
+from typing import Any, Dict, List, Set
+
+import pytest
+
+from app import _build_model
+from instance_generator import generate_instance
+from precheck import Slot, _match_demand, capacity_precheck
+
+
+def _day(*hours: int) -> Set[Slot]:
+    return {(0, h) for h in hours}
+
+
+def _max_matching(demand: Dict[Any, int], allowed: Dict[Any, Set[Slot]], slots: Set[Slot]) -> int:
+    """Reference: plain augmenting paths over one node per demand unit."""
+    units = [key for key, count in demand.items() for _ in range(count)]
+    owner: Dict[Slot, int] = {}
+
+    def _augment(unit: int, seen: Set[Slot]) -> bool:
+        for slot in sorted(allowed.get(units[unit], set()) & slots):
+            if slot in seen:
+                continue
+            seen.add(slot)
+            if slot not in owner or _augment(owner[slot], seen):
+                owner[slot] = unit
+                return True
+        return False
+
+    return sum(_augment(unit, set()) for unit in range(len(units)))
+
+
+def test_match_demand_fits():
+    assert _match_demand({"a": 2, "b": 1}, {"a": _day(0, 1, 2), "b": _day(0)}, _day(0, 1, 2)) == []
+
+
+def test_match_demand_repairs_greedy_choice():
+    # Greedy gives c hour 3 and a hour 0, leaving b one short; b has to take
+    # hour 0 over from a, which moves to hour 2.
+    demand = {"a": 1, "b": 2, "c": 1}
+    allowed = {"a": _day(0, 2, 3), "b": _day(0, 1, 3), "c": _day(3)}
+    assert _match_demand(demand, allowed, _day(0, 1, 2, 3)) == []
+
+
+def test_match_demand_reports_hall_violator():
+    demand = {"a": 1, "b": 1, "c": 2}
+    allowed = {"a": _day(0), "b": _day(0), "c": _day(1, 2, 3)}
+    violations = _match_demand(demand, allowed, _day(0, 1, 2, 3))
+    assert len(violations) == 1
+    assert sorted(violations[0]["keys"]) == ["a", "b"]
+    assert violations[0]["demand_hours"] == 2
+    assert violations[0]["available_slots"] == 1
+
+
+def test_match_demand_only_counts_usable_slots():
+    # Hour 1 is allowed but already taken (not in `slots`).
+    violations = _match_demand({"a": 2}, {"a": _day(0, 1)}, _day(0, 2))
+    assert violations == [{"keys": ["a"], "demand_hours": 2, "available_slots": 1}]
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_match_demand_agrees_with_max_matching(seed):
+    rng = random.Random(seed)
+    slots = {(d, h) for d in range(2) for h in range(3)}
+    keys = [f"s{i}" for i in range(rng.randint(1, 5))]
+    demand = {key: rng.randint(1, 3) for key in keys}
+    allowed = {key: set(rng.sample(sorted(slots), rng.randint(0, len(slots)))) for key in keys}
+    usable = set(rng.sample(sorted(slots), rng.randint(1, len(slots))))
+
+    violations = _match_demand(demand, allowed, usable)
+
+    feasible = _max_matching(demand, allowed, usable) == sum(demand.values())
+    assert (violations == []) == feasible
+    for violation in violations:
+        # Every report is a real Hall violation: |N(K)| < demand(K).
+        neighbourhood = set().union(*[allowed[key] & usable for key in violation["keys"]])
+        assert violation["available_slots"] == len(neighbourhood)
+        assert violation["demand_hours"] == sum(demand[key] for key in violation["keys"])
+        assert violation["demand_hours"] > violation["available_slots"]
+
+
+def _precheck(
+    required: Dict[str, Dict[str, int]],
+    combos: List[Dict[str, Any]],
+    subject_slots: Dict[Any, Set[Slot]],
+    class_slots: Dict[str, Set[Slot]],
+    teacher_slots: Dict[str, Set[Slot]],
+    fixed_starts=(),
+    weekly_hours_hard: bool = True,
+) -> List[Dict[str, Any]]:
+    return capacity_precheck(
+        [{"_id": cid} for cid in required],
+        combos,
+        required,
+        class_slots,
+        subject_slots,
+        teacher_slots,
+        fixed_starts,
+        lambda combo_id: 1,
+        weekly_hours_hard,
+    )
+
+
+COMBOS = [
+    {"_id": "k1", "class_ids": ["c1"], "faculty_ids": ["t1"], "subject_id": "math"},
+    {"_id": "k2", "class_ids": ["c1"], "faculty_ids": ["t2"], "subject_id": "art"},
+]
+
+
+def _types(reasons: List[Dict[str, Any]]) -> List[str]:
+    return [reason["type"] for reason in reasons]
+
+
+def test_capacity_precheck_passes_feasible_class():
+    reasons = _precheck(
+        {"c1": {"math": 2, "art": 1}},
+        COMBOS,
+        {("c1", "math"): _day(0, 1, 2), ("c1", "art"): _day(0, 1, 2)},
+        {"c1": _day(0, 1, 2)},
+        {"t1": _day(0, 1, 2), "t2": _day(0, 1, 2)},
+    )
+    assert reasons == []
+
+
+def test_capacity_precheck_class_overloaded():
+    reasons = _precheck(
+        {"c1": {"math": 2, "art": 2}},
+        COMBOS,
+        {("c1", "math"): _day(0, 1, 2), ("c1", "art"): _day(0, 1, 2)},
+        {"c1": _day(0, 1, 2)},
+        {"t1": _day(0, 1, 2), "t2": _day(0, 1, 2)},
+    )
+    assert reasons == [
+        {"type": "class_overloaded", "class_id": "c1", "required_hours": 4, "available_slots": 3}
+    ]
+
+
+def test_capacity_precheck_subjects_lack_slots():
+    reasons = _precheck(
+        {"c1": {"math": 2, "art": 1}},
+        COMBOS,
+        {("c1", "math"): _day(0), ("c1", "art"): _day(0, 1, 2)},
+        {"c1": _day(0, 1, 2)},
+        {"t1": _day(0, 1, 2), "t2": _day(0, 1, 2)},
+    )
+    # t1 alone teaches math to c1, so its lessons lack slots as well.
+    assert _types(reasons) == ["class_subjects_lack_slots", "teacher_lessons_lack_slots"]
+    assert reasons[0]["subject_ids"] == ["math"]
+    assert reasons[1]["lessons"] == [{"class_id": "c1", "subject_id": "math"}]
+
+
+def test_capacity_precheck_no_candidate_slots():
+    reasons = _precheck(
+        {"c1": {"math": 1, "art": 1}},
+        COMBOS,
+        {("c1", "art"): _day(0, 1)},
+        {"c1": _day(0, 1)},
+        {"t1": set(), "t2": _day(0, 1)},
+    )
+    assert reasons[0] == {
+        "type": "no_candidate_slots",
+        "class_id": "c1",
+        "subject_id": "math",
+        "required_hours": 1,
+        "combos": ["k1"],
+    }
+
+
+def test_capacity_precheck_teacher_overloaded_only_when_forced():
+    combos = [
+        {"_id": "k1", "class_ids": ["c1"], "faculty_ids": ["t1"], "subject_id": "math"},
+        {"_id": "k2", "class_ids": ["c2"], "faculty_ids": ["t1"], "subject_id": "math"},
+    ]
+    required = {"c1": {"math": 2}, "c2": {"math": 2}}
+    subject_slots = {("c1", "math"): _day(0, 1, 2), ("c2", "math"): _day(0, 1, 2)}
+    class_slots = {"c1": _day(0, 1, 2), "c2": _day(0, 1, 2)}
+    reasons = _precheck(required, combos, subject_slots, class_slots, {"t1": _day(0, 1, 2)})
+    assert reasons == [
+        {"type": "teacher_overloaded", "teacher_id": "t1", "required_hours": 4, "available_slots": 3}
+    ]
+
+    # A second teacher who can also take c2's lessons: t1 is no longer forced.
+    combos.append({"_id": "k3", "class_ids": ["c2"], "faculty_ids": ["t2"], "subject_id": "math"})
+    teacher_slots = {"t1": _day(0, 1, 2), "t2": _day(0, 1, 2)}
+    assert _precheck(required, combos, subject_slots, class_slots, teacher_slots) == []
+
+
+def test_capacity_precheck_fixed_slot_conflict():
+    combos = [
+        {"_id": "k1", "class_ids": ["c1"], "faculty_ids": ["t1"], "subject_id": "math"},
+        {"_id": "k2", "class_ids": ["c2"], "faculty_ids": ["t1"], "subject_id": "art"},
+    ]
+    reasons = _precheck(
+        {"c1": {"math": 1}, "c2": {"art": 1}},
+        combos,
+        {("c1", "math"): _day(0, 1), ("c2", "art"): _day(0, 1)},
+        {"c1": _day(0, 1), "c2": _day(0, 1)},
+        {"t1": _day(0, 1)},
+        fixed_starts=[("k1", 0, 0), ("k2", 0, 0)],
+    )
+    assert _types(reasons) == ["fixed_slot_conflict"]
+    assert reasons[0]["teacher_id"] == "t1"
+    assert reasons[0]["combos"] == ["k1", "k2"]
+
+
+def test_capacity_precheck_fixed_hours_exceed_required():
+    reasons = _precheck(
+        {"c1": {"math": 1, "art": 0}},
+        COMBOS,
+        {("c1", "math"): _day(0, 1)},
+        {"c1": _day(0, 1)},
+        {"t1": _day(0, 1), "t2": _day(0, 1)},
+        fixed_starts=[("k1", 0, 0), ("k1", 0, 1)],
+        weekly_hours_hard=False,
+    )
+    assert reasons == [
+        {
+            "type": "fixed_slots_exceed_required",
+            "class_id": "c1",
+            "subject_id": "math",
+            "fixed_hours": 2,
+            "required_hours": 1,
+        }
+    ]
+
+
+def test_capacity_precheck_skips_classes_it_does_not_model():
+    # Repair mode: only c1 is modelled, c2's frozen fixed lessons are not checked.
+    combos = [{"_id": "k3", "class_ids": ["c2"], "faculty_ids": ["t3"], "subject_id": "art"}] + COMBOS
+    reasons = _precheck(
+        {"c1": {"math": 1, "art": 1}},
+        combos,
+        {("c1", "math"): _day(0, 1), ("c1", "art"): _day(0, 1)},
+        {"c1": _day(0, 1)},
+        {"t1": _day(0, 1), "t2": _day(0, 1)},
+        fixed_starts=[("k3", 0, 0), ("k3", 0, 1)],
+    )
+    assert reasons == []
+
+
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize(
+    "options",
+    [
+        {},
+        {"lab_ratio": 0.5},
+        {"fixed_slots_per_class": 3},
+        {"multi_class_ratio": 0.3},
+        {"availability_density": 0.15},
+    ],
+)
+def test_generated_instances_pass_precheck(seed, options):
+    built = _build_model(generate_instance(num_classes=6, num_teachers=15, seed=seed, **options))
+    assert built.precheck_failures == []
+
+
+def test_overfull_instance_is_rejected():
+    payload = generate_instance(num_classes=4, num_teachers=10, seed=0)
+    payload["constraintConfig"]["schedule"]["hoursPerDay"] = 2
+    built = _build_model(payload)
+    assert "class_overloaded" in _types(built.precheck_failures)